@@ -0,0 +1,2 @@
+"""Benchmarks of translation throughput, latency and memory, run with
+`python -m benchmarks`"""
@@ -0,0 +1,203 @@
+from isde_dataset.collection import TOPIC_CATEGORY_CODES
+from typing import Iterator, List, Optional
+from xml.sax.saxutils import escape
+
+import os
+import random
+
+__docformat__ = "google"
+
+NAMESPACES: str = (
+    'xmlns:gmd="http://www.isotc211.org/2005/gmd" '
+    'xmlns:gco="http://www.isotc211.org/2005/gco" '
+    'xmlns:gml="http://www.opengis.net/gml/3.2"')
+"""The namespace declarations of every generated record"""
+
+_WORDS: List[str] = (
+    "sea surface temperature salinity current wave height wind speed buoy "
+    "mooring survey cruise bathymetry sediment habitat species abundance "
+    "fishery catch coastal estuary river flow discharge rainfall station "
+    "monitoring network observation model forecast hindcast climate annual "
+    "monthly daily hourly gridded profile chlorophyll oxygen nutrient "
+    "seabed geology borehole aquifer groundwater soil peat land cover "
+    "Ireland Atlantic Irish Sea Celtic shelf Galway Cork Dublin Donegal "
+    "Kerry Mayo Shannon Liffey Corrib Boyne Suir Barrow Nore").split()
+
+_RECORD: str = (
+    '<gmd:MD_Metadata {namespaces}>'
+    '<gmd:fileIdentifier><gco:CharacterString>{identifier}'
+    '</gco:CharacterString></gmd:fileIdentifier>'
+    '<gmd:language><gmd:LanguageCode codeList="http://www.loc.gov/standards'
+    '/iso639-2/" codeListValue="eng">eng</gmd:LanguageCode></gmd:language>'
+    '{contacts}'
+    '<gmd:dateStamp><gco:DateTime>2023-01-02T00:00:00</gco:DateTime>'
+    '</gmd:dateStamp>'
+    '<gmd:dataSetURI><gco:CharacterString>{doi}</gco:CharacterString>'
+    '</gmd:dataSetURI>'
+    '<gmd:identificationInfo><gmd:MD_DataIdentification>'
+    '<gmd:citation><gmd:CI_Citation>'
+    '<gmd:title><gco:CharacterString>{title}</gco:CharacterString>'
+    '</gmd:title>'
+    '<gmd:otherCitationDetails><gco:CharacterString>{citation}'
+    '</gco:CharacterString></gmd:otherCitationDetails>'
+    '</gmd:CI_Citation></gmd:citation>'
+    '<gmd:abstract><gco:CharacterString>{abstract}</gco:CharacterString>'
+    '</gmd:abstract>'
+    '{keywords}{extents}'
+    '</gmd:MD_DataIdentification></gmd:identificationInfo>'
+    '</gmd:MD_Metadata>')
+
+_CONTACT: str = (
+    '<gmd:contact><gmd:CI_ResponsibleParty>'
+    '<gmd:organisationName><gco:CharacterString>{organisation}'
+    '</gco:CharacterString></gmd:organisationName>'
+    '<gmd:contactInfo><gmd:CI_Contact><gmd:address><gmd:CI_Address>'
+    '<gmd:electronicMailAddress><gco:CharacterString>{email}'
+    '</gco:CharacterString></gmd:electronicMailAddress>'
+    '</gmd:CI_Address></gmd:address></gmd:CI_Contact></gmd:contactInfo>'
+    '<gmd:role><gmd:CI_RoleCode codeList="http://standards.iso.org/iso/'
+    '19139/resources/gmxCodelists.xml#CI_RoleCode" '
+    'codeListValue="pointOfContact">pointOfContact</gmd:CI_RoleCode>'
+    '</gmd:role></gmd:CI_ResponsibleParty></gmd:contact>')
+
+_KEYWORD: str = (
+    '<gmd:topicCategory><gmd:MD_TopicCategoryCode>{keyword}'
+    '</gmd:MD_TopicCategoryCode></gmd:topicCategory>')
+
+_EXTENT: str = (
+    '<gmd:extent><gmd:EX_Extent>'
+    '<gmd:geographicElement><gmd:EX_GeographicBoundingBox>'
+    '<gmd:westBoundLongitude><gco:Decimal>{west:.4f}</gco:Decimal>'
+    '</gmd:westBoundLongitude>'
+    '<gmd:eastBoundLongitude><gco:Decimal>{east:.4f}</gco:Decimal>'
+    '</gmd:eastBoundLongitude>'
+    '<gmd:southBoundLatitude><gco:Decimal>{south:.4f}</gco:Decimal>'
+    '</gmd:southBoundLatitude>'
+    '<gmd:northBoundLatitude><gco:Decimal>{north:.4f}</gco:Decimal>'
+    '</gmd:northBoundLatitude>'
+    '</gmd:EX_GeographicBoundingBox></gmd:geographicElement>'
+    '<gmd:temporalElement><gmd:EX_TemporalExtent><gmd:extent>'
+    '<gml:TimePeriod gml:id="period{index}">'
+    '<gml:beginPosition>{begin}</gml:beginPosition>'
+    '<gml:endPosition>{end}</gml:endPosition>'
+    '</gml:TimePeriod></gmd:extent></gmd:EX_TemporalExtent>'
+    '</gmd:temporalElement>'
+    '</gmd:EX_Extent></gmd:extent>')
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return escape(" ".join(rng.choice(_WORDS) for _ in range(words)))
+
+
+def iso_record(index: int, abstract_words: int = 100, keywords: int = 3,
+               extents: int = 1, contacts: int = 1,
+               seed: Optional[int] = None) -> bytes:
+    """Generates an ISO19139 record, with every field that a `Dataset` is
+    extracted from filled in
+
+    The same arguments always give the same record, and records with
+    different indices have different identifiers, titles and abstracts.
+
+    Args:
+        index (int): The number of the record, from which its identifier,
+                        and the seed of its text, are made
+        abstract_words (int): The number of words in the abstract
+        keywords (int): The number of topic categories
+        extents (int): The number of extents, each with a bounding box and
+                        a time period
+        contacts (int): The number of contacts, which are not extracted and
+                        so pad the record
+        seed (int): Seed for the text and coordinates, defaulting to index
+
+    Returns:
+        bytes: The record as UTF-8, without an XML declaration
+    """
+    rng: random.Random = random.Random(index if seed is None else seed)
+    extent_xml: List[str] = list()
+    i: int
+    for i in range(extents):
+        south: float = rng.uniform(-80.0, 70.0)
+        west: float = rng.uniform(-179.0, 160.0)
+        year: int = rng.randint(1950, 2020)
+        extent_xml.append(_EXTENT.format(
+            west=west, east=west + rng.uniform(0.1, 19.0), south=south,
+            north=south + rng.uniform(0.1, 9.0), index=i,
+            begin="%04d-%02d-01T00:00:00Z" % (year, rng.randint(1, 12)),
+            end="%04d-12-31T23:59:59Z" % (year + rng.randint(0, 5))))
+    return _RECORD.format(
+        namespaces=NAMESPACES,
+        identifier="synthetic-%08d" % index,
+        contacts="".join(_CONTACT.format(
+            organisation=_text(rng, 4),
+            email="contact%d@example.org" % i) for i in range(contacts)),
+        doi="10.0000/synthetic.%d" % index,
+        title=_text(rng, 8),
+        citation=_text(rng, 16),
+        abstract=_text(rng, abstract_words),
+        keywords="".join(
+            _KEYWORD.format(keyword=TOPIC_CATEGORY_CODES[
+                (index + i) % len(TOPIC_CATEGORY_CODES)])
+            for i in range(keywords)),
+        extents="".join(extent_xml)).encode()
+
+
+def iso_document(index: int, **kwargs) -> bytes:
+    """Generates an ISO19139 record as a standalone document, taking the
+    arguments of `iso_record`"""
+    return b'<?xml version="1.0" encoding="UTF-8"?>\n' + \
+        iso_record(index, **kwargs)
+
+
+def csw_page(first: int, records: int, matched: Optional[int] = None,
+             **kwargs) -> bytes:
+    """Generates a CSW 2.0.2 GetRecords response holding a page of records
+
+    Args:
+        first (int): The index of the first record of the page, which is
+                        also its 1-based position in the search results
+        records (int): The number of records in the page
+        matched (int): The number of records matched by the search, which
+                        defaults to the position of the last record of the
+                        page
+        **kwargs: Further arguments for `iso_record`
+    """
+    if matched is None:
+        matched = first + records - 1
+    next_record: int = first + records if first + records <= matched \
+        else 0
+    return b"".join([
+        b'<?xml version="1.0" encoding="UTF-8"?>\n'
+        b'<csw:GetRecordsResponse '
+        b'xmlns:csw="http://www.opengis.net/cat/csw/2.0.2">'
+        b'<csw:SearchResults numberOfRecordsMatched="%d" '
+        b'numberOfRecordsReturned="%d" nextRecord="%d">' % (
+            matched, records, next_record)] +
+        [iso_record(i, **kwargs) for i in range(first, first + records)] +
+        [b"</csw:SearchResults></csw:GetRecordsResponse>"])
+
+
+def iter_records(count: int, **kwargs) -> Iterator[bytes]:
+    """Yields count standalone documents, taking the arguments of
+    `iso_record`"""
+    i: int
+    for i in range(count):
+        yield iso_document(i, **kwargs)
+
+
+def write_corpus(directory: str, count: int, **kwargs) -> List[str]:
+    """Writes count standalone documents to a directory, one file per
+    record, taking the arguments of `iso_record`
+
+    Returns:
+        list of str: The paths of the files written
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths: List[str] = list()
+    i: int
+    document: bytes
+    for i, document in enumerate(iter_records(count, **kwargs)):
+        path: str = os.path.join(directory, "synthetic-%08d.xml" % i)
+        with open(path, "wb") as f:
+            f.write(document)
+        paths.append(path)
+    return paths
@@ -0,0 +1,212 @@
+from typing import Any, Dict, List, Optional
+
+from . import corpus
+from .suite import FIXTURES, _percentile
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+__docformat__ = "google"
+
+_COLD_START: str = (
+    "import sys, isde_dataset, isde_dataset.batch as b; "
+    "sys.stdout.write(b._FORMATS[sys.argv[1]](isde_dataset.Dataset("
+    "sys.stdin.buffer.read(), isde_dataset.DatasetSourceType.ISO_XML_BYTES"
+    ")))")
+"""A one-off translation, as made by a short-lived job"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: Optional[int], batch_size: int, queue_size: int,
+                 port: int, timeout: float = 60.0) -> subprocess.Popen:
+    """Starts `python -m isde_dataset.serve` and waits until it is healthy
+
+    Raises:
+        RuntimeError: If the server does not become healthy within timeout
+                        seconds
+    """
+    command: List[str] = [sys.executable, "-m", "isde_dataset.serve",
+                          "--port", str(port), "--batch-size",
+                          str(batch_size), "--queue-size", str(queue_size)]
+    if workers is not None:
+        command += ["--workers", str(workers)]
+    process: subprocess.Popen = subprocess.Popen(command)
+    deadline: float = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen("http://127.0.0.1:%d/health" % port,
+                                        timeout=1) as response:
+                if response.status == 200:
+                    return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("the server did not start")
+
+
+async def _client(host: str, port: int, path: str, records: List[bytes],
+                  offset: int, deadline: float,
+                  latencies: List[float], statuses: Dict[int, int]):
+    reader: asyncio.StreamReader
+    writer: asyncio.StreamWriter
+    reader, writer = await asyncio.open_connection(host, port)
+    i: int = offset
+    try:
+        while time.perf_counter() < deadline:
+            body: bytes = records[i % len(records)]
+            i += 1
+            started: float = time.perf_counter()
+            writer.write(b"POST %s HTTP/1.1\r\nHost: %s\r\n"
+                         b"Content-Length: %d\r\n\r\n" % (
+                             path.encode(), host.encode(), len(body)) + body)
+            await writer.drain()
+            status: int = int((await reader.readline()).split()[1])
+            length: int = 0
+            while True:
+                line: bytes = await reader.readline()
+                if line == b"\r\n":
+                    break
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":")[1])
+            await reader.readexactly(length)
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 503:
+                await asyncio.sleep(0.01)
+    finally:
+        writer.close()
+
+
+async def load(host: str, port: int, records: List[bytes],
+               concurrency: int = 16, duration: float = 10.0,
+               format: str = "fields") -> Dict[str, Any]:
+    """Sends records to a translation server from concurrent keep-alive
+    connections for a while, and measures the latency of each request
+
+    Args:
+        host (str): The address of the server
+        port (int): The port of the server
+        records (list of bytes): The ISO19139 documents to send, in turn
+        concurrency (int): The number of connections, each with one request
+                            in flight at a time
+        duration (float): The time in seconds to send requests for
+        format (str): The output format requested
+
+    Returns:
+        dict: The count of each response status, the throughput of
+                successful requests per second, and the mean and 50th, 90th
+                and 99th percentile and maximum latency of a successful
+                request in milliseconds
+    """
+    latencies: List[float] = list()
+    statuses: Dict[int, int] = dict()
+    started: float = time.perf_counter()
+    await asyncio.gather(*(
+        _client(host, port, "/translate?format=" + format, records,
+                i * 7, started + duration, latencies, statuses)
+        for i in range(concurrency)))
+    elapsed: float = time.perf_counter() - started
+    latencies.sort()
+    result: Dict[str, Any] = {"statuses": statuses,
+                              "throughput": len(latencies) / elapsed}
+    if latencies:
+        result.update({
+            "mean_ms": sum(latencies) / len(latencies) * 1e3,
+            "p50_ms": _percentile(latencies, 0.50) * 1e3,
+            "p90_ms": _percentile(latencies, 0.90) * 1e3,
+            "p99_ms": _percentile(latencies, 0.99) * 1e3,
+            "max_ms": latencies[-1] * 1e3})
+    return result
+
+
+def cold_start(record: bytes, runs: int = 5, format: str = "fields") \
+        -> float:
+    """Returns the median time in milliseconds to translate one record in a
+    fresh interpreter, the cost the server saves each short-lived job"""
+    times: List[float] = list()
+    i: int
+    for i in range(runs):
+        started: float = time.perf_counter()
+        subprocess.run([sys.executable, "-c", _COLD_START, format],
+                       input=record, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - started)
+    times.sort()
+    return times[len(times) // 2] * 1e3
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point, run as `python -m benchmarks.load`, which
+    starts a server unless --port is given and loads it with the fixtures
+    and a synthetic corpus"""
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="python -m benchmarks.load",
+        description="Measure the throughput and latency of isde-serve "
+                    "under concurrent load")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=None,
+                        help="load a running server rather than starting "
+                             "one")
+    parser.add_argument("-w", "--workers", type=int, default=None)
+    parser.add_argument("-b", "--batch-size", type=int, default=16)
+    parser.add_argument("-q", "--queue-size", type=int, default=256)
+    parser.add_argument("-c", "--concurrency", type=int, default=16)
+    parser.add_argument("-d", "--duration", type=float, default=10.0)
+    parser.add_argument("-f", "--format", default="fields",
+                        choices=("dcat", "fields", "schema.org"))
+    parser.add_argument("--records", type=int, default=200,
+                        help="number of synthetic records sent")
+    parser.add_argument("--cold-runs", type=int, default=5,
+                        help="one-off translations in a fresh interpreter "
+                             "to time, for comparison")
+    parser.add_argument("--save", default=None,
+                        help="write the results as JSON")
+    args: argparse.Namespace = parser.parse_args(argv)
+    records: List[bytes] = list(corpus.iter_records(args.records))
+    path: str
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path, "rb") as f:
+            records.append(f.read())
+    process: Optional[subprocess.Popen] = None
+    port: int = args.port
+    if port is None:
+        port = _free_port()
+        process = start_server(args.workers, args.batch_size,
+                               args.queue_size, port)
+    try:
+        result: Dict[str, Any] = asyncio.run(load(
+            args.host, port, records, args.concurrency, args.duration,
+            args.format))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    if args.cold_runs:
+        result["cold_start_ms"] = cold_start(records[0], args.cold_runs,
+                                             args.format)
+    result["parameters"] = {k: v for k, v in vars(args).items()
+                            if k != "save"}
+    result["cpus"] = os.cpu_count()
+    text: str = json.dumps(result, indent=2, sort_keys=True)
+    print(text)
+    if args.save is not None:
+        with open(args.save, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,398 @@
+from isde_dataset import Dataset, DatasetSourceType, _ISO_EXTRACTORS, dcat, \
+    instrumentation, schemaorg
+from isde_dataset._isoextractor import _ISORecord
+from isde_dataset.boundingbox import BoundingBox
+from isde_dataset.stream import iter_iso_datasets
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import corpus
+
+import argparse
+import gc
+import glob
+import io
+import json
+import math
+import os
+import platform
+import re
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree
+
+__docformat__ = "google"
+
+FORMAT_VERSION: int = 1
+"""Version of the layout of the JSON written by `save`"""
+
+FIXTURES: str = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), "test", "resources", "*.xml")
+"""Glob of the real ISO19139 records benchmarked"""
+
+DEFAULT_PARAMETERS: Dict[str, int] = {
+    "records": 200,
+    "abstract_words": 100,
+    "keywords": 3,
+    "extents": 1,
+    "contacts": 1,
+    "page_size": 50,
+    "large_abstract_words": 5000,
+    "large_keywords": 19,
+    "large_extents": 20,
+    "large_contacts": 4000}
+"""The size of the synthetic corpus. The large record has enough contacts
+to be parsed into a pruned tree."""
+
+_Operation = Callable[[Any], Any]
+_Factory = Callable[[Dict[str, int]], Tuple[_Operation, List[Any]]]
+"""Builds a benchmark from the parameters, returning the operation to time
+and the items, usually records, it is timed on one at a time"""
+
+BENCHMARKS: Dict[str, _Factory] = dict()
+"""Every benchmark, by name, in the order they run"""
+
+
+def benchmark(name: str) -> Callable[[_Factory], _Factory]:
+    """Registers a benchmark factory in `BENCHMARKS` under a name"""
+    def register(factory: _Factory) -> _Factory:
+        BENCHMARKS[name] = factory
+        return factory
+    return register
+
+
+def _fixtures() -> List[bytes]:
+    documents: List[bytes] = list()
+    path: str
+    for path in sorted(glob.glob(FIXTURES)):
+        with open(path, "rb") as f:
+            documents.append(f.read())
+    return documents
+
+
+def _synthetic(parameters: Dict[str, int]) -> List[bytes]:
+    return list(corpus.iter_records(
+        parameters["records"],
+        abstract_words=parameters["abstract_words"],
+        keywords=parameters["keywords"], extents=parameters["extents"],
+        contacts=parameters["contacts"]))
+
+
+def _datasets(documents: List[bytes]) -> List[Dataset]:
+    return [Dataset(d, DatasetSourceType.ISO_XML_BYTES) for d in documents]
+
+
+def _construct(document: bytes) -> Dataset:
+    return Dataset(document, DatasetSourceType.ISO_XML_BYTES)
+
+
+def _construct_lazy(document: bytes) -> str:
+    return Dataset(xml.etree.ElementTree.ElementTree(
+        xml.etree.ElementTree.XML(document)), DatasetSourceType.ISO_XML,
+        lazy=True).identifier
+
+
+def _construct_instrumented(document: bytes) -> Dataset:
+    with instrumentation.instrumented(instrumentation.Metrics()):
+        return _construct(document)
+
+
+def _records(documents: List[bytes]) -> List[_ISORecord]:
+    return [_ISORecord(xml.etree.ElementTree.XML(d)) for d in documents]
+
+
+def _csw_page(page: bytes) -> List[Dataset]:
+    return list(iter_iso_datasets(io.BytesIO(page)))
+
+
+def _fields(dataset: Dataset) -> str:
+    return json.dumps(dataset.to_dict())
+
+
+def _from_dict(dataset: Dataset) -> Dataset:
+    return Dataset(dataset.to_dict(), DatasetSourceType.DICT)
+
+
+benchmark("fixtures.construct")(
+    lambda parameters: (_construct, _fixtures()))
+benchmark("fixtures.parse")(
+    lambda parameters: (xml.etree.ElementTree.XML, _fixtures()))
+benchmark("fixtures.anchors")(lambda parameters: (_ISORecord, [
+    xml.etree.ElementTree.XML(d) for d in _fixtures()]))
+
+_name: str
+for _name in _ISO_EXTRACTORS:
+    benchmark("fixtures.extract." + _name.lstrip("_"))(
+        lambda parameters, name=_name: (_ISO_EXTRACTORS[name],
+                                        _records(_fixtures())))
+
+benchmark("synthetic.construct")(
+    lambda parameters: (_construct, _synthetic(parameters)))
+benchmark("synthetic.construct.lazy")(
+    lambda parameters: (_construct_lazy, _synthetic(parameters)))
+benchmark("synthetic.construct.instrumented")(
+    lambda parameters: (_construct_instrumented, _synthetic(parameters)))
+benchmark("synthetic.construct.large")(lambda parameters: (_construct, [
+    corpus.iso_document(0, abstract_words=parameters["large_abstract_words"],
+                        keywords=parameters["large_keywords"],
+                        extents=parameters["large_extents"],
+                        contacts=parameters["large_contacts"])]))
+benchmark("synthetic.csw_page")(lambda parameters: (_csw_page, [
+    corpus.csw_page(1, parameters["page_size"],
+                    abstract_words=parameters["abstract_words"],
+                    keywords=parameters["keywords"],
+                    extents=parameters["extents"],
+                    contacts=parameters["contacts"])]))
+
+benchmark("bounding_box.construct")(lambda parameters: (
+    lambda c: BoundingBox(*c),
+    [(ds.bounding_box.north, ds.bounding_box.south, ds.bounding_box.east,
+      ds.bounding_box.west) for ds in _datasets(_synthetic(parameters))]))
+
+_serializer: _Operation
+for _name, _serializer in (("fields", _fields),
+                           ("schema_org", schemaorg.dumps),
+                           ("dcat", dcat.dumps),
+                           ("from_dict", _from_dict)):
+    benchmark("serialize." + _name)(
+        lambda parameters, serializer=_serializer: (
+            serializer, _datasets(_fixtures() + _synthetic(parameters))))
+
+
+def _percentile(ordered: List[float], fraction: float) -> float:
+    """The nearest-rank percentile of an ascending list"""
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+def measure(operation: _Operation, items: List[Any], min_time: float = 1.0,
+            min_rounds: int = 3) -> Dict[str, float]:
+    """Times an operation on each of a list of items, in rounds over the
+    whole list until both min_time seconds and min_rounds rounds have
+    passed, then measures the peak memory allocated by one further round
+    with `tracemalloc`
+
+    Args:
+        operation (callable): The operation to time, taking one item
+        items (list): The items, usually records, to time it on
+        min_time (float): The least time in seconds to spend timing
+        min_rounds (int): The least number of rounds to time
+
+    Returns:
+        dict: The number of items timed, throughput in items per second,
+                the mean and the 50th, 90th and 99th percentile and maximum
+                latency of one item in microseconds, and the peak memory of
+                a round in bytes
+    """
+    item: Any
+    for item in items:
+        operation(item)
+    gc.collect()
+    latencies: List[float] = list()
+    clock: Callable[[], float] = time.perf_counter
+    started: float = clock()
+    rounds: int = 0
+    while rounds < min_rounds or clock() - started < min_time:
+        for item in items:
+            before: float = clock()
+            operation(item)
+            latencies.append(clock() - before)
+        rounds += 1
+    gc.collect()
+    tracing: bool = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    tracemalloc.clear_traces()
+    baseline: int = tracemalloc.get_traced_memory()[0]
+    results: List[Any] = [operation(item) for item in items]
+    peak: int = tracemalloc.get_traced_memory()[1] - baseline
+    del results
+    if not tracing:
+        tracemalloc.stop()
+    latencies.sort()
+    total: float = sum(latencies)
+    return {"items": len(latencies),
+            "throughput": len(latencies) / total,
+            "mean_us": total / len(latencies) * 1e6,
+            "p50_us": _percentile(latencies, 0.50) * 1e6,
+            "p90_us": _percentile(latencies, 0.90) * 1e6,
+            "p99_us": _percentile(latencies, 0.99) * 1e6,
+            "max_us": latencies[-1] * 1e6,
+            "peak_memory": max(0, peak)}
+
+
+def run(names: Optional[Iterable[str]] = None,
+        parameters: Optional[Dict[str, int]] = None, min_time: float = 1.0,
+        min_rounds: int = 3,
+        progress: Optional[Callable[[str, Dict[str, float]], None]] = None) \
+        -> Dict[str, Any]:
+    """Runs benchmarks and returns their results with the environment they
+    ran in, in the layout written by `save`
+
+    Args:
+        names (iterable of str): The benchmarks to run, defaulting to all of
+                                    `BENCHMARKS`
+        parameters (dict): Overrides of `DEFAULT_PARAMETERS`
+        min_time (float): The least time in seconds to time each benchmark
+        min_rounds (int): The least number of rounds of each benchmark
+        progress (callable): Called with the name and result of each
+                                benchmark as it finishes
+
+    Raises:
+        KeyError: If a name is not in `BENCHMARKS`
+    """
+    merged: Dict[str, int] = dict(DEFAULT_PARAMETERS)
+    merged.update(parameters or dict())
+    results: Dict[str, Dict[str, float]] = dict()
+    name: str
+    for name in (BENCHMARKS if names is None else names):
+        operation: _Operation
+        items: List[Any]
+        operation, items = BENCHMARKS[name](merged)
+        result: Dict[str, float] = measure(operation, items, min_time,
+                                           min_rounds)
+        results[name] = result
+        del items
+        if progress is not None:
+            progress(name, result)
+    return {"format": FORMAT_VERSION,
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "parameters": merged,
+            "benchmarks": results}
+
+
+def save(results: Dict[str, Any], path: str):
+    """Writes benchmark results as a JSON baseline"""
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load(path: str) -> Dict[str, Any]:
+    """Reads a JSON baseline written by `save`
+
+    Raises:
+        ValueError: If the baseline is of another format version
+    """
+    with open(path) as f:
+        baseline: Dict[str, Any] = json.load(f)
+    if baseline.get("format") != FORMAT_VERSION:
+        raise ValueError("unsupported baseline format %r" %
+                         baseline.get("format"))
+    return baseline
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float = 0.25) -> List[Tuple[str, str, float]]:
+    """Finds the regressions of results against a baseline: a throughput
+    or a 99th percentile latency more than tolerance worse, or a peak
+    memory more than tolerance larger. Benchmarks in only one of the two
+    are ignored.
+
+    Args:
+        results (dict): Results returned by `run`
+        baseline (dict): Results read by `load`
+        tolerance (float): The fraction by which a measure may worsen
+
+    Returns:
+        list: (benchmark, measure, ratio of result to baseline) for each
+                regression
+    """
+    regressions: List[Tuple[str, str, float]] = list()
+    name: str
+    result: Dict[str, float]
+    for name, result in results["benchmarks"].items():
+        reference: Optional[Dict[str, float]] = \
+            baseline["benchmarks"].get(name)
+        if reference is None:
+            continue
+        if result["throughput"] < reference["throughput"] * (1 - tolerance):
+            regressions.append((name, "throughput", result["throughput"] /
+                                reference["throughput"]))
+        if result["p99_us"] > reference["p99_us"] * (1 + tolerance):
+            regressions.append((name, "p99_us", result["p99_us"] /
+                                reference["p99_us"]))
+        if result["peak_memory"] > \
+                max(reference["peak_memory"], 1024) * (1 + tolerance):
+            regressions.append((name, "peak_memory", result["peak_memory"] /
+                                max(reference["peak_memory"], 1)))
+    return regressions
+
+
+def _row(name: str, result: Dict[str, float]) -> str:
+    return "%-36s %12.1f %10.1f %10.1f %10.1f %10.1f" % (
+        name, result["throughput"], result["p50_us"], result["p90_us"],
+        result["p99_us"], result["peak_memory"] / 1024)
+
+
+HEADER: str = "%-36s %12s %10s %10s %10s %10s" % (
+    "benchmark", "items/s", "p50 us", "p90 us", "p99 us", "peak KiB")
+"""The heading of the table printed by `main`"""
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point, run as `python -m benchmarks`
+
+    Returns:
+        int: 0, or 1 if a regression was found against --compare
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark translation of ISO19115/19139 records")
+    parser.add_argument("-k", "--filter", default=None,
+                        help="run only benchmarks matching this regular "
+                             "expression")
+    parser.add_argument("--list", action="store_true",
+                        help="list the benchmarks and exit")
+    parser.add_argument("--min-time", type=float, default=1.0,
+                        help="least seconds to time each benchmark")
+    parser.add_argument("--min-rounds", type=int, default=3,
+                        help="least rounds over the items of each "
+                             "benchmark")
+    parser.add_argument("--save", default=None,
+                        help="write the results as a JSON baseline")
+    parser.add_argument("--compare", default=None,
+                        help="compare the results with a JSON baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="fraction by which a measure may worsen "
+                             "before it is reported as a regression")
+    name: str
+    default: int
+    for name, default in DEFAULT_PARAMETERS.items():
+        parser.add_argument("--" + name.replace("_", "-"), type=int,
+                            default=default, dest=name,
+                            help="synthetic corpus parameter (default "
+                                 "%(default)s)")
+    args: argparse.Namespace = parser.parse_args(argv)
+    names: List[str] = [n for n in BENCHMARKS if args.filter is None or
+                        re.search(args.filter, n)]
+    if args.list:
+        print("\n".join(names))
+        return 0
+    baseline: Optional[Dict[str, Any]] = None
+    if args.compare is not None:
+        baseline = load(args.compare)
+        if baseline["parameters"] != dict(DEFAULT_PARAMETERS, **{
+                n: getattr(args, n) for n in DEFAULT_PARAMETERS}):
+            print("warning: the baseline was run with other corpus "
+                  "parameters", file=sys.stderr)
+    print(HEADER)
+    results: Dict[str, Any] = run(
+        names, {n: getattr(args, n) for n in DEFAULT_PARAMETERS},
+        args.min_time, args.min_rounds,
+        lambda n, r: print(_row(n, r), flush=True))
+    if args.save is not None:
+        save(results, args.save)
+    if baseline is None:
+        return 0
+    regressions: List[Tuple[str, str, float]] = compare(results, baseline,
+                                                        args.tolerance)
+    measure_name: str
+    ratio: float
+    for name, measure_name, ratio in regressions:
+        print("REGRESSION %s %s %.2fx baseline" % (name, measure_name, ratio),
+              file=sys.stderr)
+    return 1 if regressions else 0
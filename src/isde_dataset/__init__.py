@@ -2,15 +2,37 @@
 .. include:: README.md
 """
 
+from . import instrumentation
 from .boundingbox import BoundingBox
-from ._xpathqueries import _XPathQueries
+from ._isoextractor import _ISORecord, _extract_abstract, \
+    _extract_bounding_box, _extract_citation, _extract_doi, \
+    _extract_end_date, _extract_identifier, _extract_keywords, \
+    _extract_start_date, _extract_title, _parse_datetime, _parse_iso_bytes, \
+    _parse_iso_file, _parse_iso_path
 from enum import Enum
-from typing import List
+from typing import Any, Callable, Dict, IO, Optional, Set, cast
 
+import datetime
+import mmap
+import os
+import time
 import xml.etree.ElementTree
 
 __docformat__ = "google"
 
+_ISO_EXTRACTORS: Dict[str, Callable[[_ISORecord], Any]] = {
+    "_title": _extract_title,
+    "_abstract": _extract_abstract,
+    "_identifier": _extract_identifier,
+    "_bounding_box": _extract_bounding_box,
+    "_keywords": _extract_keywords,
+    "_doi": _extract_doi,
+    "_citation": _extract_citation,
+    "_start_date": _extract_start_date,
+    "_end_date": _extract_end_date}
+"""Dataset attributes filled from an ISO record, with their extractors, in
+extraction order"""
+
 
 class DatasetSourceType(Enum):
     """
@@ -18,6 +40,48 @@ class DatasetSourceType(Enum):
     """
     ISO_XML = 1
     """ISO 19139 XML file"""
+    DICT = 2
+    """Dictionary of fields, as returned by `Dataset.to_dict`"""
+    ISO_XML_PATH = 3
+    """Path of an ISO 19139 XML file, as a str or os.PathLike"""
+    ISO_XML_BYTES = 4
+    """ISO 19139 XML document held in a bytes-like object, such as bytes,
+    bytearray, memoryview or mmap.mmap"""
+    ISO_XML_FILE = 5
+    """Binary file object open on an ISO 19139 XML document"""
+
+
+def _parse_iso_source(source: object, source_type: DatasetSourceType) \
+        -> xml.etree.ElementTree.ElementTree:
+    """Parses the document of a DatasetSourceType.ISO_XML_PATH,
+    ISO_XML_BYTES or ISO_XML_FILE source
+
+    Raises:
+        TypeError: If source is not of the type expected for source_type
+    """
+    if source_type == DatasetSourceType.ISO_XML_PATH:
+        if isinstance(source, (str, os.PathLike)):
+            return _parse_iso_path(source)
+    elif source_type == DatasetSourceType.ISO_XML_BYTES:
+        if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            return _parse_iso_bytes(source)
+    elif callable(getattr(source, "read", None)):
+        return _parse_iso_file(cast(IO[bytes], source))
+    raise TypeError
+
+
+def _observe_parse(source: object, source_type: DatasetSourceType,
+                   observer: Optional[instrumentation.Observer]) \
+        -> xml.etree.ElementTree.ElementTree:
+    """As `_parse_iso_source`, reporting the time taken to an observer, if
+    there is one"""
+    if observer is None:
+        return _parse_iso_source(source, source_type)
+    started: float = time.perf_counter()
+    tree: xml.etree.ElementTree.ElementTree = _parse_iso_source(
+        source, source_type)
+    observer.parsed(source_type.name, time.perf_counter() - started)
+    return tree
 
 
 class Dataset(object):
@@ -25,106 +89,239 @@ class Dataset(object):
     Args:
         source (object):
         source_type (DatasetSourceType):
+        lazy (bool): If True, each field is extracted from the source the
+                        first time it is read and then memoized, so callers
+                        only pay for the fields they use. The reference to
+                        the source is dropped once every field has been
+                        read, or when `materialize` is called. Errors in the
+                        source, such as a non-numeric bounding box
+                        coordinate, are then raised on access rather than on
+                        construction.
+
+    Note:
+        For DatasetSourceType.ISO_XML_PATH, ISO_XML_BYTES and ISO_XML_FILE
+        the `Dataset` parses the document itself. Small documents are parsed
+        whole; a document of 1 MiB or more is fed to the parser a chunk at a
+        time, a file is read through a memory map rather than copied into
+        memory, and only the sections of the record which fields are
+        extracted from are kept.
 
     Raises:
-        TypeError: If source is not an xml.etree.ElementTree.ElementTree or
-                        if source_type is not from DatasetSourceType
+        TypeError: If source is not an xml.etree.ElementTree.ElementTree for
+                        DatasetSourceType.ISO_XML, a str or os.PathLike for
+                        DatasetSourceType.ISO_XML_PATH, a bytes-like object
+                        for DatasetSourceType.ISO_XML_BYTES, an object with
+                        a read method for DatasetSourceType.ISO_XML_FILE, or
+                        a dict for DatasetSourceType.DICT, or if source_type
+                        is not from DatasetSourceType
+        xml.etree.ElementTree.ParseError: If a document parsed by the
+                        `Dataset` is not well formed
+        OSError: If the file at an ISO_XML_PATH cannot be read
     """
+    __slots__ = ("_abstract", "_bounding_box", "_citation", "_doi",
+                 "_end_date", "_identifier", "_keywords", "_purpose",
+                 "_source", "_title", "_start_date", "_pending", "_tree",
+                 "_record")
 
-    def __init__(self, source: object, source_type: DatasetSourceType):
+    def __init__(self, source: object, source_type: DatasetSourceType,
+                 lazy: bool = False):
         if not isinstance(source_type, DatasetSourceType):
             raise TypeError
-        if not isinstance(source, xml.etree.ElementTree.ElementTree):
+        if source_type == DatasetSourceType.ISO_XML and \
+                not isinstance(source, xml.etree.ElementTree.ElementTree):
             raise TypeError
+        if source_type == DatasetSourceType.DICT and \
+                not isinstance(source, dict):
+            raise TypeError
+        observer: Optional[instrumentation.Observer] = \
+            instrumentation._observer
+        if source_type not in (DatasetSourceType.ISO_XML,
+                               DatasetSourceType.DICT):
+            source = _observe_parse(source, source_type, observer)
         self._abstract: str = str()
         self._bounding_box: BoundingBox = BoundingBox(float(), float(),
                                                       float(), float())
         self._citation: str = str()
         self._doi: str = str()
-        self._end_date: str = str()
+        self._end_date: Optional[datetime.datetime] = None
         self._identifier: str = str()
         self._keywords: list[str] = list(str())
         self._purpose: str = str()
         self._source: str = str()
         self._title: str = str()
-        self._start_date: str = str()
-        if source_type == DatasetSourceType.ISO_XML:
-            self._dataset_from_iso_xml(source)
+        self._start_date: Optional[datetime.datetime] = None
+        self._pending: Set[str] = set()
+        self._tree: Any = None
+        self._record: Optional[_ISORecord] = None
+        if isinstance(source, xml.etree.ElementTree.ElementTree):
+            if lazy:
+                self._tree = source
+                self._pending.update(_ISO_EXTRACTORS)
+            elif observer is not None:
+                self._observe_iso_xml(source, observer)
+            else:
+                self._dataset_from_iso_xml(source)
+        elif isinstance(source, dict):
+            self._dataset_from_dict(source)
 
     @property
     def abstract(self) -> str:
+        if "_abstract" in self._pending:
+            self._materialize("_abstract")
         return self._abstract
 
     @property
     def bounding_box(self) -> BoundingBox:
+        if "_bounding_box" in self._pending:
+            self._materialize("_bounding_box")
         return self._bounding_box
 
     @property
     def citation_string(self) -> str:
+        if "_citation" in self._pending:
+            self._materialize("_citation")
         return self._citation
 
     @property
     def digital_object_identifier(self) -> str:
+        if "_doi" in self._pending:
+            self._materialize("_doi")
         return self._doi
 
     @property
     def identifier(self) -> str:
+        if "_identifier" in self._pending:
+            self._materialize("_identifier")
         return self._identifier
 
     @property
     def keywords(self) -> list:
+        if "_keywords" in self._pending:
+            self._materialize("_keywords")
         return self._keywords
 
+    @property
+    def end_date(self) -> Optional[datetime.datetime]:
+        """The end of the temporal extent, as a naive datetime in UTC, or
+        None if the extent is open-ended, such as a time series which is
+        still being added to, or has no temporal extent"""
+        if "_end_date" in self._pending:
+            self._materialize("_end_date")
+        return self._end_date
+
+    @property
+    def start_date(self) -> Optional[datetime.datetime]:
+        """The start of the temporal extent, as a naive datetime in UTC, or
+        None if it is not known"""
+        if "_start_date" in self._pending:
+            self._materialize("_start_date")
+        return self._start_date
+
     @property
     def title(self) -> str:
+        if "_title" in self._pending:
+            self._materialize("_title")
         return self._title
 
+    def to_dict(self) -> dict:
+        """Returns the extracted fields of the `Dataset` as a dictionary of
+        plain Python types, suitable for `json.dumps`. Dates are given as
+        ISO 8601 strings, or None."""
+        observer: Optional[instrumentation.Observer] = \
+            instrumentation._observer
+        if observer is None:
+            return self._to_dict()
+        started: float = time.perf_counter()
+        fields: dict = self._to_dict()
+        observer.serialized("fields", time.perf_counter() - started)
+        return fields
+
+    def _to_dict(self) -> dict:
+        return {"identifier": self.identifier,
+                "title": self.title,
+                "abstract": self.abstract,
+                "citation_string": self.citation_string,
+                "digital_object_identifier": self.digital_object_identifier,
+                "keywords": list(self.keywords),
+                "bounding_box": {"north": self.bounding_box.north,
+                                 "south": self.bounding_box.south,
+                                 "east": self.bounding_box.east,
+                                 "west": self.bounding_box.west},
+                "start_date": None if self.start_date is None
+                else self.start_date.isoformat(),
+                "end_date": None if self.end_date is None
+                else self.end_date.isoformat()}
+
+    def materialize(self) -> None:
+        """Extracts every field not yet read from a lazy `Dataset` and drops
+        the reference to its source, so that the source tree can be
+        reclaimed. Does nothing for a `Dataset` which is not lazy."""
+        name: str
+        for name in _ISO_EXTRACTORS:
+            if name in self._pending:
+                self._materialize(name)
+
+    def _materialize(self, name: str) -> None:
+        observer: Optional[instrumentation.Observer] = \
+            instrumentation._observer
+        try:
+            if self._record is None:
+                self._record = _ISORecord(self._tree.getroot())
+            if observer is None:
+                setattr(self, name, _ISO_EXTRACTORS[name](self._record))
+            else:
+                self._observe_field(self._record, name, observer)
+            self._pending.discard(name)
+        except AttributeError as e:
+            if observer is not None:
+                observer.swallowed(name[1:], e)
+            self._pending.clear()
+        if not self._pending:
+            self._tree = None
+            self._record = None
+
     def _dataset_from_iso_xml(self, source: xml.etree.ElementTree.ElementTree):
         try:
-            e: List[xml.etree.ElementTree.Element]
-            i: xml.etree.ElementTree.Element
-            self._title = \
-                _str_from_st_and_xpath(source, _XPathQueries.dataset_title)
-            _abstract: str = \
-                _str_from_st_and_xpath(source, _XPathQueries.dataset_abstract)
-            _abstract = _abstract.strip()
-            self._abstract = _abstract.replace("\n", " ")
-            self._identifier = \
-                _str_from_st_and_xpath(source,
-                                       _XPathQueries.dataset_file_identifier)
-            north: float = float()
-            south: float = float()
-            east: float = float()
-            west: float = float()
-            e = source.findall(_XPathQueries.dataset_bounding_north)
-            for i in e:
-                north = float(str(i.text))
-            e = source.findall(_XPathQueries.dataset_bounding_south)
-            for i in e:
-                south = float(str(i.text))
-            e = source.findall(_XPathQueries.dataset_bounding_east)
-            for i in e:
-                east = float(str(i.text))
-            e = source.findall(_XPathQueries.dataset_bounding_west)
-            for i in e:
-                west = float(str(i.text))
-            self._bounding_box = BoundingBox(north, south, east, west)
-            e = source.findall(_XPathQueries.dataset_themes)
-            for i in e:
-                self._keywords.append(str(i.text))
-            self._doi = \
-                _str_from_st_and_xpath(source, _XPathQueries.dataset_uri)
-            self._citation = \
-                _str_from_st_and_xpath(source, _XPathQueries.dataset_citation)
+            record: _ISORecord = _ISORecord(source.getroot())
+            name: str
+            extractor: Callable[[_ISORecord], Any]
+            for name, extractor in _ISO_EXTRACTORS.items():
+                setattr(self, name, extractor(record))
         except AttributeError:
             pass
 
+    def _observe_iso_xml(self, source: xml.etree.ElementTree.ElementTree,
+                         observer: instrumentation.Observer):
+        """As `_dataset_from_iso_xml`, reporting the time taken and the
+        values found for each field, and any AttributeError swallowed, to
+        an observer"""
+        name: str = "_record"
+        try:
+            record: _ISORecord = _ISORecord(source.getroot())
+            for name in _ISO_EXTRACTORS:
+                self._observe_field(record, name, observer)
+        except AttributeError as e:
+            observer.swallowed(name[1:], e)
+
+    def _observe_field(self, record: _ISORecord, name: str,
+                       observer: instrumentation.Observer):
+        started: float = time.perf_counter()
+        value: Any = _ISO_EXTRACTORS[name](record)
+        seconds: float = time.perf_counter() - started
+        observer.extracted(name[1:], seconds, len(record.resolve(name[1:])))
+        setattr(self, name, value)
 
-def _str_from_st_and_xpath(tree: xml.etree.ElementTree.ElementTree,
-                           xpath: str) -> str:
-    e: List[xml.etree.ElementTree.Element] = tree.findall(xpath)
-    i: xml.etree.ElementTree.Element
-    return_string: str = str()
-    for i in e:
-        return_string = str(i.text)
-    return return_string
+    def _dataset_from_dict(self, source: dict):
+        self._identifier = str(source.get("identifier", str()))
+        self._title = str(source.get("title", str()))
+        self._abstract = str(source.get("abstract", str()))
+        self._citation = str(source.get("citation_string", str()))
+        self._doi = str(source.get("digital_object_identifier", str()))
+        self._keywords = [str(k) for k in source.get("keywords", list())]
+        bb: dict = source.get("bounding_box", dict())
+        self._bounding_box = BoundingBox(float(bb.get("north", float())),
+                                         float(bb.get("south", float())),
+                                         float(bb.get("east", float())),
+                                         float(bb.get("west", float())))
+        self._start_date = _parse_datetime(source.get("start_date"))
+        self._end_date = _parse_datetime(source.get("end_date"), True)
@@ -0,0 +1,409 @@
+from .boundingbox import BoundingBox
+from typing import Any, Dict, FrozenSet, IO, Iterable, Iterator, List, \
+    Optional, Pattern, Tuple, Union
+
+import datetime
+import mmap
+import os
+import re
+import xml.etree.ElementTree
+
+__docformat__ = "google"
+
+_GMD: str = "{http://www.isotc211.org/2005/gmd}"
+_GCO: str = "{http://www.isotc211.org/2005/gco}"
+_GML: Tuple[str, ...] = ("{http://www.opengis.net/gml}",
+                         "{http://www.opengis.net/gml/3.2}")
+"""The GML 3.1 and GML 3.2 namespaces, both of which are found in ISO19139
+records"""
+
+_EXTRACTION_REVISION: int = 2
+"""Revision of the extraction rules beyond the step chains in `_STEP_CHAINS`
+and `_BOUNDS`, such as the clean-up applied to the abstract. Increment it
+whenever extracted values would change, so that cached translations are
+invalidated"""
+
+_CHARACTER_STRING: str = _GCO + "CharacterString"
+_DATA_IDENTIFICATION: str = _GMD + "MD_DataIdentification"
+_DATASET_URI: str = _GMD + "dataSetURI"
+_FILE_IDENTIFIER: str = _GMD + "fileIdentifier"
+_IDENTIFICATION_INFO: str = _GMD + "identificationInfo"
+
+_Step = Union[str, Tuple[str, ...]]
+"""A child step onto the elements with a tag, or with any of a tuple of
+tags"""
+
+_TEMPORAL_EXTENT: Tuple[_Step, ...] = (
+    _DATA_IDENTIFICATION, _GMD + "extent", _GMD + "EX_Extent",
+    _GMD + "temporalElement", _GMD + "EX_TemporalExtent", _GMD + "extent",
+    tuple(ns + "TimePeriod" for ns in _GML))
+
+_STEP_CHAINS: Dict[str, Tuple[_Step, ...]] = {
+    "title": (_DATA_IDENTIFICATION, _GMD + "citation", _GMD + "CI_Citation",
+              _GMD + "title", _CHARACTER_STRING),
+    "abstract": (_DATA_IDENTIFICATION, _GMD + "abstract", _CHARACTER_STRING),
+    "identifier": (_FILE_IDENTIFIER, _CHARACTER_STRING),
+    "bounding_box": (_DATA_IDENTIFICATION, _GMD + "extent",
+                     _GMD + "EX_Extent", _GMD + "geographicElement",
+                     _GMD + "EX_GeographicBoundingBox"),
+    "keywords": (_DATA_IDENTIFICATION, _GMD + "topicCategory",
+                 _GMD + "MD_TopicCategoryCode"),
+    "doi": (_DATASET_URI, _CHARACTER_STRING),
+    "citation": (_DATA_IDENTIFICATION, _GMD + "citation",
+                 _GMD + "CI_Citation", _GMD + "otherCitationDetails",
+                 _CHARACTER_STRING),
+    "start_date": _TEMPORAL_EXTENT + (
+        tuple(ns + "beginPosition" for ns in _GML),),
+    "end_date": _TEMPORAL_EXTENT + (
+        tuple(ns + "endPosition" for ns in _GML),)}
+"""The query of each field, as a chain of child steps from the anchor
+elements named by its first step. These are the only extraction queries in
+the package."""
+
+_BOUNDS: Tuple[Tuple[str, ...], ...] = (
+    (_GMD + "northBoundLatitude", _GCO + "Decimal"),
+    (_GMD + "southBoundLatitude", _GCO + "Decimal"),
+    (_GMD + "eastBoundLongitude", _GCO + "Decimal"),
+    (_GMD + "westBoundLongitude", _GCO + "Decimal"))
+"""The child steps from a geographic bounding box to its north, south, east
+and west bounds, in the order of the `BoundingBox` arguments"""
+
+_DATETIME: Pattern = re.compile(
+    r"(\d{4})(?:-(\d\d)(?:-(\d\d)(?:[T ](\d\d):(\d\d)(?::(\d\d)"
+    r"(?:[.,](\d+))?)?)?)?)?(Z|[+-]\d\d(?::?\d\d)?)?$")
+
+_EPOCH: datetime.datetime = datetime.datetime(1970, 1, 1)
+
+_ANCHORS: FrozenSet[str] = frozenset((_DATASET_URI, _FILE_IDENTIFIER,
+                                      _IDENTIFICATION_INFO))
+
+_CHUNK_SIZE: int = 1 << 16
+"""Number of bytes fed to the parser at a time"""
+
+_PRUNE_THRESHOLD: int = 1 << 20
+"""Size in bytes from which a source is parsed into a pruned tree rather
+than a full one, and from which a file is read through a memory map"""
+
+
+class _ISORecord(object):
+    """The anchor elements of an ISO19115/19139 record, resolved in a single
+    walk of the element tree.
+
+    Every field is found at the end of a descendant step onto one of
+    `gmd:fileIdentifier`, `gmd:dataSetURI` or `gmd:identificationInfo`,
+    followed by child steps. Collecting those anchors in one pass
+    means that every field can then be resolved by walking a handful of
+    child lists, and the `gmd:MD_DataIdentification` nodes are shared
+    between the title, abstract, citation, extent and topic category
+    fields.
+
+    Anchors are kept in document order, which is the order in which
+    `findall` would visit them, so "last match wins" semantics are preserved.
+
+    Args:
+        root (xml.etree.ElementTree.Element): The root element of the record
+
+    Raises:
+        AttributeError: If root is None, as for an empty
+                        xml.etree.ElementTree.ElementTree
+    """
+    __slots__ = ("file_identifiers", "dataset_uris", "data_identifications")
+
+    def __init__(self, root: Optional[xml.etree.ElementTree.Element]):
+        if root is None:
+            raise AttributeError("the record has no root element")
+        self.file_identifiers: List[xml.etree.ElementTree.Element] = list()
+        self.dataset_uris: List[xml.etree.ElementTree.Element] = list()
+        self.data_identifications: List[xml.etree.ElementTree.Element] = \
+            list()
+        e: xml.etree.ElementTree.Element
+        tag: str
+        for e in root.iter():
+            if e is root:
+                continue
+            tag = e.tag
+            if tag == _IDENTIFICATION_INFO:
+                self.data_identifications.extend(
+                    _children([e], _DATA_IDENTIFICATION))
+            elif tag == _FILE_IDENTIFIER:
+                self.file_identifiers.append(e)
+            elif tag == _DATASET_URI:
+                self.dataset_uris.append(e)
+
+    def resolve(self, field: str) -> List[xml.etree.ElementTree.Element]:
+        """Returns the elements matched by the query of a field in
+        `_STEP_CHAINS`, in document order
+
+        Raises:
+            KeyError: If field has no query
+        """
+        chain: Tuple[_Step, ...] = _STEP_CHAINS[field]
+        anchors: List[xml.etree.ElementTree.Element] = \
+            self.data_identifications \
+            if chain[0] == _DATA_IDENTIFICATION else \
+            self.file_identifiers if chain[0] == _FILE_IDENTIFIER else \
+            self.dataset_uris
+        return _children(anchors, *chain[1:])
+
+
+def _children(elements: List[xml.etree.ElementTree.Element],
+              *steps: _Step) -> List[xml.etree.ElementTree.Element]:
+    """Follow a chain of child steps from each of a list of elements, keeping
+    matches in the same order as `findall` would return them"""
+    step: _Step
+    for step in steps:
+        if isinstance(step, str):
+            elements = [c for e in elements for c in e if c.tag == step]
+        else:
+            elements = [c for e in elements for c in e if c.tag in step]
+    return elements
+
+
+def _last_text(elements: List[xml.etree.ElementTree.Element]) -> str:
+    if not elements:
+        return str()
+    return str(elements[-1].text)
+
+
+def _last_float(elements: List[xml.etree.ElementTree.Element]) -> float:
+    if not elements:
+        return float()
+    return float(str(elements[-1].text))
+
+
+def _period_end(value: datetime.datetime, fields: tuple) \
+        -> datetime.datetime:
+    """Returns the last instant of the period of reduced precision, a year,
+    month, day or minute, which starts at value
+
+    Raises:
+        OverflowError: If the period ends after `datetime.datetime.max`
+    """
+    if fields[5] is not None:
+        return value
+    if fields[3] is not None:
+        value += datetime.timedelta(minutes=1)
+    elif fields[2] is not None:
+        value += datetime.timedelta(days=1)
+    elif fields[1] is not None:
+        value = (value + datetime.timedelta(days=31)).replace(day=1)
+    else:
+        value = value.replace(year=value.year + 1)
+    return value - datetime.timedelta(microseconds=1)
+
+
+def _parse_datetime(text: Optional[str], end: bool = False) \
+        -> Optional[datetime.datetime]:
+    """Parses an ISO 8601 date or date and time, as used for GML time
+    positions, into a naive `datetime.datetime` in UTC. A time with a UTC
+    offset is converted to UTC, and one without is taken to be in UTC
+    already. A value of reduced precision, such as "2010" or "2010-06", is
+    taken as the start of that period, or as its last instant if end is
+    True, so that an extent ending in "2010" covers the whole of 2010.
+
+    Returns:
+        The parsed value, or None if text is None, empty or not an ISO 8601
+        date
+    """
+    if text is None:
+        return None
+    match: Optional["re.Match"] = _DATETIME.match(text.strip())
+    if match is None:
+        return None
+    fields: tuple = match.groups()
+    try:
+        value: datetime.datetime = datetime.datetime(
+            int(fields[0]), int(fields[1] or 1), int(fields[2] or 1),
+            int(fields[3] or 0), int(fields[4] or 0), int(fields[5] or 0),
+            int((fields[6] or "0")[:6].ljust(6, "0")))
+        if end:
+            value = _period_end(value, fields)
+    except (OverflowError, ValueError):
+        return None
+    offset: Optional[str] = fields[7]
+    if offset and offset != "Z":
+        minutes: int = int(offset[1:3]) * 60
+        if len(offset) > 3:
+            minutes += int(offset[-2:])
+        value -= datetime.timedelta(
+            minutes=minutes if offset[0] == "+" else -minutes)
+    return value
+
+
+def _timestamp(value: Optional[datetime.datetime],
+               default: float = float("nan")) -> float:
+    """Converts a naive `datetime.datetime` in UTC to seconds since the
+    epoch, or returns default for None. An aware value is converted to UTC
+    first."""
+    if value is None:
+        return default
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return (value - _EPOCH).total_seconds()
+
+
+def _extract_title(record: _ISORecord) -> str:
+    return _last_text(record.resolve("title"))
+
+
+def _extract_abstract(record: _ISORecord) -> str:
+    abstract: str = _last_text(record.resolve("abstract"))
+    return abstract.strip().replace("\n", " ")
+
+
+def _extract_identifier(record: _ISORecord) -> str:
+    return _last_text(record.resolve("identifier"))
+
+
+def _extract_bounding_box(record: _ISORecord) -> BoundingBox:
+    boxes: List[xml.etree.ElementTree.Element] = \
+        record.resolve("bounding_box")
+    return BoundingBox(*(_last_float(_children(boxes, *steps))
+                         for steps in _BOUNDS))
+
+
+def _extract_keywords(record: _ISORecord) -> List[str]:
+    return [str(e.text) for e in record.resolve("keywords")]
+
+
+def _extract_doi(record: _ISORecord) -> str:
+    return _last_text(record.resolve("doi"))
+
+
+def _extract_start_date(record: _ISORecord) -> Optional[datetime.datetime]:
+    positions: List[xml.etree.ElementTree.Element] = \
+        record.resolve("start_date")
+    return _parse_datetime(positions[-1].text) if positions else None
+
+
+def _extract_end_date(record: _ISORecord) -> Optional[datetime.datetime]:
+    positions: List[xml.etree.ElementTree.Element] = \
+        record.resolve("end_date")
+    return _parse_datetime(positions[-1].text, True) if positions else None
+
+
+def _extract_citation(record: _ISORecord) -> str:
+    return _last_text(record.resolve("citation"))
+
+
+class _Pruner(object):
+    """The state of `_parse_pruned`: the open elements not inside an anchor,
+    whether each has an anchor beneath it and so must be kept, and the depth
+    within the anchor being read, if any"""
+    __slots__ = ("root", "parents", "kept", "anchored")
+
+    def __init__(self):
+        self.root: Optional[xml.etree.ElementTree.Element] = None
+        self.parents: List[xml.etree.ElementTree.Element] = list()
+        self.kept: List[bool] = list()
+        self.anchored: int = 0
+
+    def start(self, e: xml.etree.ElementTree.Element):
+        if self.anchored:
+            self.anchored += 1
+            return
+        if self.root is None:
+            self.root = e
+        elif e.tag in _ANCHORS:
+            self.anchored = 1
+            return
+        self.parents.append(e)
+        self.kept.append(False)
+
+    def end(self, e: xml.etree.ElementTree.Element):
+        if self.anchored:
+            self.anchored -= 1
+            if not self.anchored:
+                self.kept[-1] = True
+            return
+        self.parents.pop()
+        if self.kept.pop():
+            if self.kept:
+                self.kept[-1] = True
+        elif self.parents:
+            self.parents[-1].remove(e)
+
+
+def _parse_pruned(chunks: Iterable[Any]) -> xml.etree.ElementTree.ElementTree:
+    """Parse a document fed a chunk at a time into a tree which keeps only
+    the anchors of `_ISORecord`, with their subtrees and their ancestors.
+
+    Every other element is dropped as soon as its end tag is read, so the
+    memory held by the tree is bounded by the size of the identification
+    sections rather than of the whole document, which for large records is
+    mostly content, distribution and data quality information. Nothing a
+    query can match is dropped, and the order of the anchors is unchanged,
+    so the extracted fields are exactly those of the full tree.
+
+    Parsing cannot stop before the end of the document, as a later anchor
+    would win over an earlier one.
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the document is not well formed
+    """
+    parser: xml.etree.ElementTree.XMLPullParser = \
+        xml.etree.ElementTree.XMLPullParser(events=("start", "end"))
+    pruner: _Pruner = _Pruner()
+    chunk: Any
+    event: Tuple[Any, ...]
+    e: object
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event in parser.read_events():
+            e = event[-1]
+            if not isinstance(e, xml.etree.ElementTree.Element):
+                continue
+            if event[0] == "start":
+                pruner.start(e)
+            else:
+                pruner.end(e)
+    parser.close()
+    return xml.etree.ElementTree.ElementTree(pruner.root)
+
+
+def _buffer_chunks(view: memoryview) -> Iterator[bytes]:
+    i: int
+    for i in range(0, view.nbytes, _CHUNK_SIZE):
+        yield view[i:i + _CHUNK_SIZE].tobytes()
+
+
+def _file_chunks(source: IO[bytes]) -> Iterator[bytes]:
+    chunk: bytes = source.read(_CHUNK_SIZE)
+    while chunk:
+        yield chunk
+        chunk = source.read(_CHUNK_SIZE)
+
+
+def _parse_iso_bytes(source: Union[bytes, bytearray, memoryview, mmap.mmap]) \
+        -> xml.etree.ElementTree.ElementTree:
+    """Parse an ISO19115/19139 record held in a bytes-like object, in place
+    and without copying it whole, pruning the tree if the record is at least
+    `_PRUNE_THRESHOLD` bytes long"""
+    with memoryview(source) as view:
+        if view.nbytes < _PRUNE_THRESHOLD:
+            return xml.etree.ElementTree.ElementTree(
+                xml.etree.ElementTree.XML(view))
+        with view.cast("B") as octets:
+            return _parse_pruned(_buffer_chunks(octets))
+
+
+def _parse_iso_path(source: Union[str, "os.PathLike[str]"]) \
+        -> xml.etree.ElementTree.ElementTree:
+    """Parse an ISO19115/19139 record from a file. A file of at least
+    `_PRUNE_THRESHOLD` bytes is read through a memory map into a pruned
+    tree."""
+    f: IO[bytes]
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _PRUNE_THRESHOLD:
+            tree: xml.etree.ElementTree.ElementTree = \
+                xml.etree.ElementTree.ElementTree()
+            tree.parse(f)
+            return tree
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            return _parse_iso_bytes(m)
+
+
+def _parse_iso_file(source: IO[bytes]) -> xml.etree.ElementTree.ElementTree:
+    """Parse an ISO19115/19139 record from a binary file object, read a
+    chunk at a time into a pruned tree"""
+    return _parse_pruned(_file_chunks(source))
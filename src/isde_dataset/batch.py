@@ -0,0 +1,221 @@
+from . import Dataset, DatasetSourceType, dcat, schemaorg
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, \
+    Optional, Set, Tuple, Union
+
+import argparse
+import collections
+import concurrent.futures
+import glob
+import json
+import os
+import sys
+
+__docformat__ = "google"
+
+
+class BatchResult(object):
+    """The outcome of translating a single file in a batch
+
+    Args:
+        path (str): The file which was translated
+        result (object): The `Dataset`, or its serialised form, or None if
+                            the translation failed
+        error (Exception): The exception raised while translating the file,
+                            or None on success
+    """
+    def __init__(self, path: str, result: Any = None,
+                 error: Optional[BaseException] = None):
+        self._path: str = path
+        self._result: Any = result
+        self._error: Optional[BaseException] = error
+
+    @property
+    def path(self) -> str:
+        """str: The file which was translated"""
+        return self._path
+
+    @property
+    def result(self) -> Any:
+        """object: The `Dataset` or its serialised form, or None on failure"""
+        return self._result
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """Exception: The exception raised for the file, or None on success"""
+        return self._error
+
+    @property
+    def ok(self) -> bool:
+        """bool: True if the file was translated without error"""
+        return self._error is None
+
+
+def expand_sources(sources: Union[str, Iterable[str]]) -> List[str]:
+    """Expands directories and glob patterns into a sorted list of files
+
+    Args:
+        sources (str or iterable of str): Directories, whose `*.xml` files
+                    are taken, glob patterns or plain file paths
+
+    Returns:
+        list of str: The matching file paths, without duplicates
+    """
+    if isinstance(sources, str):
+        sources = [sources]
+    paths: List[str] = list()
+    seen: Set[str] = set()
+    source: str
+    path: str
+    for source in sources:
+        if os.path.isdir(source):
+            matches = sorted(glob.glob(os.path.join(source, "*.xml")))
+        elif any(c in source for c in "*?["):
+            matches = sorted(glob.glob(source, recursive=True))
+        else:
+            matches = [source]
+        for path in matches:
+            if path not in seen:
+                seen.add(path)
+                paths.append(path)
+    return paths
+
+
+def _translate_chunk(paths: List[str],
+                     serializer: Optional[Callable[[Dataset], Any]]) \
+        -> List[BatchResult]:
+    results: List[BatchResult] = list()
+    path: str
+    for path in paths:
+        try:
+            ds: Dataset = Dataset(path, DatasetSourceType.ISO_XML_PATH)
+            results.append(BatchResult(
+                path, ds if serializer is None else serializer(ds)))
+        except Exception as e:
+            results.append(BatchResult(path, error=e))
+    return results
+
+
+def _chunks(paths: List[str], chunk_size: int) -> Iterator[List[str]]:
+    i: int
+    for i in range(0, len(paths), chunk_size):
+        yield paths[i:i + chunk_size]
+
+
+def translate_files(sources: Union[str, Iterable[str]],
+                    workers: Optional[int] = None, chunk_size: int = 16,
+                    ordered: bool = True,
+                    serializer: Optional[Callable[[Dataset], Any]] = None) \
+        -> Iterator[BatchResult]:
+    """Translates ISO19115/19139 XML files across a pool of processes
+
+    Files are parsed in the worker processes, and only the `Dataset`, or the
+    output of `serializer`, is sent back to the parent, so element trees are
+    never pickled. A failure in one file is reported as a `BatchResult` with
+    `error` set and does not abort the batch. If a whole chunk fails, for
+    instance because its worker died or its results could not be pickled,
+    every file of the chunk is reported with that error. At most two chunks
+    per worker are in flight at any time, so very large batches are not
+    queued up front.
+
+    Args:
+        sources (str or iterable of str): Directories, glob patterns or files
+                    to translate, as accepted by `expand_sources`
+        workers (int): Number of worker processes, defaulting to the number
+                    of CPUs
+        chunk_size (int): Number of files sent to a worker at a time
+        ordered (bool): If True results are yielded in input order, otherwise
+                    they are yielded as soon as each chunk completes
+        serializer (callable): An optional picklable function, such as a
+                    module level function, applied to each `Dataset` in the
+                    worker process
+
+    Yields:
+        BatchResult: One result per input file
+
+    Raises:
+        ValueError: If workers or chunk_size is less than 1
+    """
+    if workers is not None and workers < 1:
+        raise ValueError("workers must be at least 1")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    chunks: Iterator[List[str]] = _chunks(expand_sources(sources), chunk_size)
+    with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+        window: int = 2 * (workers or os.cpu_count() or 1)
+        pending: Deque[Tuple[List[str], concurrent.futures.Future]] = \
+            collections.deque()
+        chunk: List[str]
+        for chunk in chunks:
+            pending.append((chunk, executor.submit(_translate_chunk, chunk,
+                                                   serializer)))
+            if len(pending) >= window:
+                yield from _drain(pending, ordered, window - 1)
+        yield from _drain(pending, ordered, 0)
+
+
+def _drain(pending: Deque[Tuple[List[str], concurrent.futures.Future]],
+           ordered: bool, keep: int) -> Iterator[BatchResult]:
+    entry: Tuple[List[str], concurrent.futures.Future]
+    while len(pending) > keep:
+        if ordered:
+            entry = pending.popleft()
+        else:
+            done: concurrent.futures.Future = next(
+                concurrent.futures.as_completed(f for _, f in pending))
+            entry = next(e for e in pending if e[1] is done)
+            pending.remove(entry)
+        try:
+            results: List[BatchResult] = entry[1].result()
+        except Exception as e:
+            results = [BatchResult(path, error=e) for path in entry[0]]
+        yield from results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Console entry point which writes one JSON object per translated file
+    to standard output, either the `Dataset` fields or a schema.org JSON-LD
+    document, or a DCAT Turtle document per file, and reports failures on
+    standard error
+
+    Returns:
+        int: 0 if every file was translated, otherwise 1
+    """
+    parser = argparse.ArgumentParser(
+        prog="isde-translate",
+        description="Translate ISO19115/19139 XML files in parallel")
+    parser.add_argument("sources", nargs="+",
+                        help="directories, glob patterns or files")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes")
+    parser.add_argument("-c", "--chunk-size", type=int, default=16,
+                        help="number of files sent to a worker at a time")
+    parser.add_argument("-u", "--unordered", action="store_true",
+                        help="write results as soon as they are ready")
+    parser.add_argument("-f", "--format", choices=sorted(_FORMATS),
+                        default="fields", help="output format")
+    args = parser.parse_args(argv)
+    failures: int = 0
+    result: BatchResult
+    for result in translate_files(args.sources, args.workers,
+                                  args.chunk_size, not args.unordered,
+                                  _FORMATS[args.format]):
+        if result.ok:
+            sys.stdout.write(result.result.rstrip("\n") + "\n")
+        else:
+            failures += 1
+            sys.stderr.write("%s: %s\n" % (result.path, result.error))
+    return 1 if failures else 0
+
+
+def _dataset_to_json(ds: Dataset) -> str:
+    return json.dumps(ds.to_dict(), ensure_ascii=False)
+
+
+_FORMATS: Dict[str, Callable[[Dataset], str]] = {
+    "dcat": dcat.dumps,
+    "fields": _dataset_to_json,
+    "schema.org": schemaorg.dumps}
+
+
+if __name__ == "__main__":
+    sys.exit(main())
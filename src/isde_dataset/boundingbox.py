@@ -27,6 +27,8 @@ class BoundingBox(object):
         TypeError if any input variables are not of type float
 
     """
+    __slots__ = ("_north", "_south", "_east", "_west")
+
     def __init__(self, north: float, south: float, east: float, west: float):
         self._north: float = float()
         self._south: float = float()
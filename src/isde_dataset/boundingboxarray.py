@@ -0,0 +1,322 @@
+from .boundingbox import BoundingBox
+from array import array
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, \
+    Tuple, Union
+
+import math
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore[assignment]
+
+__docformat__ = "google"
+
+EARTH_RADIUS: float = 6371008.8
+"""Mean radius of the Earth in metres, for `BoundingBoxArray.area`"""
+
+_OVERLAP_BLOCK: int = 1 << 18
+"""Number of box pairs tested at a time by `BoundingBoxArray.overlap_matrix`"""
+
+
+def _width(east: float, west: float) -> float:
+    return east - west if east >= west else east - west + 360.0
+
+
+class BoundingBoxArray(object):
+    """A fixed collection of N bounding boxes held in four contiguous float
+    buffers, with batch geometric predicates
+
+    When NumPy is installed the buffers are `numpy.ndarray`s and every
+    operation is vectorised, and boolean results are returned as NumPy
+    arrays. Otherwise the buffers are `array('d')`s, the operations are
+    plain Python loops and boolean results are returned as lists.
+
+    Note:
+        As for `BoundingBox`, a box whose east extent is less than its west
+        extent is taken to cross the antimeridian, and its longitudinal
+        extent runs eastwards from west, through 180, to east. Longitudes are
+        taken to be in degrees.
+
+    Args:
+        boxes (iterable of BoundingBox): The boxes held by the array
+        use_numpy (bool): Whether to use NumPy, defaulting to whether it is
+                            installed
+
+    Raises:
+        TypeError: If an item of boxes is not a `BoundingBox`
+        ImportError: If use_numpy is True and NumPy is not installed
+    """
+    def __init__(self, boxes: Iterable[BoundingBox] = (),
+                 use_numpy: Optional[bool] = None):
+        north: array = array("d")
+        south: array = array("d")
+        east: array = array("d")
+        west: array = array("d")
+        bb: BoundingBox
+        for bb in boxes:
+            if not isinstance(bb, BoundingBox):
+                raise TypeError
+            north.append(bb.north)
+            south.append(bb.south)
+            east.append(bb.east)
+            west.append(bb.west)
+        self._set_columns(north, south, east, west, use_numpy)
+
+    @classmethod
+    def from_columns(cls, north: Sequence[float], south: Sequence[float],
+                     east: Sequence[float], west: Sequence[float],
+                     use_numpy: Optional[bool] = None) \
+            -> "BoundingBoxArray":
+        """Builds a `BoundingBoxArray` from four sequences of extents, such as
+        the columns of a `isde_dataset.collection.DatasetCollection`
+
+        Raises:
+            ValueError: If the sequences differ in length
+        """
+        if not len(north) == len(south) == len(east) == len(west):
+            raise ValueError("columns must all have the same length")
+        boxes: BoundingBoxArray = cls.__new__(cls)
+        boxes._set_columns(array("d", north), array("d", south),
+                           array("d", east), array("d", west), use_numpy)
+        return boxes
+
+    def _set_columns(self, north: array, south: array, east: array,
+                     west: array, use_numpy: Optional[bool]):
+        if use_numpy is None:
+            use_numpy = numpy is not None
+        elif use_numpy and numpy is None:
+            raise ImportError("NumPy is not installed")
+        self._numpy: bool = use_numpy
+        self._north: Any = numpy.frombuffer(north) if use_numpy else north
+        self._south: Any = numpy.frombuffer(south) if use_numpy else south
+        self._east: Any = numpy.frombuffer(east) if use_numpy else east
+        self._west: Any = numpy.frombuffer(west) if use_numpy else west
+
+    def __len__(self) -> int:
+        return len(self._north)
+
+    def __getitem__(self, i: int) -> BoundingBox:
+        return BoundingBox(float(self._north[i]), float(self._south[i]),
+                           float(self._east[i]), float(self._west[i]))
+
+    def __iter__(self) -> Iterator[BoundingBox]:
+        i: int
+        for i in range(len(self)):
+            yield self[i]
+
+    @property
+    def north(self) -> Any:
+        """The northernmost extent of every box"""
+        return self._north
+
+    @property
+    def south(self) -> Any:
+        """The southernmost extent of every box"""
+        return self._south
+
+    @property
+    def east(self) -> Any:
+        """The easternmost extent of every box"""
+        return self._east
+
+    @property
+    def west(self) -> Any:
+        """The westernmost extent of every box"""
+        return self._west
+
+    def widths(self) -> Any:
+        """Returns the longitudinal extent of every box in degrees, allowing
+        for boxes which cross the antimeridian"""
+        if self._numpy:
+            return numpy.where(self._east >= self._west,
+                               self._east - self._west,
+                               self._east - self._west + 360.0)
+        return array("d", map(_width, self._east, self._west))
+
+    def area(self, spherical: bool = False,
+             radius: float = EARTH_RADIUS) -> Any:
+        """Returns the area of every box
+
+        Args:
+            spherical (bool): If False the area is in square degrees,
+                                otherwise it is the area of the box on a
+                                sphere, in the square of the units of radius
+            radius (float): The radius of the sphere
+        """
+        widths: Any = self.widths()
+        if self._numpy:
+            if spherical:
+                return radius * radius * numpy.radians(widths) * (
+                    numpy.sin(numpy.radians(self._north)) -
+                    numpy.sin(numpy.radians(self._south)))
+            return widths * (self._north - self._south)
+        if spherical:
+            return array("d", (
+                radius * radius * math.radians(w) *
+                (math.sin(math.radians(n)) - math.sin(math.radians(s)))
+                for w, n, s in zip(widths, self._north, self._south)))
+        return array("d", (w * (n - s) for w, n, s in
+                           zip(widths, self._north, self._south)))
+
+    def intersects(self, other: Union[BoundingBox, "BoundingBoxArray"]) \
+            -> Any:
+        """Tests whether each box shares at least one point with other
+
+        Args:
+            other (BoundingBox or BoundingBoxArray): A single box, tested
+                    against every box, or an array of the same length,
+                    tested pairwise
+
+        Returns:
+            A boolean per box
+        """
+        n, s, e, w = self._operand(other)
+        return self._intersects(n, s, e, w)
+
+    def contains(self, other: Union[BoundingBox, Tuple[float, float]]) \
+            -> Any:
+        """Tests whether each box wholly contains a box or a point
+
+        Args:
+            other (BoundingBox or tuple): A box, or a point given as a
+                                            (latitude, longitude) tuple
+
+        Returns:
+            A boolean per box
+        """
+        if not isinstance(other, BoundingBox):
+            other = BoundingBox(float(other[0]), float(other[0]),
+                                float(other[1]), float(other[1]))
+        n: float = other.north
+        s: float = other.south
+        w: float = other.west
+        width: float = _width(other.east, other.west)
+        if self._numpy:
+            widths: Any = self.widths()
+            return (self._south <= s) & (n <= self._north) & (
+                (widths >= 360.0) |
+                (numpy.mod(w - self._west, 360.0) + width <= widths))
+        return [bs <= s and n <= bn and
+                (bw_ >= 360.0 or (w - bw) % 360.0 + width <= bw_)
+                for bn, bs, bw, bw_ in zip(self._north, self._south,
+                                           self._west, self.widths())]
+
+    def union(self) -> Optional[BoundingBox]:
+        """Returns the smallest `BoundingBox` enclosing every box, or None if
+        the array is empty. The longitudinal extent is the shortest arc
+        covering every box, so the union crosses the antimeridian when that
+        is the tighter fit."""
+        if not len(self):
+            return None
+        north: float = float(max(self._north))
+        south: float = float(min(self._south))
+        gap: float
+        east: int
+        west: int
+        if self._numpy:
+            gap, east, west = self._largest_gap_numpy()
+        else:
+            gap, east, west = self._largest_gap()
+        if gap <= 0.0:
+            return BoundingBox(north, south, 180.0, -180.0)
+        return BoundingBox(north, south, float(self._east[east]),
+                           float(self._west[west]))
+
+    def _largest_gap(self) -> Tuple[float, int, int]:
+        """Finds the longest arc of longitude not covered by any box, by
+        sweeping the boxes in order of west extent starting from the
+        furthest reach of any box wrapped round by 360 degrees. Returns the
+        length of the arc, the box whose east extent starts it and the box
+        whose west extent ends it."""
+        starts: List[float] = [((w + 180.0) % 360.0) - 180.0
+                               for w in self._west]
+        ends: List[float] = [s + w for s, w in zip(starts, self.widths())]
+        furthest: int = max(range(len(ends)), key=ends.__getitem__)
+        reach: Tuple[float, int] = (ends[furthest] - 360.0, furthest)
+        gap: Tuple[float, int, int] = (-1.0, 0, 0)
+        i: int
+        for i in sorted(range(len(starts)), key=starts.__getitem__):
+            if starts[i] - reach[0] > gap[0]:
+                gap = (starts[i] - reach[0], reach[1], i)
+            if ends[i] > reach[0]:
+                reach = (ends[i], i)
+        return gap
+
+    def _largest_gap_numpy(self) -> Tuple[float, int, int]:
+        starts: Any = numpy.mod(self._west + 180.0, 360.0) - 180.0
+        order: Any = numpy.argsort(starts, kind="stable")
+        starts = starts[order]
+        ends: Any = starts + self.widths()[order]
+        furthest: int = int(numpy.argmax(ends))
+        reach: Any = numpy.maximum.accumulate(
+            numpy.concatenate(([ends[furthest] - 360.0], ends[:-1])))
+        gaps: Any = starts - reach
+        i: int = int(numpy.argmax(gaps))
+        j: int = furthest
+        if i and ends[:i].max() > ends[furthest] - 360.0:
+            j = int(numpy.argmax(ends[:i]))
+        return float(gaps[i]), int(order[j]), int(order[i])
+
+    def overlap_matrix(self, other: "BoundingBoxArray") -> Any:
+        """Tests every box against every box of another array
+
+        Args:
+            other (BoundingBoxArray): The M boxes to test against
+
+        Returns:
+            An N by M matrix of booleans, as a NumPy array or a list of lists.
+            With NumPy the matrix is filled in blocks of rows, so temporary
+            arrays stay small however large the matrix
+        """
+        if self._numpy:
+            n: Any = numpy.asarray(other.north)[numpy.newaxis, :]
+            s: Any = numpy.asarray(other.south)[numpy.newaxis, :]
+            e: Any = numpy.asarray(other.east)[numpy.newaxis, :]
+            w: Any = numpy.asarray(other.west)[numpy.newaxis, :]
+            matrix: Any = numpy.empty((len(self), len(other)), dtype=bool)
+            rows: int = max(1, _OVERLAP_BLOCK // max(1, len(other)))
+            i: int
+            for i in range(0, len(self), rows):
+                block: slice = slice(i, i + rows)
+                matrix[block] = self._intersects(
+                    n, s, e, w,
+                    self._north[block, numpy.newaxis],
+                    self._south[block, numpy.newaxis],
+                    self._east[block, numpy.newaxis],
+                    self._west[block, numpy.newaxis])
+            return matrix
+        return [other.intersects(bb) for bb in self]
+
+    def _operand(self, other: Union[BoundingBox, "BoundingBoxArray"]) \
+            -> Tuple[Any, Any, Any, Any]:
+        if isinstance(other, BoundingBox):
+            if self._numpy:
+                return other.north, other.south, other.east, other.west
+            return ([other.north] * len(self), [other.south] * len(self),
+                    [other.east] * len(self), [other.west] * len(self))
+        if not isinstance(other, BoundingBoxArray):
+            raise TypeError
+        if len(other) != len(self):
+            raise ValueError("arrays must have the same length")
+        if self._numpy:
+            return (numpy.asarray(other.north), numpy.asarray(other.south),
+                    numpy.asarray(other.east), numpy.asarray(other.west))
+        return other.north, other.south, other.east, other.west
+
+    def _intersects(self, n: Any, s: Any, e: Any, w: Any,
+                    bn: Any = None, bs: Any = None, be: Any = None,
+                    bw: Any = None) -> Any:
+        if bn is None:
+            bn, bs, be, bw = self._north, self._south, self._east, self._west
+        if self._numpy:
+            width: Any = numpy.where(e >= w, e - w, e - w + 360.0)
+            bwidth: Any = numpy.where(be >= bw, be - bw, be - bw + 360.0)
+            return (bs <= n) & (s <= bn) & (
+                (numpy.mod(w - bw, 360.0) <= bwidth) |
+                (numpy.mod(bw - w, 360.0) <= width))
+        return [bs_ <= n_ and s_ <= bn_ and
+                ((w_ - bw_) % 360.0 <= _width(be_, bw_) or
+                 (bw_ - w_) % 360.0 <= _width(e_, w_))
+                for n_, s_, e_, w_, bn_, bs_, be_, bw_ in
+                zip(n, s, e, w, bn, bs, be, bw)]
@@ -0,0 +1,286 @@
+from . import Dataset, DatasetSourceType
+from ._isoextractor import _BOUNDS, _EXTRACTION_REVISION, _STEP_CHAINS
+from typing import Dict, Optional, Union
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+__docformat__ = "google"
+
+_COMMIT_BATCH: int = 64
+"""Number of writes, whether stores or the recency updates made by lookups,
+between commits"""
+
+
+def extraction_rules_version() -> str:
+    """Returns a short digest of the extraction rules, made from the step
+    chains followed by the extraction engine and its revision, which changes
+    whenever the rules do"""
+    rules: tuple = (sorted(_STEP_CHAINS.items()), _BOUNDS,
+                    _EXTRACTION_REVISION)
+    return hashlib.sha1(repr(rules).encode()).hexdigest()[:16]
+
+
+class TranslationCache(object):
+    """An on-disk cache of translated ISO19115/19139 records, so that records
+    which have not changed since a previous harvest are served without being
+    parsed
+
+    Entries are kept in an SQLite database and keyed by the SHA-256 digest of
+    the source bytes together with `extraction_rules_version`, so a change to
+    the extraction rules invalidates every entry. Each entry holds the
+    extracted fields of the `Dataset` and, optionally, any number of
+    serialised outputs of it. Once the stored entries exceed max_bytes the
+    least recently used are evicted. Lookups record when each entry was last
+    used. Stores and these recency updates are committed together in
+    batches of `_COMMIT_BATCH` writes, and on `close`, so a crash loses at
+    most the last batch, which only costs those records being translated
+    again.
+
+    The cache is meant to be written by a single process at a time.
+
+    Args:
+        directory (str): The directory holding the cache, which is created
+                            if needed
+        max_bytes (int): The largest total size of the stored fields and
+                            outputs
+        filename (str): The name of the database file within directory
+
+    Raises:
+        ValueError: If max_bytes is less than 1
+    """
+    def __init__(self, directory: str, max_bytes: int = 1 << 30,
+                 filename: str = "translations.sqlite"):
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        os.makedirs(directory, exist_ok=True)
+        self._max_bytes: int = max_bytes
+        self._version: str = extraction_rules_version()
+        self._connection: sqlite3.Connection = sqlite3.connect(
+            os.path.join(directory, filename))
+        self._connection.executescript(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " digest TEXT NOT NULL, version TEXT NOT NULL,"
+            " fields TEXT NOT NULL, size INTEGER NOT NULL,"
+            " source_size INTEGER NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (digest, version));"
+            "CREATE INDEX IF NOT EXISTS entries_last_used"
+            " ON entries (last_used);"
+            "CREATE TABLE IF NOT EXISTS outputs ("
+            " digest TEXT NOT NULL, version TEXT NOT NULL,"
+            " format TEXT NOT NULL, value TEXT NOT NULL,"
+            " PRIMARY KEY (digest, version, format));")
+        self._size: int = self._connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        self._hits: int = 0
+        self._misses: int = 0
+        self._bytes_saved: int = 0
+        self._output_hits: int = 0
+        self._output_misses: int = 0
+        self._evictions: int = 0
+        self._writes: int = 0
+
+    def __enter__(self) -> "TranslationCache":
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Commits any pending changes and closes the database"""
+        self._commit()
+        self._connection.close()
+
+    def translate(self, source: Union[bytes, str]) -> Dataset:
+        """Returns the `Dataset` for an ISO19115/19139 record, from the cache
+        if the record has been translated before, otherwise by parsing it and
+        storing the result
+
+        Args:
+            source (bytes or str): The record itself, or the path of a file
+                                    holding it
+
+        Raises:
+            xml.etree.ElementTree.ParseError: If a record to be parsed is not
+                                                well formed
+        """
+        data: bytes = _read(source)
+        dataset: Optional[Dataset] = self.get(data)
+        if dataset is None:
+            dataset = Dataset(data, DatasetSourceType.ISO_XML_BYTES)
+            self.put(data, dataset)
+        return dataset
+
+    def get(self, source: Union[bytes, str]) -> Optional[Dataset]:
+        """Returns the cached `Dataset` for a record, or None on a miss
+
+        Args:
+            source (bytes or str): The record itself, or the path of a file
+                                    holding it
+        """
+        data: bytes = _read(source)
+        digest: str = hashlib.sha256(data).hexdigest()
+        row: Optional[tuple] = self._connection.execute(
+            "SELECT fields FROM entries WHERE digest = ? AND version = ?",
+            (digest, self._version)).fetchone()
+        if row is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._bytes_saved += len(data)
+        self._touch(digest)
+        return Dataset(json.loads(row[0]), DatasetSourceType.DICT)
+
+    def put(self, source: Union[bytes, str], dataset: Dataset):
+        """Stores the `Dataset` translated from a record, replacing any
+        entry for the same record along with its outputs
+
+        Args:
+            source (bytes or str): The record itself, or the path of a file
+                                    holding it
+            dataset (Dataset): The translation of the record
+        """
+        data: bytes = _read(source)
+        digest: str = hashlib.sha256(data).hexdigest()
+        fields: str = json.dumps(dataset.to_dict(), ensure_ascii=False)
+        self._delete(digest)
+        self._connection.execute(
+            "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+            (digest, self._version, fields, len(fields.encode()), len(data),
+             time.time()))
+        self._size += len(fields.encode())
+        self._evict()
+        self._written()
+
+    def get_output(self, source: Union[bytes, str], output_format: str) \
+            -> Optional[str]:
+        """Returns a cached serialisation of a record, or None on a miss
+
+        Args:
+            source (bytes or str): The record itself, or the path of a file
+                                    holding it
+            output_format (str): The name of the serialisation, such as
+                                    "schema.org"
+        """
+        data: bytes = _read(source)
+        digest: str = hashlib.sha256(data).hexdigest()
+        row: Optional[tuple] = self._connection.execute(
+            "SELECT value FROM outputs"
+            " WHERE digest = ? AND version = ? AND format = ?",
+            (digest, self._version, output_format)).fetchone()
+        if row is None:
+            self._output_misses += 1
+            return None
+        self._output_hits += 1
+        self._touch(digest)
+        return row[0]
+
+    def put_output(self, source: Union[bytes, str], output_format: str,
+                   value: str):
+        """Stores a serialisation of a record whose `Dataset` is already in
+        the cache
+
+        Args:
+            source (bytes or str): The record itself, or the path of a file
+                                    holding it
+            output_format (str): The name of the serialisation
+            value (str): The serialised record
+
+        Raises:
+            KeyError: If the record's `Dataset` is not in the cache
+        """
+        data: bytes = _read(source)
+        digest: str = hashlib.sha256(data).hexdigest()
+        key: tuple = (digest, self._version)
+        if self._connection.execute(
+                "SELECT 1 FROM entries WHERE digest = ? AND version = ?",
+                key).fetchone() is None:
+            raise KeyError(digest)
+        size: int = len(value.encode())
+        old: Optional[tuple] = self._connection.execute(
+            "SELECT value FROM outputs"
+            " WHERE digest = ? AND version = ? AND format = ?",
+            key + (output_format,)).fetchone()
+        if old is not None:
+            size -= len(old[0].encode())
+        self._connection.execute(
+            "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?)",
+            key + (output_format, value))
+        self._connection.execute(
+            "UPDATE entries SET size = size + ?, last_used = ?"
+            " WHERE digest = ? AND version = ?",
+            (size, time.time()) + key)
+        self._size += size
+        self._evict()
+        self._written()
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """dict: Counts of `get` hits and misses, of `get_output` hits and
+        misses, and of evictions, and the source bytes which did not need
+        parsing, since the cache was opened, along with the number of
+        entries and their total size in bytes"""
+        return {"hits": self._hits,
+                "misses": self._misses,
+                "bytes_saved": self._bytes_saved,
+                "output_hits": self._output_hits,
+                "output_misses": self._output_misses,
+                "evictions": self._evictions,
+                "entries": self._connection.execute(
+                    "SELECT COUNT(*) FROM entries").fetchone()[0],
+                "size_bytes": self._size}
+
+    def _touch(self, digest: str):
+        self._connection.execute(
+            "UPDATE entries SET last_used = ?"
+            " WHERE digest = ? AND version = ?",
+            (time.time(), digest, self._version))
+        self._written()
+
+    def _written(self):
+        self._writes += 1
+        if self._writes >= _COMMIT_BATCH:
+            self._commit()
+
+    def _commit(self):
+        self._connection.commit()
+        self._writes = 0
+
+    def _delete(self, digest: str):
+        row: Optional[tuple] = self._connection.execute(
+            "SELECT size FROM entries WHERE digest = ? AND version = ?",
+            (digest, self._version)).fetchone()
+        if row is not None:
+            self._size -= row[0]
+        self._connection.execute(
+            "DELETE FROM entries WHERE digest = ? AND version = ?",
+            (digest, self._version))
+        self._connection.execute(
+            "DELETE FROM outputs WHERE digest = ? AND version = ?",
+            (digest, self._version))
+
+    def _evict(self):
+        while self._size > self._max_bytes:
+            row: Optional[tuple] = self._connection.execute(
+                "SELECT digest, version, size FROM entries"
+                " ORDER BY last_used LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._connection.execute(
+                "DELETE FROM entries WHERE digest = ? AND version = ?",
+                row[:2])
+            self._connection.execute(
+                "DELETE FROM outputs WHERE digest = ? AND version = ?",
+                row[:2])
+            self._size -= row[2]
+            self._evictions += 1
+
+
+def _read(source: Union[bytes, str]) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    with open(source, "rb") as f:
+        return f.read()
@@ -0,0 +1,275 @@
+from . import Dataset
+from ._isoextractor import _EPOCH, _timestamp
+from .boundingbox import BoundingBox
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import datetime
+import math
+
+__docformat__ = "google"
+
+TOPIC_CATEGORY_CODES: Tuple[str, ...] = (
+    "farming", "biota", "boundaries", "climatologyMeteorologyAtmosphere",
+    "economy", "elevation", "environment", "geoscientificInformation",
+    "health", "imageryBaseMapsEarthCover", "intelligenceMilitary",
+    "inlandWaters", "location", "oceans", "planningCadastre", "society",
+    "structure", "transportation", "utilitiesCommunication")
+"""The values of the ISO19115 MD_TopicCategoryCode code list, in code list
+order"""
+
+
+class _TextColumn(object):
+    """A column of strings stored as UTF-8 in one shared buffer, indexed by
+    an array of offsets"""
+    __slots__ = ("_buffer", "_offsets")
+
+    def __init__(self):
+        self._buffer: bytearray = bytearray()
+        self._offsets: array = array("Q", [0])
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return self._buffer[self._offsets[i]:self._offsets[i + 1]].decode()
+
+    def append(self, value: str):
+        self._buffer += value.encode()
+        self._offsets.append(len(self._buffer))
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._buffer) + \
+            self._offsets.itemsize * len(self._offsets)
+
+
+class DatasetCollection(object):
+    """A compact, column-wise store for many `Dataset`s
+
+    Text fields are held as UTF-8 in one shared buffer per field, bounding
+    box extents and the start and end of the temporal extent in contiguous
+    `array('d')` columns, and topic category
+    keywords as small integer codes into an interned vocabulary, which is
+    seeded with `TOPIC_CATEGORY_CODES` and grows for any other value met.
+    Indexing the collection returns a `DatasetView`, which behaves as a
+    `Dataset` for that row.
+
+    Args:
+        datasets (iterable of Dataset): `Dataset`s to add to the collection
+
+    Raises:
+        TypeError: If an item added is not a `Dataset`
+    """
+    __slots__ = ("_identifiers", "_titles", "_abstracts", "_citations",
+                 "_dois", "_north", "_south", "_east", "_west",
+                 "_start_date", "_end_date", "_keyword_codes",
+                 "_keyword_offsets", "_vocabulary", "_vocabulary_codes")
+
+    def __init__(self, datasets: Iterable[Dataset] = ()):
+        self._identifiers: _TextColumn = _TextColumn()
+        self._titles: _TextColumn = _TextColumn()
+        self._abstracts: _TextColumn = _TextColumn()
+        self._citations: _TextColumn = _TextColumn()
+        self._dois: _TextColumn = _TextColumn()
+        self._north: array = array("d")
+        self._south: array = array("d")
+        self._east: array = array("d")
+        self._west: array = array("d")
+        self._start_date: array = array("d")
+        self._end_date: array = array("d")
+        self._keyword_codes: array = array("I")
+        self._keyword_offsets: array = array("Q", [0])
+        self._vocabulary: List[str] = list(TOPIC_CATEGORY_CODES)
+        self._vocabulary_codes: Dict[str, int] = \
+            {k: i for i, k in enumerate(self._vocabulary)}
+        self.extend(datasets)
+
+    def __len__(self) -> int:
+        return len(self._north)
+
+    def __getitem__(self, i: int) -> "DatasetView":
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("DatasetCollection index out of range")
+        return DatasetView(self, i)
+
+    def __iter__(self) -> Iterator["DatasetView"]:
+        i: int
+        for i in range(len(self)):
+            yield DatasetView(self, i)
+
+    def append(self, dataset: Dataset):
+        """Adds a `Dataset` to the end of the collection
+
+        Args:
+            dataset (Dataset): The `Dataset` to add
+
+        Raises:
+            TypeError: If dataset is not a `Dataset`
+        """
+        if not isinstance(dataset, Dataset):
+            raise TypeError
+        self._identifiers.append(dataset.identifier)
+        self._titles.append(dataset.title)
+        self._abstracts.append(dataset.abstract)
+        self._citations.append(dataset.citation_string)
+        self._dois.append(dataset.digital_object_identifier)
+        bb: BoundingBox = dataset.bounding_box
+        self._north.append(bb.north)
+        self._south.append(bb.south)
+        self._east.append(bb.east)
+        self._west.append(bb.west)
+        self._start_date.append(_timestamp(dataset.start_date))
+        self._end_date.append(_timestamp(dataset.end_date))
+        keyword: str
+        for keyword in dataset.keywords:
+            self._keyword_codes.append(self._intern_keyword(keyword))
+        self._keyword_offsets.append(len(self._keyword_codes))
+
+    def extend(self, datasets: Iterable[Dataset]):
+        """Adds each of an iterable of `Dataset`s to the end of the collection
+
+        Args:
+            datasets (iterable of Dataset): The `Dataset`s to add
+
+        Raises:
+            TypeError: If an item is not a `Dataset`
+        """
+        dataset: Dataset
+        for dataset in datasets:
+            self.append(dataset)
+
+    def _intern_keyword(self, keyword: str) -> int:
+        code: int
+        try:
+            code = self._vocabulary_codes[keyword]
+        except KeyError:
+            code = len(self._vocabulary)
+            self._vocabulary.append(keyword)
+            self._vocabulary_codes[keyword] = code
+        return code
+
+    def keyword_codes(self, i: int) -> array:
+        """Returns the keyword codes of row i, as indices into `vocabulary`"""
+        return self._keyword_codes[self._keyword_offsets[i]:
+                                   self._keyword_offsets[i + 1]]
+
+    @property
+    def vocabulary(self) -> Tuple[str, ...]:
+        """tuple of str: The interned keywords, indexed by keyword code"""
+        return tuple(self._vocabulary)
+
+    @property
+    def north(self) -> array:
+        """array: The northernmost extent of every row"""
+        return self._north
+
+    @property
+    def south(self) -> array:
+        """array: The southernmost extent of every row"""
+        return self._south
+
+    @property
+    def east(self) -> array:
+        """array: The easternmost extent of every row"""
+        return self._east
+
+    @property
+    def west(self) -> array:
+        """array: The westernmost extent of every row"""
+        return self._west
+
+    @property
+    def start_date(self) -> array:
+        """array: The start of the temporal extent of every row, in seconds
+        since the epoch, or NaN where there is none"""
+        return self._start_date
+
+    @property
+    def end_date(self) -> array:
+        """array: The end of the temporal extent of every row, in seconds
+        since the epoch, or NaN where there is none"""
+        return self._end_date
+
+    @property
+    def nbytes(self) -> int:
+        """int: The number of bytes held by the column buffers"""
+        coordinates: array
+        n: int = sum(column.nbytes for column in (
+            self._identifiers, self._titles, self._abstracts,
+            self._citations, self._dois))
+        for coordinates in (self._north, self._south, self._east,
+                            self._west, self._start_date, self._end_date,
+                            self._keyword_codes,
+                            self._keyword_offsets):
+            n += coordinates.itemsize * len(coordinates)
+        return n
+
+
+def _datetime(timestamp: float) -> Optional[datetime.datetime]:
+    if math.isnan(timestamp):
+        return None
+    return _EPOCH + datetime.timedelta(seconds=timestamp)
+
+
+class DatasetView(Dataset):
+    """A read-only `Dataset` backed by one row of a `DatasetCollection`.
+    Fields are decoded from the collection each time they are read.
+
+    The fields of `Dataset` itself are never set on a view, so every public
+    property and method of `Dataset` which reads them is overridden here.
+
+    Args:
+        collection (DatasetCollection): The collection holding the row
+        index (int): The row of the collection
+    """
+    __slots__ = ("_collection", "_index")
+
+    def __init__(self, collection: DatasetCollection, index: int):
+        self._collection: DatasetCollection = collection
+        self._index: int = index
+
+    @property
+    def abstract(self) -> str:
+        return self._collection._abstracts[self._index]
+
+    @property
+    def bounding_box(self) -> BoundingBox:
+        c: DatasetCollection = self._collection
+        return BoundingBox(c.north[self._index], c.south[self._index],
+                           c.east[self._index], c.west[self._index])
+
+    @property
+    def citation_string(self) -> str:
+        return self._collection._citations[self._index]
+
+    @property
+    def digital_object_identifier(self) -> str:
+        return self._collection._dois[self._index]
+
+    @property
+    def end_date(self) -> Optional[datetime.datetime]:
+        return _datetime(self._collection.end_date[self._index])
+
+    @property
+    def identifier(self) -> str:
+        return self._collection._identifiers[self._index]
+
+    @property
+    def keywords(self) -> list:
+        vocabulary: List[str] = self._collection._vocabulary
+        return [vocabulary[code] for code in
+                self._collection.keyword_codes(self._index)]
+
+    @property
+    def start_date(self) -> Optional[datetime.datetime]:
+        return _datetime(self._collection.start_date[self._index])
+
+    @property
+    def title(self) -> str:
+        return self._collection._titles[self._index]
+
+    def materialize(self) -> None:
+        pass
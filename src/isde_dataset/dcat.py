@@ -0,0 +1,181 @@
+from . import Dataset, instrumentation
+from .boundingbox import BoundingBox
+from .doi import DOI_RESOLVER, doi_url
+from typing import Dict, IO, Iterable, List, Optional, Pattern
+
+import re
+import time
+import urllib.parse
+
+__docformat__ = "google"
+
+PREFIXES: str = (
+    "@prefix dcat: <http://www.w3.org/ns/dcat#> .\n"
+    "@prefix dct: <http://purl.org/dc/terms/> .\n"
+    "@prefix geo: <http://www.opengis.net/ont/geosparql#> .\n"
+    "@prefix locn: <http://www.w3.org/ns/locn#> .\n"
+    "@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .\n")
+"""The prefix block written once at the head of each Turtle document"""
+
+BASE_IRI: str = "urn:isde-dataset:"
+"""Default prefix of the IRI minted for a `Dataset` from its identifier"""
+
+_LITERAL_ESCAPES: Dict[str, str] = {chr(i): "\\u%04X" % i
+                                    for i in range(0x20)}
+_LITERAL_ESCAPES.update({"\\": "\\\\", '"': '\\"', "\n": "\\n",
+                         "\r": "\\r", "\t": "\\t", "\b": "\\b",
+                         "\f": "\\f"})
+_LITERAL_SPECIALS: Pattern = re.compile('[\\x00-\\x1f"\\\\]')
+
+_IRI_SAFE: str = ":/?#[]@!$&'()*+,;=-._~%"
+
+
+def _literal(value: str) -> str:
+    """Quotes a string as a Turtle literal, escaping quotes, backslashes,
+    line breaks and every other control character"""
+    return '"' + _LITERAL_SPECIALS.sub(
+        lambda m: _LITERAL_ESCAPES[m.group()], value) + '"'
+
+
+def _iri(value: str) -> str:
+    """Writes an IRI reference, percent-encoding any characters which may
+    not appear in one"""
+    return "<" + urllib.parse.quote(value, safe=_IRI_SAFE) + ">"
+
+
+def _wkt_polygon(bb: BoundingBox) -> str:
+    return "POLYGON((%r %r,%r %r,%r %r,%r %r,%r %r))" % (
+        bb.west, bb.south, bb.east, bb.south, bb.east, bb.north,
+        bb.west, bb.north, bb.west, bb.south)
+
+
+def _wkt_geometry(bb: BoundingBox) -> str:
+    """Writes a bounding box as a WKT point if it has no extent, as a
+    multipolygon split at the antimeridian if it crosses it, or otherwise as
+    a polygon"""
+    if bb.north == bb.south and bb.east == bb.west:
+        return "POINT(%r %r)" % (bb.west, bb.north)
+    if bb.east < bb.west:
+        return "MULTIPOLYGON(((%r %r,180.0 %r,180.0 %r,%r %r,%r %r))," \
+            "((-180.0 %r,%r %r,%r %r,-180.0 %r,-180.0 %r)))" % (
+                bb.west, bb.south, bb.south, bb.north, bb.west, bb.north,
+                bb.west, bb.south, bb.south, bb.east, bb.south, bb.east,
+                bb.north, bb.north, bb.south)
+    return _wkt_polygon(bb)
+
+
+def _subject(dataset: Dataset, base_iri: str, blank_node: str) -> str:
+    if dataset.identifier:
+        return _iri(base_iri + dataset.identifier)
+    return "_:" + blank_node
+
+
+def dataset_turtle(dataset: Dataset, base_iri: str = BASE_IRI,
+                   blank_node: str = "dataset") -> str:
+    """Writes the DCAT description of a `Dataset` as Turtle statements,
+    without the prefix block
+
+    The subject is base_iri followed by the identifier, or a blank node if
+    the `Dataset` has no identifier. Empty text fields are left out, a
+    digital object identifier is given as a `dcat:landingPage`, made a URL
+    by `isde_dataset.doi.doi_url`, if it is a DOI or URL, a temporal extent
+    as a `dct:PeriodOfTime` with whichever of its start and end are known,
+    and the bounding box as a `dct:Location`, whose `dcat:bbox` and
+    `locn:geometry` are both written by `_wkt_geometry`, unless it was never
+    set and every extent is 0.
+
+    Args:
+        dataset (Dataset): The `Dataset` to describe
+        base_iri (str): The prefix of the IRI minted for the `Dataset`
+        blank_node (str): The label of the blank node used for a `Dataset`
+                            without an identifier, unique within a document
+    """
+    observer: Optional[instrumentation.Observer] = instrumentation._observer
+    if observer is None:
+        return _dataset_turtle(dataset, base_iri, blank_node)
+    started: float = time.perf_counter()
+    turtle: str = _dataset_turtle(dataset, base_iri, blank_node)
+    observer.serialized("dcat", time.perf_counter() - started)
+    return turtle
+
+
+def _dataset_turtle(dataset: Dataset, base_iri: str, blank_node: str) \
+        -> str:
+    lines: list = [_subject(dataset, base_iri, blank_node) +
+                   " a dcat:Dataset"]
+    if dataset.identifier:
+        lines.append("dct:identifier " + _literal(dataset.identifier))
+    if dataset.title:
+        lines.append("dct:title " + _literal(dataset.title))
+    if dataset.abstract:
+        lines.append("dct:description " + _literal(dataset.abstract))
+    if dataset.keywords:
+        lines.append("dcat:keyword " + ", ".join(
+            _literal(k) for k in dataset.keywords))
+    if dataset.citation_string:
+        lines.append("dct:bibliographicCitation " +
+                     _literal(dataset.citation_string))
+    landing_page: Optional[str] = doi_url(
+        dataset.digital_object_identifier, DOI_RESOLVER)
+    if landing_page is not None:
+        lines.append("dcat:landingPage " + _iri(landing_page))
+    period: List[str] = [
+        "%s %s^^xsd:dateTime" % (name, _literal(d.isoformat() + "Z"))
+        for name, d in (("dcat:startDate", dataset.start_date),
+                        ("dcat:endDate", dataset.end_date))
+        if d is not None]
+    if period:
+        lines.append("dct:temporal [ a dct:PeriodOfTime ;\n        " +
+                     " ;\n        ".join(period) + " ]")
+    bb: BoundingBox = dataset.bounding_box
+    if any((bb.north, bb.south, bb.east, bb.west)):
+        geometry: str = _literal(_wkt_geometry(bb)) + "^^geo:wktLiteral"
+        lines.append("dct:spatial [ a dct:Location ;\n"
+                     "        dcat:bbox " + geometry + " ;\n"
+                     "        locn:geometry " + geometry + " ]")
+    return " ;\n    ".join(lines) + " .\n"
+
+
+def dumps(dataset: Dataset, base_iri: str = BASE_IRI) -> str:
+    """Serialises a `Dataset` as a DCAT Turtle document"""
+    return PREFIXES + "\n" + dataset_turtle(dataset, base_iri)
+
+
+def dump(dataset: Dataset, fp: IO[str], base_iri: str = BASE_IRI):
+    """Writes a `Dataset` as a DCAT Turtle document to a text file object"""
+    fp.write(dumps(dataset, base_iri))
+
+
+def dump_all(datasets: Iterable[Dataset], fp: IO[str],
+             base_iri: str = BASE_IRI,
+             catalogue_iri: Optional[str] = None) -> int:
+    """Writes a stream of `Dataset`s as a single DCAT Turtle document, with
+    the prefix block written once. Records are written one at a time, so
+    memory use does not grow with the size of the catalogue.
+
+    Args:
+        datasets (iterable of Dataset): The `Dataset`s to write
+        fp (file object): A text file object
+        base_iri (str): The prefix of the IRI minted for each `Dataset`
+        catalogue_iri (str): If given, a `dcat:Catalog` with this IRI is
+                                written and linked to every `Dataset`
+
+    Returns:
+        int: The number of records written
+    """
+    fp.write(PREFIXES)
+    catalogue: str = str()
+    if catalogue_iri is not None:
+        catalogue = _iri(catalogue_iri)
+        fp.write("\n%s a dcat:Catalog .\n" % catalogue)
+    count: int = 0
+    dataset: Dataset
+    for dataset in datasets:
+        blank_node: str = "dataset%d" % count
+        fp.write("\n")
+        fp.write(dataset_turtle(dataset, base_iri, blank_node))
+        if catalogue:
+            fp.write("%s dcat:dataset %s .\n" % (
+                catalogue, _subject(dataset, base_iri, blank_node)))
+        count += 1
+    return count
@@ -0,0 +1,342 @@
+from . import Dataset, DatasetSourceType
+from .textindex import tokenize
+from array import array
+from typing import Any, Callable, Dict, Iterable, Iterator, List, \
+    Optional, Pattern, Sequence, Set
+
+import datetime
+import hashlib
+import re
+
+__docformat__ = "google"
+
+_DOI_PREFIX: Pattern = re.compile(
+    r"^(?:https?://(?:dx\.)?doi\.org/|doi:\s*)", re.IGNORECASE)
+_EMPTY: int = 1 << 32
+_OFFSET: int = 0x9E3779B1
+"""Added to a value borrowed from a neighbouring bin for each bin passed,
+so that borrowed values do not collide with the original"""
+
+_Merge = Callable[[Sequence[Dataset]], Dataset]
+
+
+def normalize_doi(doi: str) -> str:
+    """Reduces a digital object identifier to its lower case "10." form,
+    removing a resolver URL or "doi:" prefix, so that the same DOI written
+    in different ways matches"""
+    return _DOI_PREFIX.sub("", doi.strip()).strip().lower()
+
+
+def _shingles(text: str, size: int) -> Set[bytes]:
+    terms: List[str] = tokenize(text)
+    if len(terms) <= size:
+        return {" ".join(terms).encode()} if terms else set()
+    return {" ".join(terms[i:i + size]).encode()
+            for i in range(len(terms) - size + 1)}
+
+
+def minhash(shingles: Iterable[bytes], num_perm: int = 128) \
+        -> Optional[array]:
+    """Computes a MinHash signature by one permutation hashing: each
+    shingle is hashed once, into one of num_perm bins by part of its hash,
+    and each bin keeps the least of the rest. An empty bin borrows from the
+    next bin which is not, so that every position of two signatures agrees
+    with a probability close to the Jaccard similarity of the two sets.
+
+    Args:
+        shingles (iterable of bytes): The set to sign
+        num_perm (int): The length of the signature
+
+    Returns:
+        array: The signature, as unsigned 32-bit integers, or None for an
+                empty set
+    """
+    mins: List[int] = [_EMPTY] * num_perm
+    shingle: bytes
+    for shingle in shingles:
+        h: int = int.from_bytes(hashlib.blake2b(shingle,
+                                                digest_size=8).digest(),
+                                "little")
+        i: int = (h >> 32) % num_perm
+        if h & 0xFFFFFFFF < mins[i]:
+            mins[i] = h & 0xFFFFFFFF
+    filled: List[int] = [i for i in range(num_perm) if mins[i] != _EMPTY]
+    if not filled:
+        return None
+    signature: array = array("I", [0]) * num_perm
+    nearest: int = filled[0] + num_perm
+    for i in range(num_perm - 1, -1, -1):
+        if mins[i] != _EMPTY:
+            nearest = i
+            signature[i] = mins[i]
+        else:
+            signature[i] = (mins[nearest % num_perm] +
+                            (nearest - i) * _OFFSET) & 0xFFFFFFFF
+    return signature
+
+
+def similarity(a: array, b: array) -> float:
+    """Estimates the Jaccard similarity of two sets from their `minhash`
+    signatures"""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def merge_datasets(datasets: Sequence[Dataset], prefer: str = "first") \
+        -> Dataset:
+    """Merges duplicate `Dataset`s into one, built from a dictionary
+
+    Keywords are the union of those of every `Dataset`, in order, and the
+    temporal extent runs from the earliest start to the latest end. The
+    bounding box is that of the first `Dataset` which has one. Each text
+    field is taken from the first `Dataset` in which it is not empty, or,
+    if prefer is "longest", from the `Dataset` in which it is longest, the
+    first on a tie.
+
+    Args:
+        datasets (sequence of Dataset): The duplicates, in order of
+                                        preference
+        prefer (str): "first" or "longest"
+
+    Raises:
+        ValueError: If datasets is empty or prefer is not recognised
+    """
+    if not datasets:
+        raise ValueError("no datasets to merge")
+    if prefer not in ("first", "longest"):
+        raise ValueError('prefer must be "first" or "longest"')
+    fields: List[Dict[str, Any]] = [ds.to_dict() for ds in datasets]
+    merged: Dict[str, Any] = dict(fields[0])
+    name: str
+    for name in ("identifier", "title", "abstract", "citation_string",
+                 "digital_object_identifier"):
+        values: List[str] = [f[name] for f in fields if f[name]]
+        if values:
+            merged[name] = values[0] if prefer == "first" else \
+                max(values, key=len)
+    keywords: Dict[str, None] = dict()
+    f: Dict[str, Any]
+    for f in fields:
+        keywords.update(dict.fromkeys(f["keywords"]))
+    merged["keywords"] = list(keywords)
+    boxes: List[Dict[str, float]] = [
+        f["bounding_box"] for f in fields if any(f["bounding_box"].values())]
+    if boxes:
+        merged["bounding_box"] = boxes[0]
+    starts: List[datetime.datetime] = [
+        ds.start_date for ds in datasets if ds.start_date is not None]
+    ends: List[datetime.datetime] = [
+        ds.end_date for ds in datasets if ds.end_date is not None]
+    merged["start_date"] = min(starts).isoformat() if starts else None
+    merged["end_date"] = max(ends).isoformat() if ends else None
+    return Dataset(merged, DatasetSourceType.DICT)
+
+
+class Cluster(object):
+    """A group of `Dataset`s found to describe the same dataset
+
+    Args:
+        indices (list of int): The position of each `Dataset` in the stream
+        datasets (list of Dataset): The `Dataset`s, in stream order
+        merge (callable): Merges the `Dataset`s into one
+    """
+    def __init__(self, indices: List[int], datasets: List[Dataset],
+                 merge: _Merge = merge_datasets):
+        self._indices: List[int] = indices
+        self._datasets: List[Dataset] = datasets
+        self._merge: _Merge = merge
+        self._merged: Optional[Dataset] = None
+
+    def __len__(self) -> int:
+        return len(self._datasets)
+
+    @property
+    def indices(self) -> List[int]:
+        """list of int: The position of each `Dataset` in the stream"""
+        return self._indices
+
+    @property
+    def datasets(self) -> List[Dataset]:
+        """list of Dataset: The `Dataset`s of the cluster, in stream
+        order"""
+        return self._datasets
+
+    @property
+    def merged(self) -> Dataset:
+        """Dataset: The `Dataset`s merged into one, or the only `Dataset`
+        of a cluster of one. The merge is made on first access."""
+        if self._merged is None:
+            self._merged = self._datasets[0] if len(self._datasets) == 1 \
+                else self._merge(self._datasets)
+        return self._merged
+
+
+class Deduplicator(object):
+    """Groups a stream of `Dataset`s into clusters of duplicates, such as
+    the same dataset harvested from its publisher and from an aggregator
+
+    Two `Dataset`s are duplicates if they share a digital object
+    identifier, compared after `normalize_doi`, or a file identifier,
+    compared case insensitively, or if the Jaccard similarity of the word
+    shingles of their title and abstract is at least threshold.
+    Duplicates of duplicates are in the same cluster, except that a
+    cluster holds at most one digital object identifier: two clusters
+    whose identifiers differ, as for the yearly parts of a series, are
+    never joined, even through a `Dataset` which has none.
+
+    Exact keys are looked up in dictionaries. Near duplicates are found by
+    locality sensitive hashing: each `Dataset` gets a `minhash` signature
+    of its shingles, the signature is cut into bands, and a `Dataset` is
+    only compared with those which share a whole band with it, of which
+    at most max_bucket per band are kept. Time and memory therefore grow
+    linearly with the number of `Dataset`s rather than with the number of
+    pairs.
+
+    Args:
+        threshold (float): The least estimated Jaccard similarity of two
+                            near duplicates
+        num_perm (int): The length of the signatures
+        bands (int): The number of bands, which must divide num_perm. More
+                        bands find more near duplicates below threshold at
+                        the cost of more comparisons
+        shingle_size (int): The number of words in each shingle
+        max_bucket (int): The most `Dataset`s kept per band value
+        merge (callable): Merges the `Dataset`s of a cluster, by default
+                            `merge_datasets`
+
+    Raises:
+        ValueError: If bands does not divide num_perm, or threshold is not
+                    between 0 and 1
+    """
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128,
+                 bands: int = 16, shingle_size: int = 3,
+                 max_bucket: int = 16, merge: _Merge = merge_datasets):
+        if bands < 1 or num_perm % bands:
+            raise ValueError("bands must divide num_perm")
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("threshold must be in (0, 1]")
+        self._threshold: float = threshold
+        self._num_perm: int = num_perm
+        self._rows: int = num_perm // bands
+        self._shingle_size: int = shingle_size
+        self._max_bucket: int = max_bucket
+        self._merge: _Merge = merge
+        self._datasets: List[Dataset] = list()
+        self._parent: array = array("q")
+        self._dois: List[str] = list()
+        self._signatures: Dict[int, array] = dict()
+        self._keys: Dict[str, int] = dict()
+        self._buckets: List[Dict[int, List[int]]] = [
+            dict() for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._datasets)
+
+    def add(self, dataset: Dataset) -> int:
+        """Adds a `Dataset` to the stream, joining it to the cluster of any
+        duplicate seen before
+
+        Args:
+            dataset (Dataset): The `Dataset` to add
+
+        Returns:
+            int: The position of the `Dataset` in the stream
+
+        Raises:
+            TypeError: If dataset is not a `Dataset`
+        """
+        if not isinstance(dataset, Dataset):
+            raise TypeError
+        index: int = len(self._datasets)
+        self._datasets.append(dataset)
+        self._parent.append(index)
+        doi: str = normalize_doi(dataset.digital_object_identifier)
+        self._dois.append(doi)
+        key: str
+        for key in (("doi:" + doi) if doi else "",
+                    ("id:" + dataset.identifier.strip().casefold())
+                    if dataset.identifier.strip() else ""):
+            if not key:
+                continue
+            other: int = self._keys.setdefault(key, index)
+            if other != index:
+                self._union(other, index)
+        signature: Optional[array] = minhash(
+            _shingles(dataset.title + " " + dataset.abstract,
+                      self._shingle_size), self._num_perm)
+        if signature is not None:
+            self._signatures[index] = signature
+            self._near_duplicates(index, signature)
+        return index
+
+    def extend(self, datasets: Iterable[Dataset]):
+        """Adds each of an iterable of `Dataset`s, as for `add`"""
+        dataset: Dataset
+        for dataset in datasets:
+            self.add(dataset)
+
+    def _near_duplicates(self, index: int, signature: array):
+        compared: Set[int] = set()
+        band: int
+        buckets: Dict[int, List[int]]
+        for band, buckets in enumerate(self._buckets):
+            members: List[int] = buckets.setdefault(hash(
+                signature[band * self._rows:(band + 1) * self._rows]
+                .tobytes()), list())
+            other: int
+            for other in members:
+                if other in compared:
+                    continue
+                compared.add(other)
+                if self._find(other) != self._find(index) and \
+                        similarity(signature, self._signatures[other]) >= \
+                        self._threshold:
+                    self._union(other, index)
+            members.append(index)
+            if len(members) > self._max_bucket:
+                del members[0]
+
+    def _find(self, i: int) -> int:
+        parent: array = self._parent
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def _union(self, a: int, b: int):
+        """Joins the clusters of a and b, unless each has a digital object
+        identifier and these differ. The root of a cluster holds its
+        identifier in _dois."""
+        a, b = self._find(a), self._find(b)
+        if a == b or (self._dois[a] and self._dois[b] and
+                      self._dois[a] != self._dois[b]):
+            return
+        root: int = min(a, b)
+        self._parent[max(a, b)] = root
+        self._dois[root] = self._dois[a] or self._dois[b]
+
+    def clusters(self) -> List[Cluster]:
+        """Returns the clusters of the `Dataset`s added so far, in order of
+        their first `Dataset`, including clusters of one"""
+        groups: Dict[int, List[int]] = dict()
+        i: int
+        for i in range(len(self._datasets)):
+            groups.setdefault(self._find(i), list()).append(i)
+        return [Cluster(indices, [self._datasets[i] for i in indices],
+                        self._merge) for indices in groups.values()]
+
+    def datasets(self) -> Iterator[Dataset]:
+        """Yields one `Dataset` per cluster: the merged `Dataset` of a
+        cluster of duplicates, or the `Dataset` itself otherwise"""
+        cluster: Cluster
+        for cluster in self.clusters():
+            yield cluster.merged
+
+
+def deduplicate(datasets: Iterable[Dataset], **kwargs: Any) \
+        -> Iterator[Dataset]:
+    """Removes duplicates from a stream of `Dataset`s, yielding one
+    `Dataset` per cluster once the stream is exhausted, with the keyword
+    arguments of `Deduplicator`"""
+    deduplicator: Deduplicator = Deduplicator(**kwargs)
+    deduplicator.extend(datasets)
+    return deduplicator.datasets()
@@ -0,0 +1,32 @@
+from typing import Optional, Pattern
+
+import re
+
+__docformat__ = "google"
+
+DOI_RESOLVER: str = "https://doi.org/"
+"""Prefix turning a digital object identifier into a URL"""
+
+_URL: Pattern = re.compile(r"^[a-z][a-z0-9+.-]*://", re.IGNORECASE)
+_DOI_PREFIX: Pattern = re.compile(r"^doi:\s*", re.IGNORECASE)
+
+
+def doi_url(doi: str, resolver: str = DOI_RESOLVER) -> Optional[str]:
+    """Returns a digital object identifier as a URL
+
+    A bare DOI, such as "10.1000/182", or one in "doi:" form is appended to
+    resolver, while a value which is already a URL, as a dataSetURI often
+    is, is returned unchanged.
+
+    Args:
+        doi (str): The digital object identifier
+        resolver (str): The prefix turning a DOI into a URL
+
+    Returns:
+        str: The URL, or None if the value is neither a DOI nor a URL
+    """
+    doi = doi.strip()
+    if _URL.match(doi):
+        return doi
+    doi = _DOI_PREFIX.sub("", doi)
+    return resolver + doi if doi.startswith("10.") else None
@@ -0,0 +1,602 @@
+from . import Dataset, DatasetSourceType
+from .stream import iter_iso_datasets
+from typing import Any, AsyncGenerator, AsyncIterator, Awaitable, Dict, \
+    Iterable, List, Optional, Set, Tuple
+
+import asyncio
+import concurrent.futures
+import email.utils
+import gzip
+import io
+import ssl
+import time
+import urllib.parse
+import xml.etree.ElementTree
+
+__docformat__ = "google"
+
+USER_AGENT: str = "isde-dataset-harvester"
+"""The User-Agent header sent with every request"""
+
+CSW_SEARCH_RESULTS: str = "{http://www.opengis.net/cat/csw/2.0.2}" \
+    "SearchResults"
+"""The tag of the element of a CSW GetRecords response which holds the
+records and the paging attributes"""
+
+_RETRY_STATUSES: frozenset = frozenset((408, 429, 500, 502, 503, 504))
+_REDIRECT_STATUSES: frozenset = frozenset((301, 302, 303, 307, 308))
+_MAX_REDIRECTS: int = 5
+
+_Validators = Tuple[Optional[str], Optional[str]]
+"""The (ETag, Last-Modified) headers of a previously harvested record"""
+
+
+class HarvestError(Exception):
+    """Raised for a response which is neither a record nor retryable, such
+    as a 404, or once every retry has failed
+
+    Args:
+        message (str): The description of the error
+        status (int): The HTTP status of the response, or 0 if there was no
+                        response
+    """
+    def __init__(self, message: str, status: int = 0):
+        super().__init__(message)
+        self.status: int = status
+
+
+class HarvestResult(object):
+    """The outcome of harvesting a single remote record
+
+    Args:
+        url (str): The URL which was requested
+        dataset (Dataset): The `Dataset` translated from the record, or None
+                            if the request failed or the record has not
+                            changed
+        error (Exception): The exception raised while harvesting the record,
+                            or None on success
+        status (int): The final HTTP status, or 0 if there was no response
+        etag (str): The ETag header of the response, if any
+        last_modified (str): The Last-Modified header of the response, if any
+    """
+    def __init__(self, url: str, dataset: Optional[Dataset] = None,
+                 error: Optional[BaseException] = None, status: int = 0,
+                 etag: Optional[str] = None,
+                 last_modified: Optional[str] = None):
+        self._url: str = url
+        self._dataset: Optional[Dataset] = dataset
+        self._error: Optional[BaseException] = error
+        self._status: int = status
+        self._etag: Optional[str] = etag
+        self._last_modified: Optional[str] = last_modified
+
+    @property
+    def url(self) -> str:
+        """str: The URL which was requested"""
+        return self._url
+
+    @property
+    def dataset(self) -> Optional[Dataset]:
+        """Dataset: The translated record, or None on failure or if the
+        record has not changed"""
+        return self._dataset
+
+    @property
+    def error(self) -> Optional[BaseException]:
+        """Exception: The exception raised for the record, or None on
+        success"""
+        return self._error
+
+    @property
+    def status(self) -> int:
+        """int: The final HTTP status, or 0 if there was no response"""
+        return self._status
+
+    @property
+    def etag(self) -> Optional[str]:
+        """str: The ETag header of the response, if any"""
+        return self._etag
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        """str: The Last-Modified header of the response, if any"""
+        return self._last_modified
+
+    @property
+    def ok(self) -> bool:
+        """bool: True if the record was harvested, or found not to have
+        changed, without error"""
+        return self._error is None
+
+    @property
+    def not_modified(self) -> bool:
+        """bool: True if the server reported that the record has not changed
+        since it was last harvested"""
+        return self._status == 304
+
+
+class _Response(object):
+    __slots__ = ("status", "headers", "body")
+
+    def __init__(self, status: int, headers: Dict[str, str], body: bytes):
+        self.status: int = status
+        self.headers: Dict[str, str] = headers
+        self.body: bytes = body
+
+
+class _Connection(object):
+    """A keep-alive HTTP/1.1 connection to one host"""
+    __slots__ = ("reader", "writer")
+
+    def __init__(self, reader: asyncio.StreamReader,
+                 writer: asyncio.StreamWriter):
+        self.reader: asyncio.StreamReader = reader
+        self.writer: asyncio.StreamWriter = writer
+
+    def close(self):
+        self.writer.close()
+
+    async def exchange(self, request: bytes) -> Tuple[_Response, bool]:
+        """Sends a request and reads the whole response. Returns the
+        response and whether the connection may be reused."""
+        self.writer.write(request)
+        await self.writer.drain()
+        line: bytes = await self.reader.readline()
+        if not line:
+            raise ConnectionResetError("connection closed by server")
+        version, status = line.split(None, 2)[:2]
+        headers: Dict[str, str] = dict()
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            name = name.strip().lower()
+            value = value.strip()
+            headers[name] = headers[name] + ", " + value \
+                if name in headers else value
+        keep_alive: bool = version == b"HTTP/1.1" and \
+            headers.get("connection", "").lower() != "close"
+        body: bytes
+        delimited: bool
+        body, delimited = await self._read_body(int(status), headers)
+        if headers.get("content-encoding", "").lower() == "gzip":
+            body = gzip.decompress(body)
+        return _Response(int(status), headers, body), \
+            keep_alive and delimited
+
+    async def _read_body(self, status: int, headers: Dict[str, str]) \
+            -> Tuple[bytes, bool]:
+        """Reads the body of a response. Returns the body and whether its
+        end was marked other than by the server closing the connection."""
+        if status in (204, 304) or 100 <= status < 200:
+            return b"", True
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            return await self._read_chunked(), True
+        if "content-length" in headers:
+            return await self.reader.readexactly(
+                int(headers["content-length"])), True
+        return await self.reader.read(), False
+
+    async def _read_chunked(self) -> bytes:
+        chunks: List[bytes] = list()
+        while True:
+            size: int = int((await self.reader.readline())
+                            .split(b";")[0], 16)
+            if not size:
+                break
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readline()
+        while (await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        return b"".join(chunks)
+
+
+class _HostPool(object):
+    """The idle connections to one host, and the semaphore bounding the
+    number of requests in flight to it"""
+    __slots__ = ("semaphore", "idle")
+
+    def __init__(self, limit: int):
+        self.semaphore: asyncio.Semaphore = asyncio.Semaphore(limit)
+        self.idle: List[_Connection] = list()
+
+
+def _parse_record(body: bytes) -> Dataset:
+    return Dataset(body, DatasetSourceType.ISO_XML_BYTES)
+
+
+def _parse_csw_page(body: bytes) -> Tuple[List[Dataset], int, int]:
+    """Parses a CSW GetRecords response into its records, the number of
+    records matched and the position of the next record, which is 0 after
+    the last page"""
+    matched: int = 0
+    next_record: int = 0
+    e: xml.etree.ElementTree.Element
+    for _, e in xml.etree.ElementTree.iterparse(io.BytesIO(body),
+                                                events=("start",)):
+        if e.tag == CSW_SEARCH_RESULTS:
+            matched = int(e.get("numberOfRecordsMatched", 0))
+            next_record = int(e.get("nextRecord", 0))
+            break
+    return list(iter_iso_datasets(io.BytesIO(body))), matched, next_record
+
+
+class Harvester(object):
+    """Harvests ISO19115/19139 records from remote servers with asyncio
+
+    Requests go over pooled keep-alive HTTP/1.1 connections, with at most
+    max_per_host in flight to any one host. Connection failures, timeouts
+    and 408, 429 and 5xx responses are retried with exponential backoff,
+    honouring a Retry-After header given in seconds, and redirects are
+    followed. Responses are requested gzip compressed.
+
+    Each record is parsed in an executor, so the event loop never blocks on
+    XML. A `concurrent.futures.ProcessPoolExecutor` may be given to parse on
+    several cores; by default the event loop's thread pool is used.
+
+    The ETag and Last-Modified headers of every record harvested are kept
+    in `validators` and sent back as If-None-Match and If-Modified-Since on
+    the next request for the same URL, so unchanged records cost a 304 and
+    no parsing. Passing the validators saved from a previous harvest makes
+    the conditional requests work across runs.
+
+    A `Harvester` must be used from a single event loop, and closed when
+    done with, for instance with `async with`.
+
+    Args:
+        max_per_host (int): The most requests in flight to any one host
+        max_in_flight (int): The most requests in flight in total
+        retries (int): The number of times a failed request is retried
+        backoff (float): The delay in seconds before the first retry, which
+                            doubles for each further retry
+        timeout (float): The longest wait in seconds for a connection or a
+                            response
+        executor (concurrent.futures.Executor): The executor in which
+                            records are parsed
+        validators (dict): The (ETag, Last-Modified) pair of each URL
+                            harvested before
+
+    Raises:
+        ValueError: If max_per_host or max_in_flight is less than 1, or
+                    retries is negative
+    """
+    def __init__(self, max_per_host: int = 4, max_in_flight: int = 64,
+                 retries: int = 3, backoff: float = 0.5,
+                 timeout: float = 30.0,
+                 executor: Optional[concurrent.futures.Executor] = None,
+                 validators: Optional[Dict[str, _Validators]] = None):
+        if max_per_host < 1:
+            raise ValueError("max_per_host must be at least 1")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if retries < 0:
+            raise ValueError("retries must not be negative")
+        self._max_per_host: int = max_per_host
+        self._max_in_flight: int = max_in_flight
+        self._retries: int = retries
+        self._backoff: float = backoff
+        self._timeout: float = timeout
+        self._executor: Optional[concurrent.futures.Executor] = executor
+        self._validators: Dict[str, _Validators] = \
+            dict() if validators is None else validators
+        self._pools: Dict[Tuple[str, str, int], _HostPool] = dict()
+        self._ssl: Optional[ssl.SSLContext] = None
+
+    async def __aenter__(self) -> "Harvester":
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def close(self):
+        """Closes every pooled connection"""
+        pool: _HostPool
+        for pool in self._pools.values():
+            connection: _Connection
+            for connection in pool.idle:
+                connection.close()
+            pool.idle.clear()
+
+    @property
+    def validators(self) -> Dict[str, _Validators]:
+        """dict: The (ETag, Last-Modified) pair of each URL harvested, for
+        conditional requests"""
+        return self._validators
+
+    async def fetch(self, url: str) -> HarvestResult:
+        """Harvests a single record. Failures are reported in the result
+        rather than raised.
+
+        Args:
+            url (str): The http or https URL of an ISO19115/19139 record
+        """
+        try:
+            etag, last_modified = self._validators.get(url, (None, None))
+            headers: Dict[str, str] = dict()
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            response: _Response = await self._get(url, headers)
+            if response.status == 304:
+                return HarvestResult(
+                    url, status=304,
+                    etag=response.headers.get("etag", etag),
+                    last_modified=response.headers.get("last-modified",
+                                                       last_modified))
+            etag = response.headers.get("etag")
+            last_modified = response.headers.get("last-modified")
+            dataset: Dataset = await asyncio.get_running_loop() \
+                .run_in_executor(self._executor, _parse_record,
+                                 response.body)
+            if etag or last_modified:
+                self._validators[url] = (etag, last_modified)
+            else:
+                self._validators.pop(url, None)
+            return HarvestResult(url, dataset, status=response.status,
+                                 etag=etag, last_modified=last_modified)
+        except Exception as e:
+            return HarvestResult(url, error=e,
+                                 status=getattr(e, "status", 0))
+
+    async def harvest(self, urls: Iterable[str]) \
+            -> AsyncIterator[HarvestResult]:
+        """Harvests many records concurrently, yielding each result as soon
+        as it is ready, in no particular order. URLs are taken from urls
+        only as there is room in flight for them, so a very long iterable is
+        not queued up front.
+
+        Args:
+            urls (iterable of str): The URLs of the records
+
+        Yields:
+            HarvestResult: One result per URL
+        """
+        results: AsyncGenerator[Any, None] = self._bounded(
+            self.fetch(url) for url in urls)
+        try:
+            result: HarvestResult
+            async for result in results:
+                yield result
+        finally:
+            await results.aclose()
+
+    async def harvest_csw(self, endpoint: str, page_size: int = 50,
+                          max_records: Optional[int] = None,
+                          type_names: str = "gmd:MD_Metadata") \
+            -> AsyncIterator[HarvestResult]:
+        """Harvests every record of a Catalogue Service for the Web (CSW)
+        2.0.2 endpoint with GetRecords requests in the ISO19139 output
+        schema. The first page gives the number of records matched, after
+        which the remaining pages are requested concurrently, with no more
+        than max_in_flight pages requested at once.
+
+        Args:
+            endpoint (str): The URL of the CSW service, to which the
+                            GetRecords parameters are added
+            page_size (int): The number of records requested per page
+            max_records (int): The most records to harvest, defaulting to
+                                every record matched
+            type_names (str): The type of the records requested
+
+        Yields:
+            HarvestResult: One result per record, with the URL of its page,
+                            or one result with the error for a page which
+                            failed
+        """
+        first: Tuple[List[HarvestResult], int, int] = await self._csw_page(
+            endpoint, 1, page_size, type_names)
+        result: HarvestResult
+        for result in first[0][:max_records]:
+            yield result
+        matched: int = first[1] if max_records is None else \
+            min(first[1], max_records)
+        if not first[2] or matched <= page_size:
+            return
+        pages: AsyncGenerator[Any, None] = self._bounded(
+            self._csw_page(endpoint, start,
+                           min(page_size, matched - start + 1), type_names)
+            for start in range(first[2], matched + 1, page_size))
+        try:
+            page: Tuple[List[HarvestResult], int, int]
+            async for page in pages:
+                for result in page[0]:
+                    yield result
+        finally:
+            await pages.aclose()
+
+    async def _bounded(self, requests: Iterable[Awaitable]) \
+            -> AsyncGenerator[Any, None]:
+        """Awaits many requests concurrently, yielding each outcome as soon
+        as it is ready. Requests are taken from requests only as there is
+        room for them among the max_in_flight in flight, and those still in
+        flight are cancelled if the iteration stops early."""
+        pending: Set[asyncio.Future] = set()
+        done: Set[asyncio.Future]
+        task: asyncio.Future
+        try:
+            request: Awaitable
+            for request in requests:
+                if len(pending) >= self._max_in_flight:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+                pending.add(asyncio.ensure_future(request))
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _csw_page(self, endpoint: str, start: int, page_size: int,
+                        type_names: str) \
+            -> Tuple[List[HarvestResult], int, int]:
+        url: str = endpoint + ("&" if "?" in endpoint else "?") + \
+            urllib.parse.urlencode((
+                ("service", "CSW"), ("version", "2.0.2"),
+                ("request", "GetRecords"), ("typeNames", type_names),
+                ("namespace",
+                 "xmlns(gmd=http://www.isotc211.org/2005/gmd)"),
+                ("outputSchema", "http://www.isotc211.org/2005/gmd"),
+                ("elementSetName", "full"), ("resultType", "results"),
+                ("startPosition", str(start)),
+                ("maxRecords", str(page_size))))
+        try:
+            response: _Response = await self._get(url, dict())
+            datasets: List[Dataset]
+            matched: int
+            next_record: int
+            datasets, matched, next_record = \
+                await asyncio.get_running_loop().run_in_executor(
+                    self._executor, _parse_csw_page, response.body)
+            return ([HarvestResult(url, ds, status=response.status)
+                     for ds in datasets], matched, next_record)
+        except Exception as e:
+            return ([HarvestResult(url, error=e,
+                                   status=getattr(e, "status", 0))], 0, 0)
+
+    async def _get(self, url: str, headers: Dict[str, str]) -> _Response:
+        """Requests a URL, following redirects and retrying failures
+
+        Raises:
+            HarvestError: If the response is an error which is not retried,
+                            or the last retry fails with an error status
+            ValueError: If the URL, or that of a redirect, is not an http or
+                        https URL
+        """
+        _split_url(url)
+        redirects: int = 0
+        attempt: int = 0
+        while True:
+            response: Optional[_Response] = None
+            delay: float = self._backoff * 2 ** attempt
+            try:
+                response = await self._request(url, headers)
+            except (OSError, asyncio.TimeoutError,
+                    asyncio.IncompleteReadError, ValueError):
+                if attempt >= self._retries:
+                    raise
+            if response is not None:
+                if response.status in _REDIRECT_STATUSES and \
+                        "location" in response.headers and \
+                        redirects < _MAX_REDIRECTS:
+                    url = urllib.parse.urljoin(url,
+                                               response.headers["location"])
+                    _split_url(url)
+                    redirects += 1
+                    continue
+                if response.status < 300 or response.status == 304:
+                    return response
+                if response.status not in _RETRY_STATUSES or \
+                        attempt >= self._retries:
+                    raise HarvestError(
+                        "HTTP %d for %s" % (response.status, url),
+                        response.status)
+                delay = max(delay, _retry_after(
+                    response.headers.get("retry-after")))
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _request(self, url: str, headers: Dict[str, str]) \
+            -> _Response:
+        """Sends one GET request over a pooled connection. A failure on a
+        reused connection, which the server may have closed while it was
+        idle, is retried once on a fresh connection."""
+        parts: urllib.parse.SplitResult = _split_url(url)
+        port: int = parts.port or (443 if parts.scheme == "https" else 80)
+        key: Tuple[str, str, int] = (parts.scheme, str(parts.hostname),
+                                     port)
+        pool: Optional[_HostPool] = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = _HostPool(self._max_per_host)
+        request: bytes = (
+            "GET %s HTTP/1.1\r\nHost: %s\r\nUser-Agent: %s\r\n"
+            "Accept: application/xml, text/xml;q=0.9, */*;q=0.1\r\n"
+            "Accept-Encoding: gzip\r\n%s\r\n" % (
+                urllib.parse.urlunsplit(
+                    ("", "", parts.path or "/", parts.query, "")),
+                parts.netloc.rpartition("@")[2], USER_AGENT,
+                "".join("%s: %s\r\n" % h for h in headers.items()))
+        ).encode("latin-1")
+        async with pool.semaphore:
+            while True:
+                reused: bool = bool(pool.idle)
+                connection: _Connection = pool.idle.pop() if reused \
+                    else await self._connect(key)
+                try:
+                    response: _Response
+                    keep_alive: bool
+                    response, keep_alive = await asyncio.wait_for(
+                        connection.exchange(request), self._timeout)
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    connection.close()
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    connection.close()
+                    raise
+                if keep_alive:
+                    pool.idle.append(connection)
+                else:
+                    connection.close()
+                return response
+
+    async def _connect(self, key: Tuple[str, str, int]) -> _Connection:
+        context: Optional[ssl.SSLContext] = None
+        if key[0] == "https":
+            if self._ssl is None:
+                self._ssl = ssl.create_default_context()
+            context = self._ssl
+        reader: asyncio.StreamReader
+        writer: asyncio.StreamWriter
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(key[1], key[2], ssl=context),
+            self._timeout)
+        return _Connection(reader, writer)
+
+
+def _split_url(url: str) -> urllib.parse.SplitResult:
+    """Splits a URL, which must be http or https and name a host
+
+    Raises:
+        ValueError: If the URL is not an http or https URL
+    """
+    parts: urllib.parse.SplitResult = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError("not an http or https URL: %r" % url)
+    return parts
+
+
+def _retry_after(value: Optional[str]) -> float:
+    """Reads a Retry-After header, given either in seconds or as an HTTP
+    date, as a delay in seconds"""
+    if not value:
+        return 0.0
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() -
+                   time.time())
+    except (TypeError, ValueError):
+        return 0.0
+
+
+async def harvest(urls: Iterable[str], **kwargs: Any) \
+        -> AsyncIterator[Dataset]:
+    """Harvests records with a `Harvester` made from the keyword arguments,
+    yielding the `Dataset` of each record harvested and skipping failures
+
+    Args:
+        urls (iterable of str): The URLs of the records
+    """
+    async with Harvester(**kwargs) as harvester:
+        result: HarvestResult
+        async for result in harvester.harvest(urls):
+            if result.dataset is not None:
+                yield result.dataset
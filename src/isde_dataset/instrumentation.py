@@ -0,0 +1,254 @@
+from typing import Any, Dict, Iterator, List, Optional
+
+import contextlib
+import threading
+
+__docformat__ = "google"
+
+_observer: Optional["Observer"] = None
+"""The active observer, or None when instrumentation is disabled. The
+instrumented code reads this once per record or per serialisation, so
+leaving instrumentation disabled costs a single attribute lookup."""
+
+
+class Observer(object):
+    """Receives measurements from the instrumented parts of the package.
+    Every method does nothing; subclass it and override the measurements of
+    interest, then pass an instance to `enable`.
+
+    Methods may be called from several threads at once, for instance when
+    records are parsed in a thread pool, and are called synchronously, so
+    they should be quick. Measurements taken in worker processes, such as
+    those of `isde_dataset.batch.translate_files`, are not seen by an
+    observer in the parent process.
+    """
+    def parsed(self, source_type: str, seconds: float):
+        """Called when a `Dataset` has parsed its source document
+
+        Args:
+            source_type (str): The name of the `DatasetSourceType` parsed
+            seconds (float): The time taken to parse the document
+        """
+
+    def extracted(self, field: str, seconds: float, matches: int):
+        """Called when a field has been extracted from an ISO record
+
+        Args:
+            field (str): The name of the field, such as "title"
+            seconds (float): The time taken to extract the field
+            matches (int): The number of elements the field's query
+                            matched, of which the last is used for every
+                            field but the keywords
+        """
+
+    def swallowed(self, field: str, error: BaseException):
+        """Called when extraction from an ISO record stops on an
+        AttributeError, which the `Dataset` swallows, leaving the field
+        and any later fields at their defaults
+
+        Args:
+            field (str): The name of the field being extracted
+            error (AttributeError): The error swallowed
+        """
+
+    def serialized(self, format: str, seconds: float):
+        """Called when a `Dataset` has been serialised
+
+        Args:
+            format (str): "fields" for `Dataset.to_dict`, "schema.org" or
+                            "dcat"
+            seconds (float): The time taken
+        """
+
+
+class _Timer(object):
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count: int = 0
+        self.seconds: float = 0.0
+
+    def add(self, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+
+    def snapshot(self) -> Dict[str, float]:
+        return {"count": self.count, "seconds": self.seconds}
+
+
+class Metrics(Observer):
+    """An `Observer` which accumulates counts and total times, which can be
+    read as a dictionary with `snapshot` or as Prometheus text with
+    `prometheus`
+
+    Args:
+        prefix (str): The prefix of the Prometheus metric names
+    """
+    def __init__(self, prefix: str = "isde_dataset"):
+        self._prefix: str = prefix
+        self._lock: threading.Lock = threading.Lock()
+        self._parse: Dict[str, _Timer] = dict()
+        self._extract: Dict[str, _Timer] = dict()
+        self._matches: Dict[str, int] = dict()
+        self._found: Dict[str, int] = dict()
+        self._swallowed: Dict[str, int] = dict()
+        self._serialize: Dict[str, _Timer] = dict()
+
+    def parsed(self, source_type: str, seconds: float):
+        with self._lock:
+            self._timer(self._parse, source_type).add(seconds)
+
+    def extracted(self, field: str, seconds: float, matches: int):
+        with self._lock:
+            self._timer(self._extract, field).add(seconds)
+            self._matches[field] = self._matches.get(field, 0) + matches
+            if matches:
+                self._found[field] = self._found.get(field, 0) + 1
+
+    def swallowed(self, field: str, error: BaseException):
+        with self._lock:
+            self._swallowed[field] = self._swallowed.get(field, 0) + 1
+
+    def serialized(self, format: str, seconds: float):
+        with self._lock:
+            self._timer(self._serialize, format).add(seconds)
+
+    @staticmethod
+    def _timer(timers: Dict[str, _Timer], key: str) -> _Timer:
+        timer: Optional[_Timer] = timers.get(key)
+        if timer is None:
+            timer = timers[key] = _Timer()
+        return timer
+
+    def reset(self):
+        """Discards every measurement"""
+        with self._lock:
+            self._parse.clear()
+            self._extract.clear()
+            self._matches.clear()
+            self._found.clear()
+            self._swallowed.clear()
+            self._serialize.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Returns a copy of the measurements as plain Python types
+
+        Returns:
+            dict: "parse", "extract" and "serialize" map each source type,
+                    field or format to its "count" and total "seconds", and
+                    for fields the total "matches" and the number of
+                    records in which the field was "found"; "swallowed"
+                    maps each field to the number of records whose
+                    extraction stopped on it
+        """
+        with self._lock:
+            extract: Dict[str, Dict[str, float]] = dict()
+            field: str
+            timer: _Timer
+            for field, timer in self._extract.items():
+                extract[field] = timer.snapshot()
+                extract[field]["matches"] = self._matches.get(field, 0)
+                extract[field]["found"] = self._found.get(field, 0)
+            return {"parse": {k: t.snapshot()
+                              for k, t in self._parse.items()},
+                    "extract": extract,
+                    "swallowed": dict(self._swallowed),
+                    "serialize": {k: t.snapshot()
+                                  for k, t in self._serialize.items()}}
+
+    def prometheus(self) -> str:
+        """Returns the measurements in the Prometheus text exposition
+        format, as counters"""
+        snapshot: Dict[str, Any] = self.snapshot()
+        lines: List[str] = list()
+
+        def counter(name: str, description: str, label: str,
+                    values: Dict[str, float]):
+            metric: str = "%s_%s" % (self._prefix, name)
+            lines.append("# HELP %s %s" % (metric, description))
+            lines.append("# TYPE %s counter" % metric)
+            key: str
+            for key in sorted(values):
+                lines.append('%s{%s="%s"} %r' % (
+                    metric, label,
+                    key.replace("\\", "\\\\").replace('"', '\\"'),
+                    values[key]))
+
+        sections: List[tuple] = [
+            ("parse", "source_type", "parses of a source document"),
+            ("extract", "field", "extractions of a field"),
+            ("serialize", "format", "serialisations of a Dataset")]
+        section: str
+        label: str
+        description: str
+        for section, label, description in sections:
+            counter(section + "_total", "Number of " + description, label,
+                    {k: v["count"] for k, v in snapshot[section].items()})
+            counter(section + "_seconds_total",
+                    "Total time in seconds of " + description, label,
+                    {k: v["seconds"] for k, v in snapshot[section].items()})
+        counter("extract_matches_total", "Number of elements matched",
+                "field", {k: v["matches"]
+                          for k, v in snapshot["extract"].items()})
+        counter("extract_found_total",
+                "Number of records in which a field was found", "field",
+                {k: v["found"] for k, v in snapshot["extract"].items()})
+        counter("extract_swallowed_total",
+                "Number of records whose extraction stopped on an "
+                "AttributeError in a field", "field", snapshot["swallowed"])
+        return "\n".join(lines) + "\n"
+
+
+def enable(observer: Optional[Observer] = None) -> Observer:
+    """Turns instrumentation on for the whole process
+
+    Args:
+        observer (Observer): The observer to receive measurements, by
+                                default a new `Metrics`
+
+    Returns:
+        Observer: The observer now receiving measurements
+    """
+    global _observer
+    if observer is None:
+        observer = Metrics()
+    _observer = observer
+    return observer
+
+
+def disable() -> Optional[Observer]:
+    """Turns instrumentation off
+
+    Returns:
+        Observer: The observer which was receiving measurements, if any
+    """
+    global _observer
+    observer: Optional[Observer] = _observer
+    _observer = None
+    return observer
+
+
+def active() -> Optional[Observer]:
+    """Returns the observer receiving measurements, or None if
+    instrumentation is disabled"""
+    return _observer
+
+
+@contextlib.contextmanager
+def instrumented(observer: Optional[Observer] = None) \
+        -> Iterator[Observer]:
+    """A context manager which turns instrumentation on while it is
+    entered, restoring the previous observer on exit
+
+    Args:
+        observer (Observer): As for `enable`
+
+    Yields:
+        Observer: The observer receiving measurements
+    """
+    global _observer
+    previous: Optional[Observer] = _observer
+    try:
+        yield enable(observer)
+    finally:
+        _observer = previous
@@ -0,0 +1,139 @@
+from . import Dataset, instrumentation
+from .boundingbox import BoundingBox
+from .doi import doi_url
+from typing import Any, Dict, IO, Iterable, List, Optional
+
+import json
+import time
+
+__docformat__ = "google"
+
+CONTEXT: str = "https://schema.org/"
+"""The JSON-LD context of the serialised `Dataset`s"""
+
+_ENCODER: json.JSONEncoder = json.JSONEncoder(ensure_ascii=False,
+                                              separators=(",", ":"))
+
+
+def to_schema_org(dataset: Dataset, context: bool = True) -> Dict[str, Any]:
+    """Maps a `Dataset` onto a schema.org Dataset, as a dictionary ready for
+    `json.dumps`
+
+    Empty text fields are left out, a digital object identifier is given as
+    a URL, by `doi_url`, both in `identifier` and in `sameAs`, or only in
+    `identifier` as it stands if it is not a DOI or URL, and the bounding
+    box becomes the `box` of a `GeoShape`, written as "south west north
+    east". A bounding box which was never set, with every extent 0, is left
+    out. A temporal extent becomes an ISO 8601 interval in
+    `temporalCoverage`, with ".." for an open start or end.
+
+    Args:
+        dataset (Dataset): The `Dataset` to map
+        context (bool): Whether to include the `@context`, which is not
+                        wanted for members of a `@graph`
+    """
+    observer: Optional[instrumentation.Observer] = instrumentation._observer
+    if observer is None:
+        return _to_schema_org(dataset, context)
+    started: float = time.perf_counter()
+    document: Dict[str, Any] = _to_schema_org(dataset, context)
+    observer.serialized("schema.org", time.perf_counter() - started)
+    return document
+
+
+def _to_schema_org(dataset: Dataset, context: bool) -> Dict[str, Any]:
+    document: Dict[str, Any] = {"@context": CONTEXT} if context else dict()
+    document["@type"] = "Dataset"
+    if dataset.title:
+        document["name"] = dataset.title
+    if dataset.abstract:
+        document["description"] = dataset.abstract
+    _add_identifiers(document, dataset)
+    if dataset.keywords:
+        document["keywords"] = list(dataset.keywords)
+    if dataset.citation_string:
+        document["citation"] = dataset.citation_string
+    if dataset.start_date is not None or dataset.end_date is not None:
+        document["temporalCoverage"] = "/".join(
+            ".." if d is None else d.isoformat() + "Z"
+            for d in (dataset.start_date, dataset.end_date))
+    bb: BoundingBox = dataset.bounding_box
+    if any((bb.north, bb.south, bb.east, bb.west)):
+        document["spatialCoverage"] = {
+            "@type": "Place",
+            "geo": {"@type": "GeoShape",
+                    "box": "%r %r %r %r" % (bb.south, bb.west, bb.north,
+                                            bb.east)}}
+    return document
+
+
+def _add_identifiers(document: Dict[str, Any], dataset: Dataset):
+    identifiers: List[str] = list()
+    if dataset.identifier:
+        identifiers.append(dataset.identifier)
+    if dataset.digital_object_identifier:
+        url: Optional[str] = doi_url(dataset.digital_object_identifier)
+        if url is None:
+            identifiers.append(dataset.digital_object_identifier)
+        else:
+            document["sameAs"] = url
+            identifiers.append(url)
+    if len(identifiers) == 1:
+        document["identifier"] = identifiers[0]
+    elif identifiers:
+        document["identifier"] = identifiers
+
+
+def dumps(dataset: Dataset) -> str:
+    """Serialises a `Dataset` as a compact schema.org JSON-LD document"""
+    return _ENCODER.encode(to_schema_org(dataset))
+
+
+def dump(dataset: Dataset, fp: IO[str]):
+    """Writes a `Dataset` as a schema.org JSON-LD document to a text file
+    object"""
+    fp.write(dumps(dataset))
+
+
+def dump_ndjson(datasets: Iterable[Dataset], fp: IO[str]) -> int:
+    """Writes each of a stream of `Dataset`s as one line of newline
+    delimited JSON-LD, holding only one record in memory at a time
+
+    Args:
+        datasets (iterable of Dataset): The `Dataset`s to write
+        fp (file object): A text file object
+
+    Returns:
+        int: The number of records written
+    """
+    count: int = 0
+    dataset: Dataset
+    for dataset in datasets:
+        fp.write(dumps(dataset))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def dump_graph(datasets: Iterable[Dataset], fp: IO[str]) -> int:
+    """Writes a stream of `Dataset`s as a single JSON-LD document whose
+    `@graph` holds one schema.org Dataset per record. The document is
+    written a record at a time, so it is never built in memory.
+
+    Args:
+        datasets (iterable of Dataset): The `Dataset`s to write
+        fp (file object): A text file object
+
+    Returns:
+        int: The number of records written
+    """
+    fp.write('{"@context":%s,"@graph":[' % _ENCODER.encode(CONTEXT))
+    count: int = 0
+    dataset: Dataset
+    for dataset in datasets:
+        if count:
+            fp.write(",")
+        fp.write(_ENCODER.encode(to_schema_org(dataset, context=False)))
+        count += 1
+    fp.write("]}")
+    return count
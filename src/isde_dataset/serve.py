@@ -0,0 +1,512 @@
+from . import Dataset, DatasetSourceType
+from .batch import _FORMATS
+from typing import Dict, List, Optional, Set, Tuple
+
+import argparse
+import asyncio
+import asyncio.base_events
+import bisect
+import concurrent.futures
+import json
+import os
+import signal
+import sys
+import time
+import urllib.parse
+
+__docformat__ = "google"
+
+CONTENT_TYPES: Dict[str, str] = {
+    "dcat": "text/turtle; charset=utf-8",
+    "fields": "application/json",
+    "schema.org": "application/ld+json"}
+"""The media type of the response for each output format"""
+
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+"""Upper bounds in seconds of the request latency histogram"""
+
+_REASONS: Dict[int, str] = {
+    200: "OK", 400: "Bad Request", 404: "Not Found",
+    405: "Method Not Allowed", 411: "Length Required",
+    413: "Payload Too Large", 500: "Internal Server Error",
+    503: "Service Unavailable"}
+
+_Item = Tuple[bytes, str]
+"""A record to translate and its output format"""
+
+_Outcome = Tuple[bool, str]
+"""Whether a record was translated, and its translation or the error"""
+
+
+def _warm() -> None:
+    """Worker initializer, which translates a minimal record so that every
+    module and code path is loaded before the first request arrives"""
+    _translate_batch([(b"<MD_Metadata/>", name) for name in _FORMATS])
+
+
+def _translate_batch(items: List[_Item]) -> List[_Outcome]:
+    """Translates a batch of records in a worker. A failure is reported for
+    its record alone."""
+    outcomes: List[_Outcome] = list()
+    body: bytes
+    format: str
+    for body, format in items:
+        try:
+            outcomes.append((True, _FORMATS[format](
+                Dataset(body, DatasetSourceType.ISO_XML_BYTES))))
+        except Exception as e:
+            outcomes.append((False, "%s: %s" % (type(e).__name__, e)))
+    return outcomes
+
+
+class _HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status: int = status
+
+
+class TranslationServer(object):
+    """A long running HTTP/1.1 service translating ISO19115/19139 records
+    on a pool of warm worker processes
+
+    `POST /translate?format=fields` with an ISO19139 XML document as the
+    body returns its translation, where format is "fields" for the JSON of
+    `Dataset.to_dict`, "schema.org" for JSON-LD or "dcat" for Turtle. A
+    document which cannot be translated gives a 400 response with a JSON
+    error. `GET /health` returns the state of the service as JSON, and
+    `GET /metrics` its counters in the Prometheus text format. Connections
+    are kept alive between requests.
+
+    Requests are queued, and whenever a worker is free it is sent every
+    queued request, up to batch_size, as one batch, so batches grow with
+    the load and the cost of passing work between processes is shared. Once
+    queue_size requests are waiting, further requests are refused at once
+    with a 503 response and a Retry-After header rather than left to time
+    out.
+
+    The workers are started, and have each translated a record, before the
+    server accepts connections, so no request pays for interpreter start-up
+    or imports.
+
+    Args:
+        workers (int): The number of worker processes, defaulting to the
+                        number of CPUs
+        batch_size (int): The most records sent to a worker at a time
+        queue_size (int): The most requests waiting for a worker
+        max_body (int): The largest request body accepted, in bytes
+        executor (concurrent.futures.Executor): An executor to run batches
+                        on in place of a process pool owned by the server,
+                        which is then neither started nor shut down by it
+
+    Raises:
+        ValueError: If workers, batch_size, queue_size or max_body is less
+                    than 1
+    """
+    def __init__(self, workers: Optional[int] = None, batch_size: int = 16,
+                 queue_size: int = 256, max_body: int = 16 << 20,
+                 executor: Optional[concurrent.futures.Executor] = None):
+        if workers is not None and workers < 1:
+            raise ValueError("workers must be at least 1")
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        if max_body < 1:
+            raise ValueError("max_body must be at least 1")
+        self._workers: int = workers or os.cpu_count() or 1
+        self._batch_size: int = batch_size
+        self._queue_size: int = queue_size
+        self._max_body: int = max_body
+        self._executor: Optional[concurrent.futures.Executor] = executor
+        self._owns_executor: bool = executor is None
+        self._queue: Optional[asyncio.Queue] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._dispatcher: Optional[asyncio.Future] = None
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self._started: float = time.time()
+        self._in_flight: int = 0
+        self._requests: Dict[int, int] = dict()
+        self._rejected: int = 0
+        self._batches: int = 0
+        self._batched: int = 0
+        self._latency: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._latency_sum: float = 0.0
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080,
+                    path: Optional[str] = None):
+        """Starts the workers, then listens for connections
+
+        Args:
+            host (str): The address to listen on
+            port (int): The TCP port to listen on, or 0 for any free port
+            path (str): If given, the path of a Unix socket to listen on in
+                        place of host and port
+        """
+        if self._executor is None:
+            await self._start_pool()
+        queue: asyncio.Queue = asyncio.Queue(self._queue_size)
+        self._queue = queue
+        self._dispatcher = asyncio.ensure_future(self._dispatch(
+            queue, asyncio.Semaphore(2 * self._workers)))
+        if path is not None:
+            self._server = await asyncio.start_unix_server(
+                self._connection, path)
+        else:
+            self._server = await asyncio.start_server(self._connection,
+                                                      host, port)
+
+    async def _start_pool(self):
+        """Starts a process pool and waits until every worker has imported
+        the translators, so that no request pays for a cold worker"""
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            self._workers, initializer=_warm)
+        await asyncio.gather(*(
+            loop.run_in_executor(self._executor, _warm)
+            for _ in range(self._workers)))
+
+    @property
+    def addresses(self) -> List[object]:
+        """list: The socket address of each listening socket"""
+        if self._server is None or self._server.sockets is None:
+            return list()
+        return [s.getsockname() for s in self._server.sockets]
+
+    async def close(self):
+        """Stops listening, closes idle connections, and shuts down the
+        workers if the server started them"""
+        if self._server is not None:
+            self._server.close()
+            writer: asyncio.StreamWriter
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            await asyncio.sleep(0)
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    async def __aenter__(self) -> "TranslationServer":
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def translate(self, body: bytes, format: str = "fields") -> str:
+        """Queues a record for translation and waits for the result
+
+        Args:
+            body (bytes): An ISO19139 XML document
+            format (str): The output format, a key of `CONTENT_TYPES`
+
+        Raises:
+            ValueError: If the record cannot be translated
+            asyncio.QueueFull: If the queue is full
+            RuntimeError: If the server has not been started
+        """
+        if self._queue is None:
+            raise RuntimeError("the server has not been started")
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(((body, format), future))
+        ok: bool
+        result: str
+        ok, result = await future
+        if not ok:
+            raise ValueError(result)
+        return result
+
+    async def _dispatch(self, queue: asyncio.Queue,
+                        slots: asyncio.Semaphore):
+        """Sends queued requests to the workers, each batch holding every
+        request queued when a worker slot comes free, up to batch_size"""
+        while True:
+            await slots.acquire()
+            batch: List[Tuple[_Item, asyncio.Future]] = [await queue.get()]
+            while len(batch) < self._batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            asyncio.ensure_future(self._run(batch, slots))
+
+    async def _run(self, batch: List[Tuple[_Item, asyncio.Future]],
+                   slots: asyncio.Semaphore):
+        """Translates a batch on the workers and answers its requests. If
+        the pool owned by the server has broken, as when a worker is
+        killed, it is shut down and replaced by a warmed pool before the
+        slot is given back."""
+        self._in_flight += 1
+        self._batches += 1
+        self._batched += len(batch)
+        executor: Optional[concurrent.futures.Executor] = self._executor
+        outcomes: List[_Outcome] = list()
+        try:
+            outcomes = await asyncio.get_running_loop().run_in_executor(
+                executor, _translate_batch, [item for item, _ in batch])
+        except Exception as e:
+            outcomes = [(False, "%s: %s" % (type(e).__name__, e))] * \
+                len(batch)
+            if isinstance(e, concurrent.futures.BrokenExecutor) and \
+                    self._owns_executor and executor is not None and \
+                    self._executor is executor:
+                executor.shutdown(wait=False)
+                await self._start_pool()
+        finally:
+            self._in_flight -= 1
+            slots.release()
+            future: asyncio.Future
+            outcome: _Outcome
+            for (_, future), outcome in zip(batch, outcomes):
+                if not future.done():
+                    future.set_result(outcome)
+
+    async def _connection(self, reader: asyncio.StreamReader,
+                          writer: asyncio.StreamWriter):
+        self._connections.add(writer)
+        try:
+            keep_alive: bool = True
+            while keep_alive:
+                line: bytes = await reader.readline()
+                if not line.strip():
+                    break
+                started: float = time.perf_counter()
+                status: int
+                headers: Dict[str, str] = dict()
+                body: bytes = bytes()
+                try:
+                    method, target, version = line.decode("latin-1").split()
+                    headers = await self._headers(reader)
+                    keep_alive = version == "HTTP/1.1" and \
+                        headers.get("connection", "").lower() != "close"
+                    body = await self._body(reader, headers)
+                    status, headers, body = await self._route(
+                        method, target, body)
+                except _HTTPError as e:
+                    keep_alive = False
+                    status, headers, body = self._error(e.status, str(e))
+                except ValueError:
+                    keep_alive = False
+                    status, headers, body = self._error(
+                        400, "malformed request")
+                self._requests[status] = self._requests.get(status, 0) + 1
+                self._observe(time.perf_counter() - started)
+                writer.write(self._response(status, headers, body,
+                                            keep_alive))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _headers(self, reader: asyncio.StreamReader) -> Dict[str, str]:
+        headers: Dict[str, str] = dict()
+        while True:
+            line: bytes = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                return headers
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+    async def _body(self, reader: asyncio.StreamReader,
+                    headers: Dict[str, str]) -> bytes:
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks: List[bytes] = list()
+            size: int = 0
+            while True:
+                length: int = int((await reader.readline()).split(b";")[0],
+                                  16)
+                if not length:
+                    break
+                size += length
+                if size > self._max_body:
+                    raise _HTTPError(413, "request body too large")
+                chunks.append(await reader.readexactly(length))
+                await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            return b"".join(chunks)
+        length = int(headers.get("content-length", 0))
+        if length > self._max_body:
+            raise _HTTPError(413, "request body too large")
+        return await reader.readexactly(length)
+
+    async def _route(self, method: str, target: str, body: bytes) \
+            -> Tuple[int, Dict[str, str], bytes]:
+        try:
+            return await self._resource(method, target, body)
+        except _HTTPError as e:
+            return self._error(e.status, str(e))
+
+    async def _resource(self, method: str, target: str, body: bytes) \
+            -> Tuple[int, Dict[str, str], bytes]:
+        url: urllib.parse.SplitResult = urllib.parse.urlsplit(target)
+        if url.path == "/health":
+            return self._health_resource(method)
+        if url.path == "/metrics":
+            return self._metrics_resource(method)
+        if url.path == "/translate":
+            return await self._translate_resource(method, url.query, body)
+        raise _HTTPError(404, "no such resource: " + url.path)
+
+    def _health_resource(self, method: str) \
+            -> Tuple[int, Dict[str, str], bytes]:
+        if method != "GET":
+            raise _HTTPError(405, "use GET")
+        return 200, {"Content-Type": "application/json"}, json.dumps(
+            self.health()).encode()
+
+    def _metrics_resource(self, method: str) \
+            -> Tuple[int, Dict[str, str], bytes]:
+        if method != "GET":
+            raise _HTTPError(405, "use GET")
+        return 200, {"Content-Type": "text/plain; version=0.0.4"}, \
+            self.metrics().encode()
+
+    async def _translate_resource(self, method: str, query: str,
+                                  body: bytes) \
+            -> Tuple[int, Dict[str, str], bytes]:
+        if method != "POST":
+            raise _HTTPError(405, "use POST")
+        format: str = urllib.parse.parse_qs(query).get(
+            "format", ["fields"])[-1]
+        if format not in CONTENT_TYPES:
+            raise _HTTPError(400, "format must be one of " +
+                             ", ".join(sorted(CONTENT_TYPES)))
+        try:
+            result: str = await self.translate(body, format)
+        except asyncio.QueueFull:
+            self._rejected += 1
+            status, headers, payload = self._error(503, "queue full")
+            headers["Retry-After"] = "1"
+            return status, headers, payload
+        except ValueError as e:
+            return self._error(400, str(e))
+        return 200, {"Content-Type": CONTENT_TYPES[format]}, result.encode()
+
+    @staticmethod
+    def _error(status: int, message: str) \
+            -> Tuple[int, Dict[str, str], bytes]:
+        return status, {"Content-Type": "application/json"}, json.dumps(
+            {"error": message}).encode()
+
+    @staticmethod
+    def _response(status: int, headers: Dict[str, str], body: bytes,
+                  keep_alive: bool) -> bytes:
+        head: str = "HTTP/1.1 %d %s\r\nContent-Length: %d\r\n" % (
+            status, _REASONS.get(status, ""), len(body))
+        if not keep_alive:
+            head += "Connection: close\r\n"
+        head += "".join("%s: %s\r\n" % h for h in headers.items())
+        return (head + "\r\n").encode("latin-1") + body
+
+    def _observe(self, seconds: float):
+        self._latency[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self._latency_sum += seconds
+
+    def health(self) -> Dict[str, object]:
+        """Returns the state of the service: its status, which is "ok"
+        unless the queue is full, the number of workers, the requests
+        queued and the batches being translated"""
+        queued: int = 0 if self._queue is None else self._queue.qsize()
+        return {"status": "ok" if queued < self._queue_size else "busy",
+                "workers": self._workers, "queued": queued,
+                "in_flight": self._in_flight,
+                "uptime": time.time() - self._started}
+
+    def metrics(self) -> str:
+        """Returns the counters of the service in the Prometheus text
+        exposition format"""
+        health: Dict[str, object] = self.health()
+        lines: List[str] = [
+            "# HELP isde_serve_requests_total Requests answered",
+            "# TYPE isde_serve_requests_total counter"]
+        lines.extend('isde_serve_requests_total{status="%d"} %d' % s
+                     for s in sorted(self._requests.items()))
+        name: str
+        kind: str
+        description: str
+        value: object
+        for name, kind, description, value in (
+                ("rejected_total", "counter",
+                 "Requests refused because the queue was full",
+                 self._rejected),
+                ("batches_total", "counter", "Batches sent to the workers",
+                 self._batches),
+                ("batched_records_total", "counter",
+                 "Records sent to the workers", self._batched),
+                ("queued", "gauge", "Requests waiting for a worker",
+                 health["queued"]),
+                ("in_flight", "gauge", "Batches being translated",
+                 health["in_flight"]),
+                ("workers", "gauge", "Worker processes", self._workers)):
+            lines.append("# HELP isde_serve_%s %s" % (name, description))
+            lines.append("# TYPE isde_serve_%s %s" % (name, kind))
+            lines.append("isde_serve_%s %s" % (name, value))
+        lines.append("# HELP isde_serve_request_duration_seconds Time to "
+                     "answer a request")
+        lines.append("# TYPE isde_serve_request_duration_seconds histogram")
+        count: int = 0
+        bound: float
+        for bound, n in zip(LATENCY_BUCKETS + (float("inf"),),
+                            self._latency):
+            count += n
+            lines.append(
+                'isde_serve_request_duration_seconds_bucket{le="%s"} %d' % (
+                    "+Inf" if bound == float("inf") else repr(bound),
+                    count))
+        lines.append("isde_serve_request_duration_seconds_sum %r" %
+                     self._latency_sum)
+        lines.append("isde_serve_request_duration_seconds_count %d" % count)
+        return "\n".join(lines) + "\n"
+
+
+async def _serve(args: argparse.Namespace):
+    server: TranslationServer = TranslationServer(
+        args.workers, args.batch_size, args.queue_size)
+    stop: asyncio.Event = asyncio.Event()
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    signum: int
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass
+    async with server:
+        await server.start(args.host, args.port, args.unix)
+        sys.stderr.write("listening on %s\n" % ", ".join(
+            str(a) for a in server.addresses))
+        await stop.wait()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Console entry point, run as `python -m isde_dataset.serve`, which
+    serves until interrupted
+
+    Returns:
+        int: 0 once the server has stopped
+    """
+    parser = argparse.ArgumentParser(
+        prog="isde-serve",
+        description="Serve translations of ISO19115/19139 records over "
+                    "HTTP from a pool of warm worker processes")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on")
+    parser.add_argument("-p", "--port", type=int, default=8080,
+                        help="TCP port to listen on")
+    parser.add_argument("--unix", default=None,
+                        help="listen on this Unix socket in place of a port")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes")
+    parser.add_argument("-b", "--batch-size", type=int, default=16,
+                        help="most records sent to a worker at a time")
+    parser.add_argument("-q", "--queue-size", type=int, default=256,
+                        help="most requests waiting before requests are "
+                             "refused")
+    args = parser.parse_args(argv)
+    asyncio.run(_serve(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
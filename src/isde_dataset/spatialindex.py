@@ -0,0 +1,299 @@
+from .boundingbox import BoundingBox
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Set, \
+    Tuple
+
+import heapq
+import math
+
+__docformat__ = "google"
+
+_Rect = Tuple[float, float, float, float]
+"""A rectangle which does not cross the antimeridian, as (west, south, east,
+north)"""
+
+
+_NODE: int = 0
+_PACKED_ITEM: int = 1
+_BUFFERED_ITEM: int = 2
+
+
+def _pieces(bb: BoundingBox) -> Tuple[_Rect, ...]:
+    """Splits a `BoundingBox` into rectangles which do not cross the
+    antimeridian. A box with east < west is taken to cross it, so becomes
+    one piece running east to 180 and one running from -180."""
+    if bb.east < bb.west:
+        return ((bb.west, bb.south, 180.0, bb.north),
+                (-180.0, bb.south, bb.east, bb.north))
+    return ((bb.west, bb.south, bb.east, bb.north),)
+
+
+def _rect_intersects(a: _Rect, b: _Rect) -> bool:
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def _rect_within(a: _Rect, b: _Rect) -> bool:
+    return b[0] <= a[0] and a[2] <= b[2] and b[1] <= a[1] and a[3] <= b[3]
+
+
+def _pieces_intersect(a: Tuple[_Rect, ...], b: Tuple[_Rect, ...]) -> bool:
+    return any(_rect_intersects(i, j) for i in a for j in b)
+
+
+def _pieces_within(a: Tuple[_Rect, ...], b: Tuple[_Rect, ...]) -> bool:
+    return all(any(_rect_within(i, j) for j in b) for i in a)
+
+
+def _gap(low: float, high: float, x: float) -> float:
+    if x < low:
+        return low - x
+    if x > high:
+        return x - high
+    return 0.0
+
+
+def _point_distance(rect: _Rect, longitude: float, latitude: float) \
+        -> float:
+    """Planar distance in degrees from a point to a rectangle, taking the
+    shorter way round in longitude"""
+    dx: float = min(_gap(rect[0], rect[2], longitude),
+                    _gap(rect[0], rect[2], longitude + 360.0),
+                    _gap(rect[0], rect[2], longitude - 360.0))
+    return math.hypot(dx, _gap(rect[1], rect[3], latitude))
+
+
+def _envelope(rects: List[Any]) -> _Rect:
+    return (min(r[0] for r in rects), min(r[1] for r in rects),
+            max(r[2] for r in rects), max(r[3] for r in rects))
+
+
+class _Node(object):
+    """A node of the packed R-tree. Leaf entries are (west, south, east,
+    north, item) tuples, and branch entries are `_Node`s"""
+    __slots__ = ("rect", "entries", "leaf")
+
+    def __init__(self, entries: List[Any], leaf: bool):
+        self.entries: List[Any] = entries
+        self.leaf: bool = leaf
+        self.rect: _Rect = _envelope(
+            entries if leaf else [e.rect for e in entries])
+
+    def __getitem__(self, i: int) -> float:
+        return self.rect[i]
+
+
+def _str_pack(entries: List[Any], capacity: int, leaf: bool) \
+        -> List[_Node]:
+    """Packs entries into nodes with the Sort-Tile-Recursive algorithm"""
+    nodes: List[_Node] = list()
+    slices: int = math.ceil(math.sqrt(math.ceil(len(entries) / capacity)))
+    per_slice: int = slices * capacity
+    entries = sorted(entries, key=lambda r: r[0] + r[2])
+    i: int
+    j: int
+    for i in range(0, len(entries), per_slice):
+        vertical: List[Any] = sorted(entries[i:i + per_slice],
+                                     key=lambda r: r[1] + r[3])
+        for j in range(0, len(vertical), capacity):
+            nodes.append(_Node(vertical[j:j + capacity], leaf))
+    return nodes
+
+
+class SpatialIndex(object):
+    """A spatial index over the bounding boxes of many items, usually
+    `Dataset`s, for intersects, contains, within and nearest neighbour
+    queries
+
+    The index is a Sort-Tile-Recursive packed R-tree. Items inserted after
+    it was built are kept in a small unpacked buffer and deleted items are
+    masked, and the tree is repacked once these amount to an eighth of the
+    index, so inserts and deletes are cheap on average while queries stay
+    logarithmic.
+
+    Note:
+        Bounding boxes are taken to be in degrees of longitude and latitude.
+        A box whose east extent is less than its west extent is taken to
+        cross the antimeridian, as allowed for by `BoundingBox`. Boxes with
+        no width or height, such as the location of a single station, are
+        indexed as points.
+
+    Args:
+        items (iterable): Items to bulk load, each of which must be hashable
+                            and have a `bounding_box` attribute
+        node_capacity (int): The maximum number of entries in a tree node
+
+    Raises:
+        ValueError: If node_capacity is less than 2
+    """
+    def __init__(self, items: Iterable[Any] = (), node_capacity: int = 16):
+        if node_capacity < 2:
+            raise ValueError("node_capacity must be at least 2")
+        self._capacity: int = node_capacity
+        self._boxes: Dict[Hashable, Tuple[_Rect, ...]] = dict()
+        self._root: Optional[_Node] = None
+        self._buffer: Dict[Hashable, Tuple[_Rect, ...]] = dict()
+        self._deleted: Set[Hashable] = set()
+        self.bulk_load((item, item.bounding_box) for item in items)
+
+    def __len__(self) -> int:
+        return len(self._boxes)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._boxes
+
+    def bulk_load(self, items: Iterable[Tuple[Hashable, BoundingBox]]):
+        """Adds many items at once and repacks the tree
+
+        Args:
+            items (iterable): (item, `BoundingBox`) pairs. An item already in
+                                the index has its bounding box replaced
+        """
+        item: Hashable
+        bb: BoundingBox
+        for item, bb in items:
+            self._boxes[item] = _pieces(bb)
+        self._pack()
+
+    def insert(self, item: Any,
+               bounding_box: Optional[BoundingBox] = None):
+        """Adds an item to the index, replacing it if already present
+
+        Args:
+            item: A hashable item, such as a `Dataset`
+            bounding_box (BoundingBox): The extent of the item, defaulting to
+                                        its `bounding_box` attribute
+        """
+        if item in self._boxes:
+            self.delete(item)
+        pieces: Tuple[_Rect, ...] = _pieces(
+            item.bounding_box if bounding_box is None else bounding_box)
+        self._boxes[item] = pieces
+        self._buffer[item] = pieces
+        self._maybe_pack()
+
+    def delete(self, item: Hashable) -> bool:
+        """Removes an item from the index
+
+        Args:
+            item: The item to remove
+
+        Returns:
+            bool: True if the item was in the index
+        """
+        if self._boxes.pop(item, None) is None:
+            return False
+        if self._buffer.pop(item, None) is None:
+            self._deleted.add(item)
+            self._maybe_pack()
+        return True
+
+    def intersects(self, bounding_box: BoundingBox) -> List[Any]:
+        """Returns the items whose bounding box shares at least one point,
+        including an edge or corner, with bounding_box"""
+        return list(self._candidates(_pieces(bounding_box)))
+
+    def contains(self, bounding_box: BoundingBox) -> List[Any]:
+        """Returns the items whose bounding box wholly contains
+        bounding_box, for example every item covering a given point"""
+        query: Tuple[_Rect, ...] = _pieces(bounding_box)
+        return [item for item in self._candidates(query)
+                if _pieces_within(query, self._boxes[item])]
+
+    def within(self, bounding_box: BoundingBox) -> List[Any]:
+        """Returns the items whose bounding box lies wholly within
+        bounding_box, for example every item inside a map view"""
+        query: Tuple[_Rect, ...] = _pieces(bounding_box)
+        return [item for item in self._candidates(query)
+                if _pieces_within(self._boxes[item], query)]
+
+    def nearest(self, latitude: float, longitude: float, k: int = 1) \
+            -> List[Any]:
+        """Returns up to k items nearest to a point, closest first
+
+        Distance is measured in degrees on the plane, taking the shorter
+        way round in longitude, and is zero for items covering the point.
+
+        Args:
+            latitude (float): Latitude of the point
+            longitude (float): Longitude of the point
+            k (int): The number of items to return
+        """
+        heap: List[Tuple[float, int, int, Any]] = list()
+        counter: int = 0
+        item: Hashable
+        rect: _Rect
+        for item, pieces in self._buffer.items():
+            for rect in pieces:
+                counter += 1
+                heap.append((_point_distance(rect, longitude, latitude),
+                             counter, _BUFFERED_ITEM, item))
+        if self._root is not None:
+            heap.append((_point_distance(self._root.rect, longitude,
+                                         latitude), 0, _NODE, self._root))
+        heapq.heapify(heap)
+        found: List[Any] = list()
+        seen: Set[Hashable] = set()
+        while heap and len(found) < k:
+            distance, _, kind, value = heapq.heappop(heap)
+            if kind == _NODE:
+                for entry in value.entries:
+                    counter += 1
+                    if value.leaf:
+                        heapq.heappush(heap, (
+                            _point_distance(entry, longitude, latitude),
+                            counter, _PACKED_ITEM, entry[4]))
+                    else:
+                        heapq.heappush(heap, (
+                            _point_distance(entry.rect, longitude, latitude),
+                            counter, _NODE, entry))
+            elif value not in seen and \
+                    (kind == _BUFFERED_ITEM or value not in self._deleted):
+                seen.add(value)
+                found.append(value)
+        return found
+
+    def _candidates(self, query: Tuple[_Rect, ...]) -> List[Any]:
+        found: Dict[Hashable, None] = dict()
+        rect: _Rect
+        item: Hashable
+        if self._root is not None:
+            for rect in query:
+                self._search(self._root, rect, found)
+        for item in self._deleted:
+            found.pop(item, None)
+        for item, pieces in self._buffer.items():
+            if _pieces_intersect(pieces, query):
+                found[item] = None
+        return list(found)
+
+    def _search(self, node: _Node, rect: _Rect, found: Dict[Hashable, None]):
+        stack: List[_Node] = [node]
+        entry: Any
+        while stack:
+            node = stack.pop()
+            if node.leaf:
+                for entry in node.entries:
+                    if _rect_intersects(entry, rect):
+                        found[entry[4]] = None
+            else:
+                for entry in node.entries:
+                    if _rect_intersects(entry.rect, rect):
+                        stack.append(entry)
+
+    def _maybe_pack(self):
+        if len(self._buffer) + len(self._deleted) > \
+                max(self._capacity, len(self._boxes) // 8):
+            self._pack()
+
+    def _pack(self):
+        entries: List[Any] = [rect + (item,)
+                              for item, pieces in self._boxes.items()
+                              for rect in pieces]
+        self._buffer = dict()
+        self._deleted = set()
+        self._root = None
+        if not entries:
+            return
+        nodes: List[_Node] = _str_pack(entries, self._capacity, True)
+        while len(nodes) > 1:
+            nodes = _str_pack(nodes, self._capacity, False)
+        self._root = nodes[0]
@@ -0,0 +1,58 @@
+from . import Dataset, DatasetSourceType
+from typing import BinaryIO, Iterator, List, Union
+
+import xml.etree.ElementTree
+
+__docformat__ = "google"
+
+ISO_RECORD_TAGS: frozenset = frozenset((
+    "{http://www.isotc211.org/2005/gmd}MD_Metadata",
+    "{http://www.isotc211.org/2005/gmi}MI_Metadata"))
+"""Element tags which delimit a single ISO19115/19139 record"""
+
+
+def iter_iso_datasets(source: Union[str, BinaryIO]) -> Iterator[Dataset]:
+    """Incrementally parse a file holding any number of ISO19115/19139
+    records, such as a CSW GetRecords response or a catalogue dump, yielding
+    one `Dataset` per record.
+
+    Each record is handed to `Dataset` as soon as its closing tag has been
+    read, after which its subtree is cleared and detached from its parent, so
+    peak memory is bounded by the largest single record rather than by the
+    whole file. Records nested inside another record are treated as part of
+    the enclosing record.
+
+    Args:
+        source (str or file object): A filename or a binary file object
+
+    Yields:
+        Dataset: One `Dataset` per outermost `gmd:MD_Metadata` or
+                    `gmi:MI_Metadata` element, in document order
+
+    Raises:
+        xml.etree.ElementTree.ParseError: If the source is not well formed
+    """
+    parents: List[xml.etree.ElementTree.Element] = list()
+    depth: int = 0
+    event: str
+    elem: xml.etree.ElementTree.Element
+    for event, elem in xml.etree.ElementTree.iterparse(source,
+                                                       ("start", "end")):
+        if event == "start":
+            if elem.tag in ISO_RECORD_TAGS:
+                depth += 1
+            parents.append(elem)
+            continue
+        parents.pop()
+        if elem.tag not in ISO_RECORD_TAGS:
+            if not depth and parents:
+                parents[-1].remove(elem)
+            continue
+        depth -= 1
+        if depth:
+            continue
+        yield Dataset(xml.etree.ElementTree.ElementTree(elem),
+                      DatasetSourceType.ISO_XML)
+        elem.clear()
+        if parents:
+            parents[-1].remove(elem)
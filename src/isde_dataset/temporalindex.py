@@ -0,0 +1,258 @@
+from ._isoextractor import _timestamp
+from array import array
+from typing import Any, Dict, Hashable, Iterable, List, Optional, \
+    Set, Tuple
+
+import bisect
+import datetime
+import math
+
+__docformat__ = "google"
+
+_Interval = Tuple[float, float]
+"""An interval as (start, end) in seconds since the epoch, with -inf for an
+open start and inf for an open end"""
+
+_TimeRange = Tuple[Optional[datetime.datetime], Optional[datetime.datetime]]
+"""A temporal extent as (start, end), either of which may be None"""
+
+
+def _interval(time_range: _TimeRange) -> _Interval:
+    return (_timestamp(time_range[0], -math.inf),
+            _timestamp(time_range[1], math.inf))
+
+
+class TemporalIndex(object):
+    """An index over the temporal extents of many items, usually
+    `Dataset`s, for overlap and containment queries over time windows
+
+    Extents are held sorted by start in contiguous arrays, with a packed
+    tree over fixed size blocks of the sorted order recording the latest end
+    in each subtree, so a query only visits the blocks which can hold a
+    match. Open-ended extents are held apart, sorted by start, so that they
+    do not hide the end of every block they fall in, and are found by
+    bisection alone.
+
+    As for `isde_dataset.spatialindex.SpatialIndex`, items inserted after
+    the index was built are kept in a small unsorted buffer and deleted
+    items are masked, and the index is rebuilt once these amount to an
+    eighth of it.
+
+    Note:
+        A start of None is taken to be unbounded in the past, and an end of
+        None to be open-ended, as for a time series which is still being
+        added to, so such an extent overlaps every window from its start
+        onwards. Items with neither a start nor an end have no temporal
+        extent and are not indexed. Naive datetimes are taken to be in UTC,
+        as for `Dataset.start_date`.
+
+    Args:
+        items (iterable): Items to bulk load, each of which must be hashable
+                            and have `start_date` and `end_date` attributes
+        leaf_size (int): The number of extents in each block
+
+    Raises:
+        ValueError: If leaf_size is less than 1
+    """
+    def __init__(self, items: Iterable[Any] = (), leaf_size: int = 32):
+        if leaf_size < 1:
+            raise ValueError("leaf_size must be at least 1")
+        self._leaf_size: int = leaf_size
+        self._intervals: Dict[Hashable, _Interval] = dict()
+        self._buffer: Dict[Hashable, _Interval] = dict()
+        self._deleted: Set[Hashable] = set()
+        self._items: List[Hashable] = list()
+        self._starts: array = array("d")
+        self._ends: array = array("d")
+        self._latest: array = array("d")
+        self._leaves: int = 1
+        self._open_items: List[Hashable] = list()
+        self._open_starts: array = array("d")
+        self.bulk_load((item, (item.start_date, item.end_date))
+                       for item in items)
+
+    def __len__(self) -> int:
+        return len(self._intervals)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._intervals
+
+    def bulk_load(self, items: Iterable[Tuple[Hashable, _TimeRange]]):
+        """Adds many items at once and rebuilds the index
+
+        Args:
+            items (iterable): (item, (start, end)) pairs. An item already in
+                                the index has its extent replaced
+        """
+        item: Hashable
+        time_range: _TimeRange
+        for item, time_range in items:
+            if time_range[0] is None and time_range[1] is None:
+                self._intervals.pop(item, None)
+            else:
+                self._intervals[item] = _interval(time_range)
+        self._pack()
+
+    def insert(self, item: Any,
+               time_range: Optional[_TimeRange] = None):
+        """Adds an item to the index, replacing it if already present
+
+        Args:
+            item: A hashable item, such as a `Dataset`
+            time_range (tuple): The extent of the item as a (start, end)
+                                pair of datetimes, defaulting to its
+                                `start_date` and `end_date` attributes
+        """
+        if item in self._intervals:
+            self.delete(item)
+        if time_range is None:
+            time_range = (item.start_date, item.end_date)
+        if time_range[0] is None and time_range[1] is None:
+            return
+        interval: _Interval = _interval(time_range)
+        self._intervals[item] = interval
+        self._buffer[item] = interval
+        self._maybe_pack()
+
+    def delete(self, item: Hashable) -> bool:
+        """Removes an item from the index
+
+        Args:
+            item: The item to remove
+
+        Returns:
+            bool: True if the item was in the index
+        """
+        if self._intervals.pop(item, None) is None:
+            return False
+        if self._buffer.pop(item, None) is None:
+            self._deleted.add(item)
+            self._maybe_pack()
+        return True
+
+    def overlaps(self, start: Optional[datetime.datetime] = None,
+                 end: Optional[datetime.datetime] = None) -> List[Any]:
+        """Returns the items whose extent shares at least one instant with
+        the window from start to end, such as every `Dataset` with data
+        between 2010 and 2015
+
+        Args:
+            start (datetime.datetime): The start of the window, or None for
+                                        no start
+            end (datetime.datetime): The end of the window, or None for no
+                                        end
+
+        Raises:
+            ValueError: If start is after end
+        """
+        low, high = self._window(start, end)
+        found: List[Any] = self._scan(
+            bisect.bisect_right(self._starts, high), low)
+        found.extend(self._open(0, bisect.bisect_right(self._open_starts,
+                                                       high)))
+        found.extend(item for item, (s, e) in self._buffer.items()
+                     if s <= high and low <= e)
+        return found
+
+    def contains(self, start: Optional[datetime.datetime] = None,
+                 end: Optional[datetime.datetime] = None) -> List[Any]:
+        """Returns the items whose extent covers the whole window from start
+        to end, with the arguments as for `overlaps`"""
+        low, high = self._window(start, end)
+        found: List[Any] = self._scan(
+            bisect.bisect_right(self._starts, low), high)
+        found.extend(self._open(0, bisect.bisect_right(self._open_starts,
+                                                       low)))
+        found.extend(item for item, (s, e) in self._buffer.items()
+                     if s <= low and high <= e)
+        return found
+
+    def within(self, start: Optional[datetime.datetime] = None,
+               end: Optional[datetime.datetime] = None) -> List[Any]:
+        """Returns the items whose extent lies wholly inside the window from
+        start to end, with the arguments as for `overlaps`"""
+        low, high = self._window(start, end)
+        found: List[Any] = [
+            self._items[i] for i in range(
+                bisect.bisect_left(self._starts, low),
+                bisect.bisect_right(self._starts, high))
+            if self._ends[i] <= high and self._items[i] not in self._deleted]
+        if high == math.inf:
+            found.extend(self._open(
+                bisect.bisect_left(self._open_starts, low),
+                len(self._open_items)))
+        found.extend(item for item, (s, e) in self._buffer.items()
+                     if low <= s and e <= high)
+        return found
+
+    def at(self, instant: datetime.datetime) -> List[Any]:
+        """Returns the items whose extent includes an instant"""
+        return self.contains(instant, instant)
+
+    def _window(self, start: Optional[datetime.datetime],
+                end: Optional[datetime.datetime]) -> _Interval:
+        window: _Interval = _interval((start, end))
+        if window[0] > window[1]:
+            raise ValueError("start must not be after end")
+        return window
+
+    def _open(self, first: int, last: int) -> List[Any]:
+        return [item for item in self._open_items[first:last]
+                if item not in self._deleted]
+
+    def _scan(self, count: int, threshold: float) -> List[Any]:
+        """Finds the items among the first count in start order whose end is
+        at or after threshold, descending only into subtrees whose latest
+        end reaches it"""
+        found: List[Any] = list()
+        latest: array = self._latest
+        ends: array = self._ends
+        deleted: Set[Hashable] = self._deleted
+        size: int = self._leaf_size
+        stack: List[Tuple[int, int, int]] = [(1, 0, self._leaves)]
+        while stack:
+            node, first, span = stack.pop()
+            if first * size >= count or latest[node] < threshold:
+                continue
+            if span > 1:
+                half: int = span // 2
+                stack.append((2 * node + 1, first + half, half))
+                stack.append((2 * node, first, half))
+                continue
+            i: int
+            for i in range(first * size, min(first * size + size, count)):
+                if ends[i] >= threshold and self._items[i] not in deleted:
+                    found.append(self._items[i])
+        return found
+
+    def _maybe_pack(self):
+        if len(self._buffer) + len(self._deleted) > \
+                max(self._leaf_size, len(self._intervals) // 8):
+            self._pack()
+
+    def _pack(self):
+        order: List[Tuple[Hashable, _Interval]] = sorted(
+            self._intervals.items(), key=lambda entry: entry[1][0])
+        self._open_items = [item for item, interval in order
+                            if interval[1] == math.inf]
+        self._open_starts = array("d", (interval[0] for _, interval in order
+                                        if interval[1] == math.inf))
+        order = [entry for entry in order if entry[1][1] != math.inf]
+        self._items = [item for item, _ in order]
+        self._starts = array("d", (interval[0] for _, interval in order))
+        self._ends = array("d", (interval[1] for _, interval in order))
+        self._buffer = dict()
+        self._deleted = set()
+        blocks: int = -(-len(order) // self._leaf_size)
+        self._leaves = 1
+        while self._leaves < blocks:
+            self._leaves *= 2
+        latest: array = array("d", [-math.inf]) * (2 * self._leaves)
+        j: int
+        for j in range(blocks):
+            latest[self._leaves + j] = max(
+                self._ends[j * self._leaf_size:(j + 1) * self._leaf_size])
+        node: int
+        for node in range(self._leaves - 1, 0, -1):
+            latest[node] = max(latest[2 * node], latest[2 * node + 1])
+        self._latest = latest
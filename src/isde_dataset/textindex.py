@@ -0,0 +1,385 @@
+from . import Dataset
+from array import array
+from typing import Dict, IO, Iterable, List, Optional, Pattern, Set, Tuple
+
+import base64
+import json
+import math
+import re
+import sys
+import unicodedata
+
+__docformat__ = "google"
+
+FORMAT_VERSION: int = 1
+"""Version of the file layout written by `TextIndex.dump`"""
+
+_TOKEN: Pattern = re.compile(r"\w+")
+_CLAUSE: Pattern = re.compile(r'"([^"]*)"|(\S+)')
+
+_FIELD_GAP: int = 1
+"""Positions skipped between indexed fields, so a phrase cannot match across
+the end of one field and the start of the next"""
+
+_PURGE_MINIMUM: int = 1024
+"""Number of deleted `Dataset`s below which their postings are never
+purged"""
+
+
+def tokenize(text: str) -> List[str]:
+    """Splits text into normalised terms: runs of letters and digits, case
+    folded and with accents removed, so that "Éire" and "eire" match"""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(c for c in text if not unicodedata.combining(c))
+    return _TOKEN.findall(text.casefold())
+
+
+def _parse_query(query: str) -> List[Tuple[str, ...]]:
+    """Splits a query into clauses, each a tuple of terms. A clause of more
+    than one term is a phrase, given in double quotes or arising from a word
+    such as "sea-water" which tokenizes into several terms."""
+    clauses: List[Tuple[str, ...]] = list()
+    match: "re.Match"
+    for match in _CLAUSE.finditer(query):
+        terms: Tuple[str, ...] = tuple(tokenize(
+            match.group(1) if match.group(1) is not None
+            else match.group(2)))
+        if terms:
+            clauses.append(terms)
+    return clauses
+
+
+def _encode(postings: Dict[int, List[int]]) -> str:
+    """Packs the postings of a term as little-endian unsigned integers, each
+    document number followed by its number of positions and then the
+    positions, in base 64"""
+    values: array = array("I")
+    doc: int
+    positions: List[int]
+    for doc, positions in postings.items():
+        values.append(doc)
+        values.append(len(positions))
+        values.extend(positions)
+    if sys.byteorder == "big":  # pragma: no cover
+        values.byteswap()
+    return base64.b64encode(values.tobytes()).decode("ascii")
+
+
+def _decode(encoded: str) -> Dict[int, List[int]]:
+    values: array = array("I")
+    values.frombytes(base64.b64decode(encoded))
+    if sys.byteorder == "big":  # pragma: no cover
+        values.byteswap()
+    postings: Dict[int, List[int]] = dict()
+    i: int = 0
+    while i < len(values):
+        postings[values[i]] = values[i + 2:i + 2 + values[i + 1]].tolist()
+        i += 2 + values[i + 1]
+    return postings
+
+
+class TextIndex(object):
+    """An inverted index over the text and topic keywords of many
+    `Dataset`s, for ranked full-text search and keyword facets
+
+    The title, abstract and citation string of each `Dataset` are tokenized
+    with `tokenize` and indexed with the positions of their terms, so that
+    both term and phrase queries can be answered from the postings alone.
+    Results are ranked with Okapi BM25. Keywords are not tokenized but kept
+    as an exact-match facet, which can filter a query and be counted over
+    its results.
+
+    Each `Dataset` is indexed under a string key, by default its identifier,
+    and can be replaced or deleted at any time. Deleted `Dataset`s are
+    masked, and their postings are purged once they outnumber those still
+    indexed.
+
+    An index can be written to a file with `dump` and read back with `load`.
+    The postings of each term are stored packed, and are only unpacked when
+    a query first uses the term, so loading costs little more than reading
+    the file.
+
+    Args:
+        datasets (iterable of Dataset): `Dataset`s to index under their
+                                        identifiers
+        k1 (float): The BM25 term frequency saturation
+        b (float): The BM25 document length normalisation
+
+    Raises:
+        ValueError: If one of datasets has no identifier
+    """
+    def __init__(self, datasets: Iterable[Dataset] = (), k1: float = 1.2,
+                 b: float = 0.75):
+        self._k1: float = k1
+        self._b: float = b
+        self._postings: Dict[str, Dict[int, List[int]]] = dict()
+        self._encoded: Dict[str, str] = dict()
+        self._facets: Dict[str, Set[int]] = dict()
+        self._docs: Dict[str, int] = dict()
+        self._keys: Dict[int, str] = dict()
+        self._lengths: Dict[int, int] = dict()
+        self._keywords: Dict[int, Tuple[str, ...]] = dict()
+        self._total_length: int = 0
+        self._next: int = 0
+        self._deleted: int = 0
+        dataset: Dataset
+        for dataset in datasets:
+            self.add(dataset)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._docs
+
+    def add(self, dataset: Dataset, key: Optional[str] = None):
+        """Indexes a `Dataset`, replacing any already indexed under the same
+        key
+
+        Args:
+            dataset (Dataset): The `Dataset` to index
+            key (str): The key to index it under, defaulting to its
+                        identifier
+
+        Raises:
+            TypeError: If dataset is not a `Dataset`
+            ValueError: If the key is empty, as it is for a `Dataset`
+                        without an identifier unless a key is given
+        """
+        if not isinstance(dataset, Dataset):
+            raise TypeError
+        if key is None:
+            key = dataset.identifier
+        if not key:
+            raise ValueError("a Dataset must be indexed under a non-empty "
+                             "key")
+        self.delete(key)
+        doc: int = self._next
+        self._next += 1
+        position: int = 0
+        text: str
+        for text in (dataset.title, dataset.abstract,
+                     dataset.citation_string):
+            term: str
+            for term in tokenize(text):
+                postings: Dict[int, List[int]] = self._lookup(term)
+                if not postings:
+                    self._postings[term] = postings
+                postings.setdefault(doc, list()).append(position)
+                position += 1
+            position += _FIELD_GAP
+        self._docs[key] = doc
+        self._keys[doc] = key
+        self._lengths[doc] = position
+        self._total_length += position
+        self._keywords[doc] = tuple(dataset.keywords)
+        keyword: str
+        for keyword in self._keywords[doc]:
+            self._facets.setdefault(keyword, set()).add(doc)
+
+    def delete(self, key: str) -> bool:
+        """Removes the `Dataset` indexed under a key
+
+        Returns:
+            bool: True if there was one
+        """
+        doc: Optional[int] = self._docs.pop(key, None)
+        if doc is None:
+            return False
+        del self._keys[doc]
+        self._total_length -= self._lengths.pop(doc)
+        keyword: str
+        for keyword in self._keywords.pop(doc):
+            docs: Set[int] = self._facets[keyword]
+            docs.discard(doc)
+            if not docs:
+                del self._facets[keyword]
+        self._deleted += 1
+        if self._deleted > max(_PURGE_MINIMUM, len(self._docs)):
+            self._purge()
+        return True
+
+    def _purge(self):
+        """Drops the postings of deleted `Dataset`s"""
+        term: str
+        for term in list(self._encoded):
+            self._lookup(term)
+        for term in list(self._postings):
+            postings: Dict[int, List[int]] = {
+                doc: positions for doc, positions in
+                self._postings[term].items() if doc in self._keys}
+            if postings:
+                self._postings[term] = postings
+            else:
+                del self._postings[term]
+        self._deleted = 0
+
+    def _lookup(self, term: str) -> Dict[int, List[int]]:
+        """Returns the postings of a term, unpacking them if need be. These
+        may include deleted `Dataset`s."""
+        postings: Optional[Dict[int, List[int]]] = self._postings.get(term)
+        if postings is None:
+            encoded: Optional[str] = self._encoded.pop(term, None)
+            if encoded is None:
+                return dict()
+            postings = self._postings[term] = _decode(encoded)
+        return postings
+
+    def search(self, query: str, operator: str = "and",
+               keywords: Iterable[str] = (), limit: Optional[int] = None) \
+            -> List[Tuple[str, float]]:
+        """Finds the `Dataset`s matching a query, best first
+
+        A query is a list of terms and double quoted phrases, such as
+        'temperature "galway bay"'. Terms are normalised as by `tokenize`.
+
+        Args:
+            query (str): The terms and phrases to search for. An empty query
+                            matches every `Dataset`, with a score of 0
+            operator (str): "and" to match `Dataset`s holding every term and
+                            phrase, or "or" to match those holding any
+            keywords (iterable of str): Keywords which every matching
+                                        `Dataset` must have
+            limit (int): The largest number of results to return
+
+        Returns:
+            list: (key, score) pairs, in descending order of BM25 score and
+                    then by key
+
+        Raises:
+            ValueError: If operator is neither "and" nor "or"
+        """
+        scores: Dict[int, float] = self._score(query, operator, keywords)
+        ranked: List[Tuple[str, float]] = sorted(
+            ((self._keys[doc], score) for doc, score in scores.items()),
+            key=lambda hit: (-hit[1], hit[0]))
+        return ranked if limit is None else ranked[:limit]
+
+    def facet_counts(self, query: str = str(), operator: str = "and",
+                     keywords: Iterable[str] = ()) -> Dict[str, int]:
+        """Counts the keywords of the `Dataset`s matching a query, with the
+        arguments as for `search`
+
+        Returns:
+            dict: The number of matching `Dataset`s having each keyword, for
+                    every keyword which at least one of them has
+        """
+        counts: Dict[str, int] = dict()
+        doc: int
+        for doc in self._score(query, operator, keywords):
+            keyword: str
+            for keyword in self._keywords[doc]:
+                counts[keyword] = counts.get(keyword, 0) + 1
+        return counts
+
+    def _score(self, query: str, operator: str,
+               keywords: Iterable[str]) -> Dict[int, float]:
+        if operator not in ("and", "or"):
+            raise ValueError("operator must be 'and' or 'or'")
+        clauses: List[Tuple[str, ...]] = _parse_query(query)
+        scores: Dict[int, float] = dict()
+        if not clauses:
+            scores = dict.fromkeys(self._keys, 0.0)
+        average: float = self._total_length / max(1, len(self._docs))
+        i: int
+        clause: Tuple[str, ...]
+        for i, clause in enumerate(clauses):
+            frequencies: Dict[int, int] = self._frequencies(clause)
+            idf: float = math.log(1.0 + (
+                len(self._docs) - len(frequencies) + 0.5) /
+                (len(frequencies) + 0.5))
+            clause_scores: Dict[int, float] = {
+                doc: idf * tf * (self._k1 + 1.0) / (
+                    tf + self._k1 * (1.0 - self._b + self._b *
+                                     self._lengths[doc] / average))
+                for doc, tf in frequencies.items()}
+            if operator == "or":
+                doc: int
+                for doc in clause_scores:
+                    scores[doc] = scores.get(doc, 0.0) + clause_scores[doc]
+            elif i == 0:
+                scores = clause_scores
+            else:
+                scores = {doc: scores[doc] + clause_scores[doc]
+                          for doc in scores if doc in clause_scores}
+        keyword: str
+        for keyword in keywords:
+            docs: Set[int] = self._facets.get(keyword, set())
+            scores = {doc: score for doc, score in scores.items()
+                      if doc in docs}
+        return scores
+
+    def _frequencies(self, clause: Tuple[str, ...]) -> Dict[int, int]:
+        """Returns the number of times a term or phrase occurs in each
+        indexed `Dataset` holding it"""
+        lists: List[Dict[int, List[int]]] = [self._lookup(term)
+                                             for term in clause]
+        if len(clause) == 1:
+            return {doc: len(positions)
+                    for doc, positions in lists[0].items()
+                    if doc in self._keys}
+        frequencies: Dict[int, int] = dict()
+        doc: int
+        for doc in min(lists, key=len):
+            if doc not in self._keys or \
+                    not all(doc in postings for postings in lists):
+                continue
+            following: List[Set[int]] = [set(postings[doc])
+                                         for postings in lists[1:]]
+            count: int = sum(1 for p in lists[0][doc]
+                             if all(p + j + 1 in positions
+                                    for j, positions in
+                                    enumerate(following)))
+            if count:
+                frequencies[doc] = count
+        return frequencies
+
+    def dump(self, fp: IO[str]):
+        """Writes the index to a text file object as JSON, leaving out the
+        postings of deleted `Dataset`s"""
+        self._purge()
+        docs: List[int] = sorted(self._keys)
+        number: Dict[int, int] = {doc: i for i, doc in enumerate(docs)}
+        postings: Dict[str, str] = {
+            term: _encode({number[doc]: positions
+                           for doc, positions in term_postings.items()})
+            for term, term_postings in self._postings.items()}
+        fp.write(json.dumps({"version": FORMAT_VERSION,
+                             "k1": self._k1,
+                             "b": self._b,
+                             "keys": [self._keys[doc] for doc in docs],
+                             "lengths": [self._lengths[doc] for doc in docs],
+                             "keywords": [self._keywords[doc]
+                                          for doc in docs],
+                             "postings": postings},
+                            ensure_ascii=False, separators=(",", ":")))
+
+    @classmethod
+    def load(cls, fp: IO[str]) -> "TextIndex":
+        """Reads an index written by `dump` from a text file object
+
+        Raises:
+            ValueError: If the file was written in an unknown layout
+        """
+        document: dict = json.loads(fp.read())
+        if document.get("version") != FORMAT_VERSION:
+            raise ValueError("unsupported text index version %r" %
+                             document.get("version"))
+        index: TextIndex = cls(k1=document["k1"], b=document["b"])
+        keys: List[str] = document["keys"]
+        index._docs = {key: doc for doc, key in enumerate(keys)}
+        index._keys = dict(enumerate(keys))
+        index._lengths = dict(enumerate(document["lengths"]))
+        index._total_length = sum(document["lengths"])
+        index._keywords = {doc: tuple(keywords) for doc, keywords in
+                           enumerate(document["keywords"])}
+        index._next = len(keys)
+        index._encoded = document["postings"]
+        doc: int
+        keywords: Tuple[str, ...]
+        for doc, keywords in index._keywords.items():
+            keyword: str
+            for keyword in keywords:
+                index._facets.setdefault(keyword, set()).add(doc)
+        return index
@@ -0,0 +1,71 @@
+import glob
+import json
+import os
+import threading
+
+import pytest
+import isde_dataset
+from isde_dataset.batch import BatchResult, expand_sources, main, translate_files
+
+
+def _identifier(ds):
+    return ds.identifier
+
+
+def _unpicklable(ds):
+    return threading.Lock()
+
+
+def test_batch_ordered_directory():
+    paths = sorted(glob.glob("./test/resources/*.xml"))
+    results = list(translate_files("./test/resources", workers=2, chunk_size=2))
+    assert [r.path for r in results] == paths
+    assert all(r.ok for r in results)
+    assert isinstance(results[0].result, isde_dataset.Dataset)
+    assert results[0].result.identifier == "IOOS_Water_Temperature"
+
+
+def test_batch_unordered_serialized(tmp_path):
+    broken = tmp_path / "broken.xml"
+    broken.write_text("<gmd:MD_Metadata")
+    sources = ["./test/resources/*.xml", str(broken)]
+    results = list(translate_files(sources, workers=2, chunk_size=1,
+                                   ordered=False, serializer=_identifier))
+    assert len(results) == 7
+    failed = [r for r in results if not r.ok]
+    assert [r.path for r in failed] == [str(broken)]
+    assert failed[0].result is None
+    assert sorted(r.result for r in results if r.ok) == sorted(
+        ["IOOS_Water_Temperature", "IWBNetwork", "d394bf65-a801-4c59-b878-375f631247ed",
+         "eb4307e3-ec47-4f10-905f-d4489f21a54b", "fb1abe50-b172-44e1-9028-f0357917c1f6",
+         "ie.marine.data:dataset.3757"])
+
+
+def test_batch_failed_chunk():
+    paths = sorted(glob.glob("./test/resources/*.xml"))
+    for ordered in (True, False):
+        results = list(translate_files("./test/resources", workers=2, chunk_size=4,
+                                       ordered=ordered, serializer=_unpicklable))
+        assert sorted(r.path for r in results) == paths
+        assert not any(r.ok for r in results)
+        assert all(r.result is None and isinstance(r.error, Exception) for r in results)
+
+
+def test_batch_expand_sources():
+    paths = expand_sources(["./test/resources", "./test/resources/IWB*.xml"])
+    assert len(paths) == 6
+
+
+def test_batch_invocation():
+    with pytest.raises(ValueError):
+        list(translate_files("./test/resources", workers=0))
+    with pytest.raises(ValueError):
+        list(translate_files("./test/resources", chunk_size=0))
+
+
+def test_batch_main(tmp_path, capsys):
+    missing = os.path.join(str(tmp_path), "missing.xml")
+    assert main(["-w", "1", "./test/resources/IWBNetwork_iso19115.xml", missing]) == 1
+    out, err = capsys.readouterr()
+    assert json.loads(out)["identifier"] == "IWBNetwork"
+    assert err.startswith(missing)
@@ -0,0 +1,100 @@
+import asyncio
+import concurrent.futures
+import copy
+import io
+import os
+
+import pytest
+import isde_dataset
+from isde_dataset.stream import iter_iso_datasets
+from isde_dataset.serve import TranslationServer
+from benchmarks import corpus, load, suite
+
+BASELINE = os.path.join(os.path.dirname(suite.__file__), "baselines", "reference.json")
+
+
+def test_corpus_record_fields():
+    ds = isde_dataset.Dataset(corpus.iso_document(7, abstract_words=40, keywords=5, extents=3),
+                              isde_dataset.DatasetSourceType.ISO_XML_BYTES)
+    assert ds.identifier == "synthetic-00000007"
+    assert ds.digital_object_identifier == "10.0000/synthetic.7"
+    assert len(ds.abstract.split()) >= 40
+    assert len(ds.keywords) == 5
+    assert ds.title and ds.citation_string
+    assert ds.bounding_box.north > ds.bounding_box.south
+    assert ds.start_date is not None and ds.end_date > ds.start_date
+
+
+def test_corpus_controls_size():
+    assert corpus.iso_record(1) == corpus.iso_record(1)
+    assert corpus.iso_record(1) != corpus.iso_record(2)
+    small = len(corpus.iso_record(1))
+    assert len(corpus.iso_record(1, abstract_words=1000)) > small
+    assert len(corpus.iso_record(1, extents=10)) > small
+    assert len(corpus.iso_record(1, contacts=10)) > small
+    assert corpus.iso_record(1, extents=4).count(b"<gmd:EX_Extent>") == 4
+
+
+def test_corpus_csw_page(tmp_path):
+    page = corpus.csw_page(11, 5, matched=30)
+    assert b'nextRecord="16"' in page and b'numberOfRecordsMatched="30"' in page
+    assert [ds.identifier for ds in iter_iso_datasets(io.BytesIO(page))] == \
+        ["synthetic-%08d" % i for i in range(11, 16)]
+    assert b'nextRecord="0"' in corpus.csw_page(26, 5, matched=30)
+    paths = corpus.write_corpus(str(tmp_path), 3, keywords=1)
+    assert len(paths) == 3 and all(os.path.exists(p) for p in paths)
+
+
+def test_suite_run_and_compare():
+    results = suite.run(["fixtures.extract.identifier", "synthetic.construct"],
+                        {"records": 4}, min_time=0, min_rounds=2)
+    assert set(results["benchmarks"]) == {"fixtures.extract.identifier", "synthetic.construct"}
+    result = results["benchmarks"]["synthetic.construct"]
+    assert result["items"] == 8
+    assert result["p50_us"] <= result["p90_us"] <= result["p99_us"] <= result["max_us"]
+    assert result["throughput"] > 0 and result["peak_memory"] > 0
+    assert results["parameters"]["records"] == 4
+    assert suite.compare(results, results) == []
+    slower = copy.deepcopy(results)
+    slower["benchmarks"]["synthetic.construct"]["throughput"] /= 2
+    slower["benchmarks"]["synthetic.construct"]["p99_us"] *= 2
+    assert [(n, m) for n, m, _ in suite.compare(slower, results)] == [
+        ("synthetic.construct", "throughput"), ("synthetic.construct", "p99_us")]
+
+
+def test_suite_baseline_covers_every_benchmark(tmp_path):
+    baseline = suite.load(BASELINE)
+    assert set(baseline["benchmarks"]) == set(suite.BENCHMARKS)
+    assert baseline["parameters"] == suite.DEFAULT_PARAMETERS
+    path = str(tmp_path / "baseline.json")
+    suite.save(baseline, path)
+    assert suite.load(path) == baseline
+    baseline["format"] = 0
+    suite.save(baseline, path)
+    with pytest.raises(ValueError):
+        suite.load(path)
+
+
+def test_suite_main(tmp_path, capsys):
+    assert suite.main(["--list", "-k", "^serialize"]) == 0
+    assert capsys.readouterr().out.split() == [
+        "serialize.fields", "serialize.schema_org", "serialize.dcat", "serialize.from_dict"]
+    path = str(tmp_path / "results.json")
+    assert suite.main(["-k", "extract.doi", "--min-time", "0", "--save", path]) == 0
+    assert suite.main(["-k", "extract.doi", "--min-time", "0", "--compare", path,
+                       "--tolerance", "100"]) == 0
+
+
+def test_load_against_server():
+    async def run():
+        with concurrent.futures.ThreadPoolExecutor(1) as executor:
+            async with TranslationServer(workers=1, executor=executor) as server:
+                await server.start(port=0)
+                host, port = server.addresses[0][:2]
+                return await load.load(host, port, list(corpus.iter_records(5)),
+                                       concurrency=3, duration=0.3)
+
+    result = asyncio.run(run())
+    assert set(result["statuses"]) == {200}
+    assert result["throughput"] > 0
+    assert result["p50_ms"] <= result["p99_ms"] <= result["max_ms"]
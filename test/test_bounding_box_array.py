@@ -0,0 +1,94 @@
+import random
+
+import pytest
+from isde_dataset.boundingbox import BoundingBox
+from isde_dataset.boundingboxarray import BoundingBoxArray
+from isde_dataset.spatialindex import _pieces, _pieces_intersect, _pieces_within
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BACKENDS = [False, pytest.param(True, marks=pytest.mark.skipif(numpy is None, reason="NumPy is not installed"))]
+
+
+def _random_box(rng):
+    if rng.random() < 0.1:
+        lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        return BoundingBox(lat, lat, lon, lon)
+    south = rng.uniform(-90, 80)
+    west = rng.uniform(-180, 180)
+    east = west + rng.uniform(0, 40)
+    if east > 180:
+        east -= 360
+    return BoundingBox(min(90.0, south + rng.uniform(0, 10)), south, east, west)
+
+
+def _box(u):
+    return (u.north, u.south, u.east, u.west)
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_bounding_box_array_predicates(use_numpy):
+    rng = random.Random(7)
+    boxes = [_random_box(rng) for _ in range(300)]
+    others = [_random_box(rng) for _ in range(40)]
+    a = BoundingBoxArray(boxes, use_numpy=use_numpy)
+    b = BoundingBoxArray(others, use_numpy=use_numpy)
+    assert len(a) == 300
+    assert _box(a[5]) == _box(boxes[5])
+    for other in others:
+        assert list(a.intersects(other)) == [_pieces_intersect(_pieces(bb), _pieces(other)) for bb in boxes]
+        assert list(a.contains(other)) == [_pieces_within(_pieces(other), _pieces(bb)) for bb in boxes]
+    matrix = a.overlap_matrix(b)
+    assert [list(row) for row in matrix] == [[_pieces_intersect(_pieces(x), _pieces(y)) for y in others] for x in boxes]
+    pairwise = BoundingBoxArray(boxes[:40], use_numpy=use_numpy)
+    assert list(pairwise.intersects(b)) == [_pieces_intersect(_pieces(x), _pieces(y)) for x, y in zip(boxes, others)]
+    with pytest.raises(ValueError):
+        a.intersects(b)
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_bounding_box_array_antimeridian(use_numpy):
+    fiji = BoundingBox(-15.0, -20.0, -178.0, 177.0)
+    a = BoundingBoxArray([fiji, BoundingBox(-15.0, -20.0, -170.0, -175.0)], use_numpy=use_numpy)
+    assert list(a.widths()) == [5.0, 5.0]
+    assert list(a.area()) == [25.0, 25.0]
+    assert list(a.contains((-18.0, 179.5))) == [True, False]
+    assert list(a.contains((-18.0, -177.0))) == [False, False]
+    assert _box(a.union()) == (-15.0, -20.0, -170.0, 177.0)
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_bounding_box_array_union(use_numpy):
+    assert BoundingBoxArray([], use_numpy=use_numpy).union() is None
+    ireland = BoundingBoxArray([BoundingBox(55.37999, 51.44555, -6.01306, -10.47472),
+                                BoundingBox(53.945276, 53.945276, -9.577527, -9.577527),
+                                BoundingBox(57.1, 50.01, -5.01, -17.1)], use_numpy=use_numpy)
+    assert _box(ireland.union()) == (57.1, 50.01, -5.01, -17.1)
+    wrapped = BoundingBoxArray([BoundingBox(1.0, 0.0, -150.0, 170.0),
+                                BoundingBox(1.0, 0.0, -165.0, -170.0),
+                                BoundingBox(1.0, 0.0, 20.0, 10.0)], use_numpy=use_numpy)
+    assert _box(wrapped.union()) == (1.0, 0.0, -150.0, 10.0)
+    world = BoundingBoxArray([BoundingBox(1.0, 0.0, 180.0, -180.0)], use_numpy=use_numpy)
+    assert _box(world.union()) == (1.0, 0.0, 180.0, -180.0)
+    rng = random.Random(3)
+    boxes = BoundingBoxArray([_random_box(rng) for _ in range(200)], use_numpy=use_numpy)
+    union = BoundingBoxArray([boxes.union()], use_numpy=use_numpy)
+    assert all(union.contains(bb)[0] for bb in boxes)
+
+
+@pytest.mark.parametrize("use_numpy", BACKENDS)
+def test_bounding_box_array_spherical_area(use_numpy):
+    a = BoundingBoxArray([BoundingBox(90.0, -90.0, 180.0, -180.0)], use_numpy=use_numpy)
+    assert a.area(spherical=True, radius=1.0)[0] == pytest.approx(4 * 3.141592653589793)
+
+
+def test_bounding_box_array_from_columns():
+    a = BoundingBoxArray.from_columns([1.0, 2.0], [0.0, 1.0], [1.0, 2.0], [0.0, 1.0], use_numpy=False)
+    assert _box(a[1]) == (2.0, 1.0, 2.0, 1.0)
+    with pytest.raises(ValueError):
+        BoundingBoxArray.from_columns([1.0], [], [], [])
+    with pytest.raises(TypeError):
+        BoundingBoxArray(["foo"])
@@ -0,0 +1,91 @@
+import glob
+
+import pytest
+import isde_dataset
+from isde_dataset.collection import DatasetCollection, TOPIC_CATEGORY_CODES
+
+import xml.etree.ElementTree
+
+
+def _datasets():
+    return [isde_dataset.Dataset(xml.etree.ElementTree.parse(path),
+                                 isde_dataset.DatasetSourceType.ISO_XML)
+            for path in sorted(glob.glob("./test/resources/*.xml"))]
+
+
+def test_dataset_collection_views():
+    datasets = _datasets()
+    collection = DatasetCollection(datasets)
+    assert len(collection) == len(datasets)
+    for ds, view in zip(datasets, collection):
+        assert isinstance(view, isde_dataset.Dataset)
+        assert view.to_dict() == ds.to_dict()
+    assert collection[-1].identifier == datasets[-1].identifier
+    with pytest.raises(IndexError):
+        collection[len(datasets)]
+
+
+def test_dataset_collection_view_members():
+    ds = _datasets()[2]
+    view = DatasetCollection([ds])[0]
+    for name in dir(isde_dataset.Dataset):
+        member = getattr(isde_dataset.Dataset, name)
+        if name.startswith("_"):
+            continue
+        elif name == "bounding_box":
+            assert str(view.bounding_box) == str(ds.bounding_box)
+        elif isinstance(member, property):
+            assert getattr(view, name) == getattr(ds, name)
+        elif name == "to_dict":
+            assert view.to_dict() == ds.to_dict()
+        else:
+            getattr(view, name)()
+
+
+def test_dataset_collection_columns():
+    collection = DatasetCollection(_datasets())
+    assert collection.north.typecode == "d"
+    assert list(collection.west) == [ds.bounding_box.west for ds in _datasets()]
+    assert collection.vocabulary == TOPIC_CATEGORY_CODES
+    assert [collection.vocabulary[c] for c in collection.keyword_codes(2)] == \
+        ["oceans", "geoscientificInformation", "environment", "biota"]
+    assert collection.nbytes > 0
+
+
+def test_dataset_collection_unknown_keyword():
+    record = """<gmd:MD_Metadata xmlns:gmd="http://www.isotc211.org/2005/gmd">
+      <gmd:identificationInfo><gmd:MD_DataIdentification>
+        <gmd:topicCategory><gmd:MD_TopicCategoryCode>seabed</gmd:MD_TopicCategoryCode></gmd:topicCategory>
+      </gmd:MD_DataIdentification></gmd:identificationInfo>
+    </gmd:MD_Metadata>"""
+    ds = isde_dataset.Dataset(xml.etree.ElementTree.ElementTree(xml.etree.ElementTree.fromstring(record)),
+                              isde_dataset.DatasetSourceType.ISO_XML)
+    collection = DatasetCollection([ds, ds])
+    assert collection[1].keywords == ["seabed"]
+    assert collection.vocabulary[-1] == "seabed"
+    assert len(collection.vocabulary) == len(TOPIC_CATEGORY_CODES) + 1
+
+
+def test_dataset_collection_invocation():
+    with pytest.raises(TypeError):
+        DatasetCollection(["foo"])
+
+
+def test_slots():
+    ds = _datasets()[0]
+    with pytest.raises(AttributeError):
+        ds.foo = "bar"
+    with pytest.raises(AttributeError):
+        ds.bounding_box.foo = "bar"
+
+
+def test_dataset_collection_large_vocabulary():
+    record = """<gmd:MD_Metadata xmlns:gmd="http://www.isotc211.org/2005/gmd">
+      <gmd:identificationInfo><gmd:MD_DataIdentification>%s</gmd:MD_DataIdentification></gmd:identificationInfo>
+    </gmd:MD_Metadata>""" % "".join(
+        "<gmd:topicCategory><gmd:MD_TopicCategoryCode>keyword-%d</gmd:MD_TopicCategoryCode></gmd:topicCategory>" % i
+        for i in range(70000))
+    collection = DatasetCollection([isde_dataset.Dataset(
+        xml.etree.ElementTree.ElementTree(xml.etree.ElementTree.fromstring(record)),
+        isde_dataset.DatasetSourceType.ISO_XML)])
+    assert collection[0].keywords[-1] == "keyword-69999"
@@ -0,0 +1,61 @@
+import glob
+
+import pytest
+import isde_dataset
+
+import xml.etree.ElementTree
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob("./test/resources/*.xml")))
+def test_dataset_lazy_matches_eager(path):
+    tree = xml.etree.ElementTree.parse(path)
+    eager = isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.ISO_XML)
+    lazy = isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.ISO_XML, lazy=True)
+    assert lazy.to_dict() == eager.to_dict()
+
+
+def test_dataset_lazy_only_extracts_fields_read():
+    tree = xml.etree.ElementTree.parse("./test/resources/ie_marine_data_dataset_3757.xml")
+    ds = isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.ISO_XML, lazy=True)
+    assert ds.identifier == "ie.marine.data:dataset.3757"
+    assert ds.bounding_box.north == 53.945276
+    assert ds._abstract == str()
+    assert ds._citation == str()
+    assert ds._tree is tree
+    assert ds.keywords is ds.keywords
+    ds.materialize()
+    assert ds._tree is None
+    assert ds.digital_object_identifier == "10.20393/edd58462-ae36-44b2-bf36-0ef06c6e8357"
+
+
+def test_dataset_lazy_drops_source_when_all_fields_read():
+    tree = xml.etree.ElementTree.parse("./test/resources/IWBNetwork_iso19115.xml")
+    ds = isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.ISO_XML, lazy=True)
+    ds.to_dict()
+    assert ds._tree is None
+
+
+def test_dataset_lazy_empty_tree():
+    ds = isde_dataset.Dataset(xml.etree.ElementTree.ElementTree(),
+                              isde_dataset.DatasetSourceType.ISO_XML, lazy=True)
+    assert ds.title == str()
+    assert ds.keywords == []
+    assert ds._tree is None
+
+
+def test_dataset_lazy_raises_on_access():
+    record = """<gmd:MD_Metadata xmlns:gmd="http://www.isotc211.org/2005/gmd"
+                                 xmlns:gco="http://www.isotc211.org/2005/gco">
+      <gmd:identificationInfo><gmd:MD_DataIdentification><gmd:extent><gmd:EX_Extent>
+        <gmd:geographicElement><gmd:EX_GeographicBoundingBox>
+          <gmd:northBoundLatitude><gco:Decimal>north</gco:Decimal></gmd:northBoundLatitude>
+        </gmd:EX_GeographicBoundingBox></gmd:geographicElement>
+      </gmd:EX_Extent></gmd:extent></gmd:MD_DataIdentification></gmd:identificationInfo>
+    </gmd:MD_Metadata>"""
+    tree = xml.etree.ElementTree.ElementTree(xml.etree.ElementTree.fromstring(record))
+    with pytest.raises(ValueError):
+        isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.ISO_XML)
+    ds = isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.ISO_XML, lazy=True)
+    assert ds.title == str()
+    with pytest.raises(ValueError):
+        ds.bounding_box
@@ -0,0 +1,69 @@
+import glob
+import io
+import mmap
+import pathlib
+
+import pytest
+import isde_dataset
+import isde_dataset._isoextractor
+
+import xml.etree.ElementTree
+
+PATHS = sorted(glob.glob("./test/resources/*.xml"))
+
+
+def _expected(path):
+    return isde_dataset.Dataset(xml.etree.ElementTree.parse(path),
+                                isde_dataset.DatasetSourceType.ISO_XML).to_dict()
+
+
+def _datasets(path):
+    with open(path, "rb") as f:
+        data = f.read()
+        f.seek(0)
+        yield isde_dataset.Dataset(f, isde_dataset.DatasetSourceType.ISO_XML_FILE)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            yield isde_dataset.Dataset(m, isde_dataset.DatasetSourceType.ISO_XML_BYTES)
+    yield isde_dataset.Dataset(path, isde_dataset.DatasetSourceType.ISO_XML_PATH)
+    yield isde_dataset.Dataset(pathlib.Path(path), isde_dataset.DatasetSourceType.ISO_XML_PATH)
+    yield isde_dataset.Dataset(data, isde_dataset.DatasetSourceType.ISO_XML_BYTES)
+    yield isde_dataset.Dataset(bytearray(data), isde_dataset.DatasetSourceType.ISO_XML_BYTES)
+    yield isde_dataset.Dataset(memoryview(data), isde_dataset.DatasetSourceType.ISO_XML_BYTES)
+    yield isde_dataset.Dataset(io.BytesIO(data), isde_dataset.DatasetSourceType.ISO_XML_FILE)
+    yield isde_dataset.Dataset(data, isde_dataset.DatasetSourceType.ISO_XML_BYTES, lazy=True)
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_dataset_sources_match_element_tree(path):
+    expected = _expected(path)
+    for ds in _datasets(path):
+        assert ds.to_dict() == expected
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_dataset_sources_pruned_match_element_tree(path, monkeypatch):
+    monkeypatch.setattr(isde_dataset._isoextractor, "_PRUNE_THRESHOLD", 0)
+    monkeypatch.setattr(isde_dataset._isoextractor, "_CHUNK_SIZE", 1000)
+    expected = _expected(path)
+    for ds in _datasets(path):
+        assert ds.to_dict() == expected
+
+
+def test_dataset_sources_pruned_tree():
+    with open("./test/resources/ie_marine_data_dataset_3757.xml", "rb") as f:
+        tree = isde_dataset._isoextractor._parse_iso_file(f)
+    assert [e.tag.split("}")[1] for e in tree.getroot()] == \
+        ["fileIdentifier", "dataSetURI", "identificationInfo"]
+
+
+def test_dataset_sources_invalid():
+    with pytest.raises(TypeError):
+        isde_dataset.Dataset(b"<a/>", isde_dataset.DatasetSourceType.ISO_XML_PATH)
+    with pytest.raises(TypeError):
+        isde_dataset.Dataset("<a/>", isde_dataset.DatasetSourceType.ISO_XML_BYTES)
+    with pytest.raises(TypeError):
+        isde_dataset.Dataset(b"<a/>", isde_dataset.DatasetSourceType.ISO_XML_FILE)
+    with pytest.raises(xml.etree.ElementTree.ParseError):
+        isde_dataset.Dataset(b"<a>", isde_dataset.DatasetSourceType.ISO_XML_BYTES)
+    with pytest.raises(xml.etree.ElementTree.ParseError):
+        isde_dataset.Dataset(io.BytesIO(b""), isde_dataset.DatasetSourceType.ISO_XML_FILE)
@@ -0,0 +1,101 @@
+import glob
+import io
+
+import pytest
+import isde_dataset
+from isde_dataset import dcat
+from isde_dataset.batch import main
+
+import xml.etree.ElementTree
+
+
+def _datasets():
+    return [isde_dataset.Dataset(xml.etree.ElementTree.parse(path),
+                                 isde_dataset.DatasetSourceType.ISO_XML)
+            for path in sorted(glob.glob("./test/resources/*.xml"))]
+
+
+def test_dcat_marine_institute_dataset():
+    tree = xml.etree.ElementTree.parse("./test/resources/ie_marine_data_dataset_3757.xml")
+    ds = isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.ISO_XML)
+    fp = io.StringIO()
+    dcat.dump(ds, fp)
+    turtle = fp.getvalue()
+    assert turtle.startswith(dcat.PREFIXES)
+    assert "<urn:isde-dataset:ie.marine.data:dataset.3757> a dcat:Dataset ;\n" in turtle
+    assert '    dcat:keyword "biota", "climatologyMeteorologyAtmosphere", "location", "oceans" ;\n' in turtle
+    assert '\\"metadata.csv\\"' in turtle
+    assert "    dcat:landingPage <https://doi.org/10.20393/edd58462-ae36-44b2-bf36-0ef06c6e8357> ;\n" in turtle
+    assert 'dcat:bbox "POINT(-9.577527 53.945276)"^^geo:wktLiteral' in turtle
+    assert 'locn:geometry "POINT(-9.577527 53.945276)"^^geo:wktLiteral' in turtle
+    assert '    dct:temporal [ a dct:PeriodOfTime ;\n' \
+        '        dcat:startDate "2004-01-01T00:00:00Z"^^xsd:dateTime ;\n' \
+        '        dcat:endDate "2019-12-31T23:59:59Z"^^xsd:dateTime ] ;\n' in turtle
+
+
+def test_dcat_omits_unset_bounding_box():
+    turtle = dcat.dumps(isde_dataset.Dataset({"identifier": "IWBNetwork"},
+                                             isde_dataset.DatasetSourceType.DICT))
+    assert "dct:spatial" not in turtle
+    assert turtle.endswith('    dct:identifier "IWBNetwork" .\n')
+
+
+def test_dcat_literal_escaping():
+    assert dcat._literal('a "quoted"\nline\\\r\tend\x00') == '"a \\"quoted\\"\\nline\\\\\\r\\tend\\u0000"'
+    assert dcat._iri("urn:x:a b<c>") == "<urn:x:a%20b%3Cc%3E>"
+
+
+def test_dcat_antimeridian_geometry():
+    ds = isde_dataset.Dataset({"bounding_box": {"north": -15.0, "south": -20.0, "east": -178.0, "west": 177.0}},
+                              isde_dataset.DatasetSourceType.DICT)
+    turtle = dcat.dumps(ds)
+    assert "_:dataset a dcat:Dataset" in turtle
+    multipolygon = '"MULTIPOLYGON(((177.0 -20.0,180.0 -20.0,180.0 -15.0,177.0 -15.0,177.0 -20.0)),' \
+                   '((-180.0 -20.0,-178.0 -20.0,-178.0 -15.0,-180.0 -15.0,-180.0 -20.0)))"'
+    assert "dcat:bbox " + multipolygon in turtle
+    assert "locn:geometry " + multipolygon in turtle
+    assert "POLYGON((177.0" not in turtle
+
+
+@pytest.mark.parametrize("doi, landing_page", [
+    ("10.1000/182", "<https://doi.org/10.1000/182>"),
+    ("doi:10.1000/182", "<https://doi.org/10.1000/182>"),
+    ("https://doi.org/10.1000/182", "<https://doi.org/10.1000/182>"),
+    ("http://data.example.org/dataset/182", "<http://data.example.org/dataset/182>")])
+def test_dcat_landing_page(doi, landing_page):
+    turtle = dcat.dumps(isde_dataset.Dataset({"digital_object_identifier": doi},
+                                             isde_dataset.DatasetSourceType.DICT))
+    assert "    dcat:landingPage " + landing_page + " .\n" in turtle
+
+
+def test_dcat_no_landing_page_for_other_identifiers():
+    turtle = dcat.dumps(isde_dataset.Dataset({"digital_object_identifier": "local-182"},
+                                             isde_dataset.DatasetSourceType.DICT))
+    assert "dcat:landingPage" not in turtle
+
+
+def test_dcat_dump_all():
+    fp = io.StringIO()
+    datasets = _datasets() + [isde_dataset.Dataset({"title": "x"}, isde_dataset.DatasetSourceType.DICT)]
+    assert dcat.dump_all(iter(datasets), fp, catalogue_iri="https://example.org/catalogue") == 7
+    turtle = fp.getvalue()
+    assert turtle.count("@prefix dcat:") == 1
+    assert turtle.count("<https://example.org/catalogue> dcat:dataset ") == 7
+    assert "<https://example.org/catalogue> dcat:dataset _:dataset6 .\n" in turtle
+
+
+def test_dcat_parses_as_turtle():
+    rdflib = pytest.importorskip("rdflib")
+    fp = io.StringIO()
+    dcat.dump_all(_datasets(), fp, catalogue_iri="https://example.org/catalogue")
+    graph = rdflib.Graph().parse(data=fp.getvalue(), format="turtle")
+    DCT = rdflib.Namespace("http://purl.org/dc/terms/")
+    descriptions = {str(o) for o in graph.objects(None, DCT.description)}
+    assert {ds.abstract for ds in _datasets()} == descriptions
+    citations = {str(o) for o in graph.objects(None, DCT.bibliographicCitation)}
+    assert citations == {ds.citation_string for ds in _datasets() if ds.citation_string}
+
+
+def test_dcat_batch_format(capsys):
+    assert main(["-w", "1", "-f", "dcat", "./test/resources/IWBNetwork_iso19115.xml"]) == 0
+    assert "<urn:isde-dataset:IWBNetwork> a dcat:Dataset" in capsys.readouterr()[0]
@@ -0,0 +1,137 @@
+import functools
+
+import pytest
+import isde_dataset
+from isde_dataset.dedup import Deduplicator, deduplicate, merge_datasets, \
+    minhash, normalize_doi, similarity, _shingles
+from benchmarks import corpus
+
+
+def _dataset(**fields):
+    base = {"identifier": "", "title": "", "abstract": "", "citation_string": "",
+            "digital_object_identifier": "", "keywords": [],
+            "bounding_box": {"north": 0.0, "south": 0.0, "east": 0.0, "west": 0.0},
+            "start_date": None, "end_date": None}
+    base.update(fields)
+    return isde_dataset.Dataset(base, isde_dataset.DatasetSourceType.DICT)
+
+
+def _synthetic(i):
+    return isde_dataset.Dataset(corpus.iso_document(i, abstract_words=60),
+                                isde_dataset.DatasetSourceType.ISO_XML_BYTES)
+
+
+def _variant(ds, **fields):
+    d = ds.to_dict()
+    d.update(fields)
+    return isde_dataset.Dataset(d, isde_dataset.DatasetSourceType.DICT)
+
+
+def test_normalize_doi():
+    assert normalize_doi(" https://doi.org/10.1000/ABC ") == "10.1000/abc"
+    assert normalize_doi("http://dx.doi.org/10.1000/abc") == "10.1000/abc"
+    assert normalize_doi("doi: 10.1000/abc") == "10.1000/abc"
+    assert normalize_doi("") == ""
+
+
+def test_minhash_estimates_jaccard():
+    a = {b"%d" % i for i in range(400)}
+    b = {b"%d" % i for i in range(100, 500)}
+    assert minhash(a) == minhash(set(a))
+    assert similarity(minhash(a), minhash(a)) == 1.0
+    assert abs(similarity(minhash(a, 256), minhash(b, 256)) - 0.6) < 0.12
+    assert similarity(minhash(a), minhash({b"x", b"y"})) < 0.1
+    assert minhash(set()) is None
+    assert len(minhash({b"only"}, 64)) == 64
+    assert _shingles("One two", 3) == {b"one two"}
+    assert len(_shingles("one two three four", 3)) == 2
+
+
+def test_exact_and_near_duplicates():
+    originals = [_synthetic(i) for i in range(40)]
+    dedup = Deduplicator()
+    dedup.extend(originals)
+    # the same DOI written differently, with a new identifier and text
+    dedup.add(_variant(originals[3], identifier="mirror-3", title="Other", abstract="Other",
+                       digital_object_identifier="https://doi.org/" +
+                       originals[3].digital_object_identifier.upper()))
+    # the same identifier, differently cased
+    dedup.add(_variant(originals[5], identifier=originals[5].identifier.upper(),
+                       digital_object_identifier="", title="x", abstract="y"))
+    # a lightly edited copy with no identifiers
+    words = originals[7].abstract.split()
+    words[10] = "edited"
+    dedup.add(_variant(originals[7], identifier="", digital_object_identifier="",
+                       abstract=" ".join(words)))
+    # the same text under a different DOI, as for another part of a series
+    dedup.add(_variant(originals[9], identifier="part-2",
+                       digital_object_identifier="10.0000/other"))
+    assert len(dedup) == 44
+    clusters = dedup.clusters()
+    assert len(clusters) == 41
+    assert [c.indices for c in clusters if len(c) > 1] == [[3, 40], [5, 41], [7, 42]]
+    assert clusters[0].merged is originals[0]
+    assert len(list(dedup.datasets())) == 41
+
+
+def test_transitive_clusters():
+    dedup = Deduplicator()
+    dedup.add(_dataset(identifier="a", digital_object_identifier="10.1/x"))
+    dedup.add(_dataset(identifier="b"))
+    dedup.add(_dataset(identifier="B", digital_object_identifier="doi:10.1/X"))
+    assert [c.indices for c in dedup.clusters()] == [[0, 1, 2]]
+
+
+def test_conflicting_dois_are_not_joined():
+    dedup = Deduplicator()
+    dedup.add(_dataset(identifier="a", digital_object_identifier="10.1/x"))
+    dedup.add(_dataset(identifier="A", digital_object_identifier="10.1/y"))
+    assert [c.indices for c in dedup.clusters()] == [[0], [1]]
+
+    original = _synthetic(0)
+    for dois in (["10.1/a", "", "10.1/b"], ["", "10.1/a", "10.1/b"]):
+        dedup = Deduplicator()
+        for i, doi in enumerate(dois):
+            dedup.add(_variant(original, identifier="part-%d" % i,
+                               digital_object_identifier=doi))
+        assert [c.indices for c in dedup.clusters()] == [[0, 1], [2]]
+
+
+def test_merge_datasets():
+    first = _dataset(identifier="a", title="Sea temperature", abstract="Short",
+                     keywords=["ocean", "temperature"],
+                     start_date="2001-01-01T00:00:00", end_date="2005-01-01T00:00:00")
+    second = _dataset(identifier="b", title="Sea temperature", abstract="A longer abstract",
+                      digital_object_identifier="10.1/x", keywords=["temperature", "sst"],
+                      bounding_box={"north": 55.0, "south": 51.0, "east": -5.0, "west": -11.0},
+                      start_date="1999-06-01T00:00:00", end_date=None)
+    merged = merge_datasets([first, second])
+    assert merged.identifier == "a" and merged.abstract == "Short"
+    assert merged.digital_object_identifier == "10.1/x"
+    assert merged.keywords == ["ocean", "temperature", "sst"]
+    assert merged.bounding_box.north == 55.0
+    assert merged.start_date.year == 1999 and merged.end_date.year == 2005
+    assert merge_datasets([first, second], prefer="longest").abstract == "A longer abstract"
+    with pytest.raises(ValueError):
+        merge_datasets([])
+    with pytest.raises(ValueError):
+        merge_datasets([first], prefer="last")
+
+
+def test_deduplicate_with_custom_merge():
+    a = _dataset(identifier="a", abstract="Short")
+    b = _dataset(identifier="A", abstract="Much longer abstract")
+    c = _dataset(identifier="c", title="Unrelated")
+    merged = list(deduplicate([a, b, c], merge=functools.partial(merge_datasets,
+                                                                 prefer="longest")))
+    assert [ds.abstract for ds in merged] == ["Much longer abstract", ""]
+    assert merged[1] is c
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        Deduplicator(bands=3)
+    with pytest.raises(ValueError):
+        Deduplicator(threshold=0)
+    with pytest.raises(TypeError):
+        Deduplicator().add({"identifier": "a"})
@@ -0,0 +1,116 @@
+import glob
+import xml.etree.ElementTree as ET
+
+import isde_dataset
+from isde_dataset import dcat, instrumentation, schemaorg
+
+PATHS = sorted(glob.glob("./test/resources/*.xml"))
+FIELDS = ["title", "abstract", "identifier", "bounding_box", "keywords", "doi", "citation",
+          "start_date", "end_date"]
+
+
+class _Recorder(instrumentation.Observer):
+    def __init__(self):
+        self.events = []
+
+    def parsed(self, source_type, seconds):
+        self.events.append(("parsed", source_type))
+
+    def extracted(self, field, seconds, matches):
+        self.events.append(("extracted", field, matches))
+
+    def swallowed(self, field, error):
+        self.events.append(("swallowed", field, type(error)))
+
+
+def test_instrumentation_disabled_by_default():
+    assert instrumentation.active() is None
+    recorder = _Recorder()
+    with instrumentation.instrumented(recorder) as observer:
+        assert observer is recorder and instrumentation.active() is recorder
+    assert instrumentation.active() is None
+    isde_dataset.Dataset(PATHS[0], isde_dataset.DatasetSourceType.ISO_XML_PATH)
+    assert recorder.events == []
+
+
+def test_instrumentation_metrics_snapshot():
+    with instrumentation.instrumented() as metrics:
+        datasets = [isde_dataset.Dataset(p, isde_dataset.DatasetSourceType.ISO_XML_PATH)
+                    for p in PATHS]
+        with open(PATHS[0], "rb") as f:
+            datasets.append(isde_dataset.Dataset(f.read(), isde_dataset.DatasetSourceType.ISO_XML_BYTES))
+        for ds in datasets:
+            ds.to_dict()
+            schemaorg.dumps(ds)
+            dcat.dumps(ds)
+    snapshot = metrics.snapshot()
+    assert snapshot["parse"]["ISO_XML_PATH"]["count"] == len(PATHS)
+    assert snapshot["parse"]["ISO_XML_BYTES"]["count"] == 1
+    assert list(snapshot["extract"]) == FIELDS
+    for field in FIELDS:
+        assert snapshot["extract"][field]["count"] == len(PATHS) + 1
+        assert snapshot["extract"][field]["seconds"] > 0
+    assert snapshot["extract"]["identifier"]["found"] == len(PATHS) + 1
+    assert snapshot["extract"]["keywords"]["matches"] == sum(len(ds.keywords) for ds in datasets)
+    assert snapshot["extract"]["doi"]["found"] == sum(1 for ds in datasets if ds.digital_object_identifier)
+    assert snapshot["swallowed"] == {}
+    assert {k: v["count"] for k, v in snapshot["serialize"].items()} == {
+        "fields": len(datasets), "schema.org": len(datasets), "dcat": len(datasets)}
+    metrics.reset()
+    assert metrics.snapshot() == {"parse": {}, "extract": {}, "swallowed": {}, "serialize": {}}
+
+
+def test_instrumentation_matches_uninstrumented_values():
+    plain = [isde_dataset.Dataset(p, isde_dataset.DatasetSourceType.ISO_XML_PATH).to_dict()
+             for p in PATHS]
+    with instrumentation.instrumented():
+        observed = [isde_dataset.Dataset(p, isde_dataset.DatasetSourceType.ISO_XML_PATH).to_dict()
+                    for p in PATHS]
+    assert observed == plain
+
+
+def test_instrumentation_swallowed_and_lazy():
+    recorder = _Recorder()
+    with instrumentation.instrumented(recorder):
+        ds = isde_dataset.Dataset(ET.ElementTree(), isde_dataset.DatasetSourceType.ISO_XML)
+        lazy = isde_dataset.Dataset(ET.parse(PATHS[0]), isde_dataset.DatasetSourceType.ISO_XML, lazy=True)
+        lazy.identifier
+        broken = isde_dataset.Dataset(ET.ElementTree(), isde_dataset.DatasetSourceType.ISO_XML, lazy=True)
+        broken.title
+    assert ds.title == ""
+    assert recorder.events == [("swallowed", "record", AttributeError),
+                               ("extracted", "identifier", 1),
+                               ("swallowed", "title", AttributeError)]
+
+
+def test_instrumentation_reports_elements_matched():
+    gmd, gco = "{http://www.isotc211.org/2005/gmd}", "{http://www.isotc211.org/2005/gco}"
+    root = ET.Element(gmd + "MD_Metadata")
+    citation = ET.SubElement(ET.SubElement(ET.SubElement(ET.SubElement(
+        root, gmd + "identificationInfo"), gmd + "MD_DataIdentification"),
+        gmd + "citation"), gmd + "CI_Citation")
+    for title in ("First", "Second"):
+        ET.SubElement(ET.SubElement(citation, gmd + "title"), gco + "CharacterString").text = title
+    recorder = _Recorder()
+    with instrumentation.instrumented(recorder):
+        ds = isde_dataset.Dataset(ET.ElementTree(root), isde_dataset.DatasetSourceType.ISO_XML)
+    matches = {e[1]: e[2] for e in recorder.events if e[0] == "extracted"}
+    assert ds.title == "Second"
+    assert matches["title"] == 2
+    assert matches["abstract"] == 0 and matches["bounding_box"] == 0
+
+
+def test_instrumentation_enable_disable_prometheus():
+    metrics = instrumentation.enable(instrumentation.Metrics(prefix="test"))
+    try:
+        isde_dataset.Dataset(ET.ElementTree(), isde_dataset.DatasetSourceType.ISO_XML)
+        isde_dataset.Dataset(PATHS[0], isde_dataset.DatasetSourceType.ISO_XML_PATH)
+    finally:
+        assert instrumentation.disable() is metrics
+    assert instrumentation.active() is None
+    text = metrics.prometheus()
+    assert "# TYPE test_extract_seconds_total counter" in text
+    assert 'test_parse_total{source_type="ISO_XML_PATH"} 1' in text
+    assert 'test_extract_total{field="title"} 1' in text
+    assert 'test_extract_swallowed_total{field="record"} 1' in text
+    assert text.endswith("\n")
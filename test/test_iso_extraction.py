@@ -0,0 +1,73 @@
+import glob
+
+import pytest
+import isde_dataset
+
+import xml.etree.ElementTree
+
+GMD = "{http://www.isotc211.org/2005/gmd}"
+GCO = "{http://www.isotc211.org/2005/gco}"
+DATA_IDENTIFICATION = ".//" + GMD + "identificationInfo/" + GMD + "MD_DataIdentification/"
+CITATION = DATA_IDENTIFICATION + GMD + "citation/" + GMD + "CI_Citation/"
+BOX = (DATA_IDENTIFICATION + GMD + "extent/" + GMD + "EX_Extent/" + GMD + "geographicElement/" +
+       GMD + "EX_GeographicBoundingBox/")
+TITLE = CITATION + GMD + "title/" + GCO + "CharacterString"
+
+
+def _last(tree, xpath):
+    s = str()
+    for i in tree.findall(xpath):
+        s = str(i.text)
+    return s
+
+
+def _last_float(tree, xpath):
+    f = float()
+    for i in tree.findall(xpath):
+        f = float(str(i.text))
+    return f
+
+
+@pytest.mark.parametrize("path", sorted(glob.glob("./test/resources/*.xml")))
+def test_iso_extraction_matches_xpath_queries(path):
+    tree = xml.etree.ElementTree.parse(path)
+    ds = isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.ISO_XML)
+    assert ds.title == _last(tree, TITLE)
+    assert ds.abstract == _last(tree, DATA_IDENTIFICATION + GMD + "abstract/" + GCO + "CharacterString").strip().replace("\n", " ")
+    assert ds.identifier == _last(tree, ".//" + GMD + "fileIdentifier/" + GCO + "CharacterString")
+    assert ds.bounding_box.north == _last_float(tree, BOX + GMD + "northBoundLatitude/" + GCO + "Decimal")
+    assert ds.bounding_box.south == _last_float(tree, BOX + GMD + "southBoundLatitude/" + GCO + "Decimal")
+    assert ds.bounding_box.east == _last_float(tree, BOX + GMD + "eastBoundLongitude/" + GCO + "Decimal")
+    assert ds.bounding_box.west == _last_float(tree, BOX + GMD + "westBoundLongitude/" + GCO + "Decimal")
+    assert ds.keywords == [str(i.text) for i in tree.findall(DATA_IDENTIFICATION + GMD + "topicCategory/" + GMD + "MD_TopicCategoryCode")]
+    assert ds.digital_object_identifier == _last(tree, ".//" + GMD + "dataSetURI/" + GCO + "CharacterString")
+    assert ds.citation_string == _last(tree, CITATION + GMD + "otherCitationDetails/" + GCO + "CharacterString")
+
+
+def test_iso_extraction_document_order():
+    record = """<gmd:MD_Metadata xmlns:gmd="http://www.isotc211.org/2005/gmd"
+                                 xmlns:gco="http://www.isotc211.org/2005/gco">
+      <gmd:identificationInfo>
+        <gmd:MD_DataIdentification>
+          <gmd:citation><gmd:CI_Citation>
+            <gmd:title><gco:CharacterString>First</gco:CharacterString></gmd:title>
+          </gmd:CI_Citation></gmd:citation>
+          <gmd:topicCategory><gmd:MD_TopicCategoryCode>oceans</gmd:MD_TopicCategoryCode></gmd:topicCategory>
+        </gmd:MD_DataIdentification>
+      </gmd:identificationInfo>
+      <gmd:fileIdentifier><gco:CharacterString>one</gco:CharacterString></gmd:fileIdentifier>
+      <gmd:identificationInfo>
+        <gmd:MD_DataIdentification>
+          <gmd:citation><gmd:CI_Citation>
+            <gmd:title><gco:CharacterString/></gmd:title>
+          </gmd:CI_Citation></gmd:citation>
+          <gmd:topicCategory><gmd:MD_TopicCategoryCode>biota</gmd:MD_TopicCategoryCode></gmd:topicCategory>
+        </gmd:MD_DataIdentification>
+      </gmd:identificationInfo>
+      <gmd:fileIdentifier><gco:CharacterString>two</gco:CharacterString></gmd:fileIdentifier>
+    </gmd:MD_Metadata>"""
+    tree = xml.etree.ElementTree.ElementTree(xml.etree.ElementTree.fromstring(record))
+    ds = isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.ISO_XML)
+    assert ds.title == _last(tree, TITLE) == "None"
+    assert ds.identifier == "two"
+    assert ds.keywords == ["oceans", "biota"]
@@ -0,0 +1,95 @@
+import glob
+import io
+import json
+
+import pytest
+import isde_dataset
+from isde_dataset import schemaorg
+from isde_dataset.batch import main
+
+import xml.etree.ElementTree
+
+
+def _datasets():
+    return [isde_dataset.Dataset(xml.etree.ElementTree.parse(path),
+                                 isde_dataset.DatasetSourceType.ISO_XML)
+            for path in sorted(glob.glob("./test/resources/*.xml"))]
+
+
+def test_schema_org_marine_institute_dataset():
+    tree = xml.etree.ElementTree.parse("./test/resources/ie_marine_data_dataset_3757.xml")
+    ds = isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.ISO_XML)
+    fp = io.StringIO()
+    schemaorg.dump(ds, fp)
+    document = json.loads(fp.getvalue())
+    assert document["@context"] == "https://schema.org/"
+    assert document["@type"] == "Dataset"
+    assert document["name"] == ds.title
+    assert document["description"] == ds.abstract
+    assert document["identifier"] == ["ie.marine.data:dataset.3757",
+                                      "https://doi.org/10.20393/edd58462-ae36-44b2-bf36-0ef06c6e8357"]
+    assert document["sameAs"] == "https://doi.org/10.20393/edd58462-ae36-44b2-bf36-0ef06c6e8357"
+    assert document["keywords"] == ["biota", "climatologyMeteorologyAtmosphere", "location", "oceans"]
+    assert document["citation"] == ds.citation_string
+    assert document["spatialCoverage"]["geo"] == {"@type": "GeoShape",
+                                                  "box": "53.945276 -9.577527 53.945276 -9.577527"}
+    assert document["temporalCoverage"] == "2004-01-01T00:00:00Z/2019-12-31T23:59:59Z"
+
+
+def test_schema_org_omits_empty_fields():
+    document = schemaorg.to_schema_org(isde_dataset.Dataset(
+        {"identifier": "IWBNetwork"}, isde_dataset.DatasetSourceType.DICT))
+    assert document["identifier"] == "IWBNetwork"
+    assert "citation" not in document
+    assert "sameAs" not in document
+    assert "keywords" not in document
+    assert "spatialCoverage" not in document
+    assert "temporalCoverage" not in document
+
+
+@pytest.mark.parametrize("doi, url", [
+    ("10.1000/182", "https://doi.org/10.1000/182"),
+    ("doi:10.1000/182", "https://doi.org/10.1000/182"),
+    ("https://doi.org/10.1000/182", "https://doi.org/10.1000/182"),
+    ("http://data.example.org/dataset/182", "http://data.example.org/dataset/182")])
+def test_schema_org_same_as_url(doi, url):
+    document = schemaorg.to_schema_org(isde_dataset.Dataset(
+        {"digital_object_identifier": doi}, isde_dataset.DatasetSourceType.DICT))
+    assert document["sameAs"] == document["identifier"] == url
+
+
+def test_schema_org_identifier_which_is_not_a_doi():
+    document = schemaorg.to_schema_org(isde_dataset.Dataset(
+        {"identifier": "a", "digital_object_identifier": "local-182"},
+        isde_dataset.DatasetSourceType.DICT))
+    assert document["identifier"] == ["a", "local-182"]
+    assert "sameAs" not in document
+
+
+def test_schema_org_open_ended_temporal_coverage():
+    document = schemaorg.to_schema_org(isde_dataset.Dataset(
+        {"start_date": "2016-03-01T00:00:00"}, isde_dataset.DatasetSourceType.DICT))
+    assert document["temporalCoverage"] == "2016-03-01T00:00:00Z/.."
+
+
+def test_schema_org_ndjson():
+    fp = io.StringIO()
+    assert schemaorg.dump_ndjson(iter(_datasets()), fp) == 6
+    lines = fp.getvalue().splitlines()
+    assert [json.loads(line) for line in lines] == [schemaorg.to_schema_org(ds) for ds in _datasets()]
+
+
+def test_schema_org_graph():
+    fp = io.StringIO()
+    assert schemaorg.dump_graph(iter(_datasets()), fp) == 6
+    document = json.loads(fp.getvalue())
+    assert document["@context"] == "https://schema.org/"
+    assert document["@graph"] == [schemaorg.to_schema_org(ds, context=False) for ds in _datasets()]
+    fp = io.StringIO()
+    assert schemaorg.dump_graph([], fp) == 0
+    assert json.loads(fp.getvalue())["@graph"] == []
+
+
+def test_schema_org_batch_format(capsys):
+    assert main(["-w", "1", "-f", "schema.org", "./test/resources/IWBNetwork_iso19115.xml"]) == 0
+    assert json.loads(capsys.readouterr()[0])["identifier"] == "IWBNetwork"
@@ -0,0 +1,184 @@
+import asyncio
+import concurrent.futures
+import glob
+import json
+import os
+import signal
+import threading
+
+import pytest
+import isde_dataset
+from isde_dataset import dcat, schemaorg
+from isde_dataset.serve import TranslationServer, _translate_batch
+
+PATHS = sorted(glob.glob("./test/resources/*.xml"))
+RECORDS = [open(p, "rb").read() for p in PATHS]
+
+
+async def _request(reader, writer, method, target, body=b"", headers=()):
+    head = "%s %s HTTP/1.1\r\nHost: test\r\nContent-Length: %d\r\n" % (method, target, len(body))
+    head += "".join("%s: %s\r\n" % h for h in headers)
+    writer.write(head.encode() + b"\r\n" + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    response_headers = {}
+    while True:
+        line = (await reader.readline()).decode()
+        if line == "\r\n":
+            break
+        name, _, value = line.partition(":")
+        response_headers[name.lower()] = value.strip()
+    payload = await reader.readexactly(int(response_headers["content-length"]))
+    return status, response_headers, payload
+
+
+def _serve(test, **kwargs):
+    async def run():
+        with concurrent.futures.ThreadPoolExecutor(2) as executor:
+            async with TranslationServer(workers=2, executor=executor, **kwargs) as server:
+                await server.start(port=0)
+                host, port = server.addresses[0][:2]
+                reader, writer = await asyncio.open_connection(host, port)
+                try:
+                    return await test(server, reader, writer, host, port)
+                finally:
+                    writer.close()
+    return asyncio.run(run())
+
+
+def test_serve_translates_formats():
+    async def test(server, reader, writer, host, port):
+        results = []
+        for body in RECORDS:
+            for format in ("fields", "schema.org", "dcat"):
+                results.append(await _request(reader, writer, "POST", "/translate?format=" + format, body))
+        return results
+
+    results = _serve(test)
+    i = 0
+    for body in RECORDS:
+        ds = isde_dataset.Dataset(body, isde_dataset.DatasetSourceType.ISO_XML_BYTES)
+        for expected, content_type in ((ds.to_dict(), "application/json"),
+                                       (schemaorg.to_schema_org(ds), "application/ld+json")):
+            status, headers, payload = results[i]
+            assert status == 200 and headers["content-type"] == content_type
+            assert json.loads(payload) == expected
+            i += 1
+        status, headers, payload = results[i]
+        assert status == 200 and headers["content-type"].startswith("text/turtle")
+        assert payload.decode() == dcat.dumps(ds)
+        i += 1
+
+
+def test_serve_errors_health_and_metrics():
+    async def test(server, reader, writer, host, port):
+        results = [await _request(reader, writer, "POST", "/translate", b"<broken"),
+                   await _request(reader, writer, "POST", "/translate?format=rdfxml", RECORDS[0]),
+                   await _request(reader, writer, "GET", "/translate"),
+                   await _request(reader, writer, "GET", "/nowhere"),
+                   await _request(reader, writer, "GET", "/health"),
+                   await _request(reader, writer, "POST", "/translate", RECORDS[0]),
+                   await _request(reader, writer, "GET", "/metrics")]
+        reader2, writer2 = await asyncio.open_connection(host, port)
+        writer2.write(b"POST /translate HTTP/1.1\r\nContent-Length: 300000\r\n\r\n")
+        response = await reader2.read()
+        head, _, payload = response.partition(b"\r\n\r\n")
+        results.append((int(head.split()[1]), dict(line.lower().split(": ", 1) for line in
+                                                    head.decode().split("\r\n")[1:]), payload))
+        writer2.close()
+        return results
+
+    results = _serve(test, max_body=200000)
+    assert [r[0] for r in results] == [400, 400, 405, 404, 200, 200, 200, 413]
+    assert "ParseError" in json.loads(results[0][2])["error"]
+    health = json.loads(results[4][2])
+    assert health["status"] == "ok" and health["workers"] == 2 and health["queued"] == 0
+    metrics = results[6][2].decode()
+    assert 'isde_serve_requests_total{status="400"} 2' in metrics
+    assert 'isde_serve_requests_total{status="200"} 2' in metrics
+    assert "isde_serve_batched_records_total 2" in metrics
+    assert 'isde_serve_request_duration_seconds_bucket{le="+Inf"} 6' in metrics
+    assert results[7][1]["connection"] == "close"
+
+
+def test_serve_batches_and_backpressure():
+    release = threading.Event()
+    calls = []
+
+    def blocking(items):
+        calls.append(len(items))
+        release.wait(10)
+        return _translate_batch(items)
+
+    async def test(server, reader, writer, host, port):
+        import isde_dataset.serve as serve
+        original = serve._translate_batch
+        serve._translate_batch = blocking
+        try:
+            pending = []
+            for i in range(8):
+                pending.append(asyncio.ensure_future(server.translate(RECORDS[i % len(RECORDS)])))
+                await asyncio.sleep(0.01)
+            status, headers, payload = await _request(reader, writer, "POST", "/translate", RECORDS[0])
+            health = server.health()
+            release.set()
+            results = await asyncio.gather(*pending)
+        finally:
+            serve._translate_batch = original
+        return status, headers, health, results
+
+    status, headers, health, results = _serve(test, batch_size=3, queue_size=4)
+    assert status == 503 and headers["retry-after"] == "1"
+    assert health["status"] == "busy" and health["queued"] == 4 and health["in_flight"] == 4
+    assert len(results) == 8
+    assert sum(calls) == 8 and max(calls) == 3
+    assert json.loads(results[0])["identifier"] == "IOOS_Water_Temperature"
+
+
+def test_serve_process_pool_over_unix_socket(tmp_path):
+    if not hasattr(asyncio, "start_unix_server"):
+        pytest.skip("no Unix sockets")
+    path = str(tmp_path / "serve.sock")
+
+    async def run():
+        async with TranslationServer(workers=1) as server:
+            await server.start(path=path)
+            assert server.addresses == [path]
+            reader, writer = await asyncio.open_unix_connection(path)
+            try:
+                return await _request(reader, writer, "POST", "/translate?format=fields", RECORDS[1])
+            finally:
+                writer.close()
+
+    status, headers, payload = asyncio.run(run())
+    assert status == 200
+    assert json.loads(payload)["identifier"] == "IWBNetwork"
+
+
+def test_serve_replaces_broken_pool():
+    async def run():
+        async with TranslationServer(workers=1) as server:
+            with pytest.raises(RuntimeError):
+                await server.translate(RECORDS[0])
+            await server.start(port=0)
+            broken = server._executor
+            for process in list(broken._processes.values()):
+                os.kill(process.pid, signal.SIGKILL)
+                process.join()
+            with pytest.raises(ValueError):
+                await server.translate(RECORDS[0])
+            assert server._executor is not broken
+            assert broken._shutdown_thread
+            assert len(server._executor._processes) == 1
+            return await server.translate(RECORDS[1])
+
+    assert json.loads(asyncio.run(run()))["identifier"] == "IWBNetwork"
+
+
+def test_serve_invalid_arguments():
+    with pytest.raises(ValueError):
+        TranslationServer(workers=0)
+    with pytest.raises(ValueError):
+        TranslationServer(batch_size=0)
+    with pytest.raises(ValueError):
+        TranslationServer(queue_size=0)
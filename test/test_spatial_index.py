@@ -0,0 +1,102 @@
+import glob
+import random
+
+import pytest
+import isde_dataset
+from isde_dataset.boundingbox import BoundingBox
+from isde_dataset.spatialindex import SpatialIndex, _pieces, _pieces_intersect, \
+    _pieces_within, _point_distance
+
+import xml.etree.ElementTree
+
+
+class _Item(object):
+    def __init__(self, bounding_box):
+        self.bounding_box = bounding_box
+
+
+def _random_box(rng):
+    if rng.random() < 0.1:
+        lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        return BoundingBox(lat, lat, lon, lon)
+    south = rng.uniform(-90, 80)
+    north = min(90.0, south + rng.uniform(0, 10))
+    west = rng.uniform(-180, 180)
+    east = west + rng.uniform(0, 20)
+    if east > 180:
+        east -= 360
+    return BoundingBox(north, south, east, west)
+
+
+def _brute(items, query, predicate):
+    q = _pieces(query)
+    return {i for i in items if predicate(_pieces(i.bounding_box), q)}
+
+
+def test_spatial_index_fixtures():
+    datasets = [isde_dataset.Dataset(xml.etree.ElementTree.parse(path),
+                                     isde_dataset.DatasetSourceType.ISO_XML)
+                for path in sorted(glob.glob("./test/resources/*.xml"))]
+    index = SpatialIndex(datasets)
+    assert len(index) == 6
+    feeagh = BoundingBox(53.945276, 53.945276, -9.577527, -9.577527)
+    assert {ds.identifier for ds in index.contains(feeagh)} == {
+        "ie.marine.data:dataset.3757", "IWBNetwork",
+        "d394bf65-a801-4c59-b878-375f631247ed", "eb4307e3-ec47-4f10-905f-d4489f21a54b",
+        "fb1abe50-b172-44e1-9028-f0357917c1f6"}
+    ireland = BoundingBox(56.0, 51.0, -5.0, -11.0)
+    assert {ds.identifier for ds in index.within(ireland)} == {
+        "ie.marine.data:dataset.3757", "fb1abe50-b172-44e1-9028-f0357917c1f6"}
+    assert index.nearest(0.5, 0.5)[0].identifier == "IOOS_Water_Temperature"
+    assert len(index.nearest(53.9, -9.6, 10)) == 6
+
+
+def test_spatial_index_antimeridian():
+    fiji = _Item(BoundingBox(-15.0, -20.0, -178.0, 177.0))
+    east = _Item(BoundingBox(-15.0, -20.0, -170.0, -175.0))
+    west = _Item(BoundingBox(-15.0, -20.0, 170.0, 165.0))
+    index = SpatialIndex([fiji, east, west])
+    assert set(index.intersects(BoundingBox(-16.0, -17.0, -179.0, -179.5))) == {fiji}
+    assert set(index.intersects(BoundingBox(-16.0, -17.0, -171.0, 169.0))) == {fiji, east, west}
+    assert set(index.within(BoundingBox(0.0, -30.0, -160.0, 160.0))) == {fiji, east, west}
+    assert set(index.within(BoundingBox(0.0, -30.0, 179.0, 160.0))) == {west}
+    assert set(index.contains(BoundingBox(-18.0, -18.0, 179.0, 179.0))) == {fiji}
+    assert index.nearest(-18.0, 179.9, 2) == [fiji, east]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_spatial_index_matches_brute_force(seed):
+    rng = random.Random(seed)
+    items = [_Item(_random_box(rng)) for _ in range(2000)]
+    index = SpatialIndex(items[:1500], node_capacity=8)
+    for item in items[1500:]:
+        index.insert(item)
+    for item in items[:400:3]:
+        assert index.delete(item)
+    assert not index.delete(items[0])
+    live = set(items) - set(items[:400:3])
+    assert len(index) == len(live)
+    for _ in range(50):
+        query = _random_box(rng)
+        assert set(index.intersects(query)) == _brute(live, query, _pieces_intersect)
+        assert set(index.within(query)) == _brute(live, query, lambda a, b: _pieces_within(a, b))
+        assert set(index.contains(query)) == _brute(live, query, lambda a, b: _pieces_within(b, a))
+        lat, lon = rng.uniform(-90, 90), rng.uniform(-180, 180)
+        nearest = index.nearest(lat, lon, 5)
+        distance = lambda i: min(_point_distance(r, lon, lat) for r in _pieces(i.bounding_box))
+        assert [distance(i) for i in nearest] == sorted(distance(i) for i in live)[:5]
+
+
+def test_spatial_index_reinsert():
+    a = _Item(BoundingBox(1.0, 0.0, 1.0, 0.0))
+    index = SpatialIndex([a] + [_Item(BoundingBox(50.0, 40.0, 10.0, 0.0)) for _ in range(100)])
+    index.insert(a, BoundingBox(-40.0, -50.0, 1.0, 0.0))
+    assert index.intersects(BoundingBox(1.0, 0.0, 1.0, 0.0)) == []
+    assert index.intersects(BoundingBox(-45.0, -45.0, 0.5, 0.5)) == [a]
+    assert index.nearest(-45.0, 0.5) == [a]
+
+
+def test_spatial_index_invocation():
+    with pytest.raises(ValueError):
+        SpatialIndex(node_capacity=1)
+    assert SpatialIndex().nearest(0.0, 0.0) == []
@@ -0,0 +1,65 @@
+import glob
+import io
+import tracemalloc
+
+import pytest
+import isde_dataset
+from isde_dataset.stream import iter_iso_datasets
+
+import xml.etree.ElementTree
+
+
+def _csw_response(paths, copies=1):
+    body = list()
+    for _ in range(copies):
+        for path in paths:
+            with open(path, "rb") as f:
+                record = f.read()
+            body.append(record[record.index(b"?>") + 2:])
+    return (b'<?xml version="1.0" encoding="UTF-8"?>'
+            b'<csw:GetRecordsResponse xmlns:csw="http://www.opengis.net/cat/csw/2.0.2">'
+            b'<csw:SearchStatus timestamp="2022-03-22T00:00:00"/>'
+            b'<csw:SearchResults numberOfRecordsMatched="%d">' % (len(paths) * copies) +
+            b"".join(body) +
+            b"</csw:SearchResults></csw:GetRecordsResponse>")
+
+
+def test_stream_csw_response():
+    paths = sorted(glob.glob("./test/resources/*.xml"))
+    datasets = list(iter_iso_datasets(io.BytesIO(_csw_response(paths, 2))))
+    assert len(datasets) == 2 * len(paths)
+    for path, ds in zip(paths + paths, datasets):
+        expected = isde_dataset.Dataset(xml.etree.ElementTree.parse(path),
+                                        isde_dataset.DatasetSourceType.ISO_XML)
+        assert ds.title == expected.title
+        assert ds.abstract == expected.abstract
+        assert ds.identifier == expected.identifier
+        assert str(ds.bounding_box) == str(expected.bounding_box)
+        assert ds.keywords == expected.keywords
+        assert ds.digital_object_identifier == expected.digital_object_identifier
+        assert ds.citation_string == expected.citation_string
+
+
+def test_stream_single_record_file():
+    datasets = list(iter_iso_datasets("./test/resources/ie_marine_data_dataset_3757.xml"))
+    assert len(datasets) == 1
+    assert datasets[0].identifier == "ie.marine.data:dataset.3757"
+
+
+def _peak_memory(copies):
+    source = io.BytesIO(_csw_response(sorted(glob.glob("./test/resources/*.xml")), copies))
+    tracemalloc.start()
+    for ds in iter_iso_datasets(source):
+        pass
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def test_stream_memory_bounded_by_record():
+    assert _peak_memory(40) < 2 * _peak_memory(4)
+
+
+def test_stream_parse_error():
+    with pytest.raises(xml.etree.ElementTree.ParseError):
+        list(iter_iso_datasets(io.BytesIO(b"<unclosed>")))
@@ -0,0 +1,177 @@
+import datetime
+import glob
+import random
+
+import pytest
+import isde_dataset
+from isde_dataset._isoextractor import _parse_datetime
+from isde_dataset.collection import DatasetCollection
+from isde_dataset.temporalindex import TemporalIndex
+
+
+def _year(y):
+    return datetime.datetime(y, 1, 1)
+
+
+class _Item(object):
+    def __init__(self, name, start, end):
+        self.name = name
+        self.start_date = start
+        self.end_date = end
+
+    def __repr__(self):
+        return self.name
+
+
+def _datasets():
+    return [isde_dataset.Dataset(p, isde_dataset.DatasetSourceType.ISO_XML_PATH)
+            for p in sorted(glob.glob("./test/resources/*.xml"))]
+
+
+def test_temporal_extent_fixtures():
+    datasets = {ds.identifier: ds for ds in _datasets()}
+    ds = datasets["ie.marine.data:dataset.3757"]
+    assert ds.start_date == datetime.datetime(2004, 1, 1)
+    assert ds.end_date == datetime.datetime(2019, 12, 31, 23, 59, 59)
+    ds = datasets["d394bf65-a801-4c59-b878-375f631247ed"]
+    assert ds.start_date == datetime.datetime(2000, 1, 1)
+    assert ds.end_date == datetime.datetime(2021, 1, 18, 23, 45)
+    ds = datasets["eb4307e3-ec47-4f10-905f-d4489f21a54b"]
+    assert ds.start_date is None and ds.end_date is None
+
+
+def test_temporal_extent_round_trips():
+    for ds in _datasets():
+        copy = isde_dataset.Dataset(ds.to_dict(), isde_dataset.DatasetSourceType.DICT)
+        assert (copy.start_date, copy.end_date) == (ds.start_date, ds.end_date)
+    view = DatasetCollection(_datasets())
+    assert [v.to_dict() for v in view] == [ds.to_dict() for ds in _datasets()]
+
+
+def test_parse_datetime():
+    assert _parse_datetime("2010") == _year(2010)
+    assert _parse_datetime("2010-06") == datetime.datetime(2010, 6, 1)
+    assert _parse_datetime(" 2010-06-01T12:00:00Z ") == datetime.datetime(2010, 6, 1, 12)
+    assert _parse_datetime("2010-06-01T12:00:00+01:00") == datetime.datetime(2010, 6, 1, 11)
+    assert _parse_datetime("2010-06-01T12:00:00.25-0530") == \
+        datetime.datetime(2010, 6, 1, 17, 30, 0, 250000)
+    for text in (None, "", "now", "unknown", "2010-13-01"):
+        assert _parse_datetime(text) is None
+
+
+def test_parse_end_datetime():
+    end = datetime.timedelta(microseconds=1)
+    assert _parse_datetime("2015", True) == _year(2016) - end
+    assert _parse_datetime("2015-06", True) == datetime.datetime(2015, 7, 1) - end
+    assert _parse_datetime("2015-12", True) == _year(2016) - end
+    assert _parse_datetime("2016-02", True) == datetime.datetime(2016, 3, 1) - end
+    assert _parse_datetime("2015-06-30", True) == datetime.datetime(2015, 7, 1) - end
+    assert _parse_datetime("2015-06-30T12:30", True) == datetime.datetime(2015, 6, 30, 12, 31) - end
+    assert _parse_datetime("2015-06-30T12:30:05", True) == datetime.datetime(2015, 6, 30, 12, 30, 5)
+    assert _parse_datetime("2015-06-30T23:30+01:00", True) == datetime.datetime(2015, 6, 30, 22, 31) - end
+    assert _parse_datetime("9999", True) is None
+
+
+def test_reduced_precision_end_covers_its_period():
+    record = ("<gmd:MD_Metadata xmlns:gmd=\"http://www.isotc211.org/2005/gmd\" "
+              "xmlns:gml=\"http://www.opengis.net/gml/3.2\"><gmd:identificationInfo>"
+              "<gmd:MD_DataIdentification><gmd:extent><gmd:EX_Extent><gmd:temporalElement>"
+              "<gmd:EX_TemporalExtent><gmd:extent><gml:TimePeriod>"
+              "<gml:beginPosition>2010</gml:beginPosition><gml:endPosition>%s</gml:endPosition>"
+              "</gml:TimePeriod></gmd:extent></gmd:EX_TemporalExtent></gmd:temporalElement>"
+              "</gmd:EX_Extent></gmd:extent></gmd:MD_DataIdentification>"
+              "</gmd:identificationInfo></gmd:MD_Metadata>")
+    year = isde_dataset.Dataset((record % "2015").encode(), isde_dataset.DatasetSourceType.ISO_XML_BYTES)
+    month = isde_dataset.Dataset((record % "2015-06").encode(), isde_dataset.DatasetSourceType.ISO_XML_BYTES)
+    assert year.start_date == _year(2010)
+    index = TemporalIndex([year, month])
+    assert index.at(datetime.datetime(2015, 12, 31, 12)) == [year]
+    assert set(index.at(datetime.datetime(2015, 6, 30, 12))) == {year, month}
+    assert index.contains(datetime.datetime(2015, 7, 1), datetime.datetime(2015, 12, 31)) == [year]
+    assert set(index.within(_year(2010), _year(2016))) == {year, month}
+    assert index.within(_year(2010), datetime.datetime(2015, 7, 1)) == [month]
+
+
+@pytest.fixture
+def items():
+    return [_Item("a", _year(2000), _year(2005)),
+            _Item("b", _year(2004), _year(2012)),
+            _Item("c", _year(2016), None),
+            _Item("d", None, _year(1990)),
+            _Item("e", _year(2011), _year(2011)),
+            _Item("f", None, None)]
+
+
+def _names(found):
+    return sorted(i.name for i in found)
+
+
+def test_temporal_index_queries(items):
+    index = TemporalIndex(items, leaf_size=2)
+    assert len(index) == 5
+    assert items[5] not in index
+    assert _names(index.overlaps(_year(2010), _year(2015))) == ["b", "e"]
+    assert _names(index.overlaps(_year(2020))) == ["c"]
+    assert _names(index.overlaps(end=_year(1980))) == ["d"]
+    assert _names(index.overlaps()) == ["a", "b", "c", "d", "e"]
+    assert _names(index.contains(_year(2004), _year(2005))) == ["a", "b"]
+    assert _names(index.contains(_year(2030), _year(2040))) == ["c"]
+    assert _names(index.within(_year(2000), _year(2012))) == ["a", "b", "e"]
+    assert _names(index.within(end=_year(1995))) == ["d"]
+    assert _names(index.at(_year(2011))) == ["b", "e"]
+    with pytest.raises(ValueError):
+        index.overlaps(_year(2015), _year(2010))
+    with pytest.raises(ValueError):
+        TemporalIndex(leaf_size=0)
+
+
+def test_temporal_index_timezones(items):
+    index = TemporalIndex(items)
+    utc_plus_2 = datetime.timezone(datetime.timedelta(hours=2))
+    assert _names(index.at(datetime.datetime(2005, 1, 1, 2, tzinfo=utc_plus_2))) == ["a", "b"]
+    assert _names(index.at(datetime.datetime(2005, 1, 1, 3, tzinfo=utc_plus_2))) == ["b"]
+
+
+def test_temporal_index_updates(items):
+    index = TemporalIndex(items[:3], leaf_size=2)
+    index.insert(items[3])
+    index.insert(items[4])
+    index.insert(items[5])
+    assert _names(index.overlaps(_year(2010), _year(2015))) == ["b", "e"]
+    assert index.delete(items[1])
+    assert not index.delete(items[1])
+    assert not index.delete(items[5])
+    assert _names(index.overlaps(_year(2010), _year(2015))) == ["e"]
+    index.insert(items[0], (_year(2014), None))
+    assert _names(index.overlaps(_year(2010), _year(2015))) == ["a", "e"]
+    assert _names(index.within(_year(2000), _year(2005))) == []
+    index.insert(items[0], (None, None))
+    assert items[0] not in index
+    assert _names(index.overlaps()) == ["c", "d", "e"]
+
+
+def test_temporal_index_matches_brute_force():
+    random.seed(13)
+    items = list()
+    for n in range(3000):
+        start = None if n % 50 == 0 else _year(1950) + datetime.timedelta(days=random.randrange(25000))
+        end = None if n % 7 == 0 else (start or _year(1950)) + datetime.timedelta(days=random.randrange(5000))
+        items.append(_Item(str(n), start, end))
+    index = TemporalIndex(items[:2000], leaf_size=16)
+    for item in items[2000:]:
+        index.insert(item)
+    for item in items[:3000:3]:
+        index.delete(item)
+    live = [i for n, i in enumerate(items)
+            if n % 3 and (i.start_date is not None or i.end_date is not None)]
+    low = lambda d: d or datetime.datetime.min
+    high = lambda d: d or datetime.datetime.max
+    for _ in range(50):
+        a = _year(1950) + datetime.timedelta(days=random.randrange(30000))
+        b = a + datetime.timedelta(days=random.randrange(3000))
+        assert _names(index.overlaps(a, b)) == \
+            _names(i for i in live if low(i.start_date) <= b and a <= high(i.end_date))
+        assert _names(index.contains(a, b)) == \
+            _names(i for i in live if low(i.start_date) <= a and b <= high(i.end_date))
+        assert _names(index.within(a, b)) == \
+            _names(i for i in live if a <= low(i.start_date) and high(i.end_date) <= b)
@@ -0,0 +1,126 @@
+import glob
+import io
+import xml.etree.ElementTree
+
+import pytest
+import isde_dataset
+import isde_dataset.textindex
+from isde_dataset.textindex import TextIndex, tokenize
+
+
+def _dataset(**fields):
+    return isde_dataset.Dataset(fields, isde_dataset.DatasetSourceType.DICT)
+
+
+@pytest.fixture
+def index():
+    return TextIndex([
+        _dataset(identifier="a", title="Sea water temperature in Galway Bay",
+                 abstract="Hourly sea temperature", keywords=["oceans"]),
+        _dataset(identifier="b", title="Water quality of Irish rivers",
+                 abstract="Temperature and nutrients",
+                 keywords=["inlandWaters", "environment"]),
+        _dataset(identifier="c", title="Bay water sampling",
+                 citation_string="Marine Institute (2020) Galway sea",
+                 keywords=["oceans", "environment"]),
+        _dataset(identifier="d", title="Éire geology", keywords=["geoscientificInformation"])])
+
+
+def test_tokenize():
+    assert tokenize("Sea-Water TEMPERATURE, Éire 2020") == \
+        ["sea", "water", "temperature", "eire", "2020"]
+
+
+def test_text_index_and_or(index):
+    assert sorted(k for k, _ in index.search("water temperature")) == ["a", "b"]
+    assert sorted(k for k, _ in index.search("galway rivers", operator="or")) == \
+        ["a", "b", "c"]
+    assert index.search("galway rivers") == []
+    assert [k for k, _ in index.search("EIRE")] == ["d"]
+    with pytest.raises(ValueError):
+        index.search("sea", operator="not")
+
+
+def test_text_index_phrases(index):
+    assert [k for k, _ in index.search('"sea water"')] == ["a"]
+    assert [k for k, _ in index.search("sea-water")] == ["a"]
+    assert [k for k, _ in index.search('"galway bay"')] == ["a"]
+    # a phrase must not match across the end of one field and the next
+    assert index.search('"sampling marine"') == []
+
+
+def test_text_index_ranking(index):
+    hits = index.search("temperature")
+    assert [k for k, _ in hits] == ["a", "b"]
+    assert hits[0][1] > hits[1][1] > 0.0
+    assert len(index.search("temperature", limit=1)) == 1
+
+
+def test_text_index_facets(index):
+    assert sorted(k for k, _ in index.search("water", keywords=["oceans"])) == ["a", "c"]
+    assert index.facet_counts("water") == {"oceans": 2, "inlandWaters": 1,
+                                           "environment": 2}
+    assert index.facet_counts(keywords=["environment"]) == \
+        {"oceans": 1, "inlandWaters": 1, "environment": 2}
+    assert len(index.search("")) == 4
+
+
+def test_text_index_add_delete(index):
+    assert index.delete("a")
+    assert not index.delete("a")
+    assert "a" not in index and len(index) == 3
+    assert index.search('"sea water"') == []
+    assert "oceans" in index.facet_counts()
+    index.add(_dataset(identifier="c", title="Plankton"))
+    assert [k for k, _ in index.search("plankton")] == ["c"]
+    assert index.search("sampling") == []
+    assert index.facet_counts() == {"inlandWaters": 1, "environment": 1,
+                                    "geoscientificInformation": 1}
+    index.add(_dataset(identifier="c", title="Plankton"), key="x")
+    assert sorted(k for k, _ in index.search("plankton")) == ["c", "x"]
+    with pytest.raises(TypeError):
+        index.add("plankton")
+    with pytest.raises(ValueError):
+        index.add(_dataset(identifier="", title="Krill"))
+    with pytest.raises(ValueError):
+        index.add(_dataset(identifier="d", title="Krill"), key="")
+    index.add(_dataset(identifier="", title="Krill"), key="k")
+    assert [k for k, _ in index.search("krill")] == ["k"]
+
+
+def test_text_index_dump_load(index):
+    index.delete("b")
+    f = io.StringIO()
+    index.dump(f)
+    f.seek(0)
+    loaded = TextIndex.load(f)
+    for query in ("water", '"galway bay"', "sea bay", ""):
+        assert loaded.search(query, operator="or") == index.search(query, operator="or")
+    assert loaded.facet_counts() == index.facet_counts()
+    loaded.delete("c")
+    loaded.add(_dataset(identifier="e", title="Water"))
+    assert sorted(k for k, _ in loaded.search("water")) == ["a", "e"]
+    with pytest.raises(ValueError):
+        TextIndex.load(io.StringIO('{"version": 0}'))
+
+
+def test_text_index_fixtures():
+    datasets = [isde_dataset.Dataset(xml.etree.ElementTree.parse(p),
+                                     isde_dataset.DatasetSourceType.ISO_XML)
+                for p in sorted(glob.glob("./test/resources/*.xml"))]
+    index = TextIndex(datasets)
+    assert len(index) == len(datasets)
+    assert [k for k, _ in index.search("buoy")] == ["IWBNetwork"]
+    assert [k for k, _ in index.search('"water temperature"')] == \
+        ["IOOS_Water_Temperature", "ie.marine.data:dataset.3757"]
+    assert index.facet_counts("infomar")["oceans"] == 1
+
+
+def test_text_index_purges_deleted(index, monkeypatch):
+    monkeypatch.setattr(isde_dataset.textindex, "_PURGE_MINIMUM", 0)
+    index.delete("a")
+    index.delete("b")
+    index.delete("c")
+    assert "galway" not in index._postings
+    assert index.search("bay") == []
+    assert [k for k, _ in index.search("geology")] == ["d"]
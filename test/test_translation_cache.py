@@ -0,0 +1,114 @@
+import glob
+
+import pytest
+import isde_dataset
+from isde_dataset.cache import _COMMIT_BATCH, TranslationCache, extraction_rules_version
+
+import sqlite3
+import time
+import xml.etree.ElementTree
+
+
+def test_translation_cache_hits(tmp_path):
+    paths = sorted(glob.glob("./test/resources/*.xml"))
+    with TranslationCache(str(tmp_path)) as cache:
+        first = [cache.translate(path) for path in paths]
+        assert cache.stats["misses"] == 6
+        assert cache.stats["hits"] == 0
+    with TranslationCache(str(tmp_path)) as cache:
+        second = [cache.translate(path) for path in paths]
+        stats = cache.stats
+    assert stats["hits"] == 6
+    assert stats["misses"] == 0
+    assert stats["entries"] == 6
+    assert stats["bytes_saved"] == sum(len(open(p, "rb").read()) for p in paths)
+    for path, a, b in zip(paths, first, second):
+        expected = isde_dataset.Dataset(xml.etree.ElementTree.parse(path),
+                                        isde_dataset.DatasetSourceType.ISO_XML)
+        assert a.to_dict() == b.to_dict() == expected.to_dict()
+
+
+def test_translation_cache_outputs(tmp_path):
+    path = "./test/resources/IWBNetwork_iso19115.xml"
+    with TranslationCache(str(tmp_path)) as cache:
+        with pytest.raises(KeyError):
+            cache.put_output(path, "schema.org", "{}")
+        assert cache.get_output(path, "schema.org") is None
+        cache.translate(path)
+        cache.put_output(path, "schema.org", '{"@type": "Dataset"}')
+        assert cache.get_output(path, "schema.org") == '{"@type": "Dataset"}'
+        stats = cache.stats
+        assert (stats["hits"], stats["misses"]) == (0, 1)
+        assert (stats["output_hits"], stats["output_misses"]) == (1, 1)
+        assert stats["bytes_saved"] == 0
+        size = cache.stats["size_bytes"]
+        cache.put_output(path, "schema.org", "{}")
+        assert cache.stats["size_bytes"] == size - len('{"@type": "Dataset"}') + 2
+
+
+def test_translation_cache_changed_record(tmp_path):
+    with open("./test/resources/IWBNetwork_iso19115.xml", "rb") as f:
+        record = f.read()
+    with TranslationCache(str(tmp_path)) as cache:
+        cache.translate(record)
+        changed = record.replace(b"IWBNetwork</gco:CharacterString>", b"IWB</gco:CharacterString>")
+        assert cache.translate(changed).identifier == "IWB"
+        assert cache.stats["misses"] == 2
+
+
+def test_translation_cache_lru_eviction(tmp_path):
+    paths = sorted(glob.glob("./test/resources/*.xml"))
+    with TranslationCache(str(tmp_path), max_bytes=4000) as cache:
+        for path in paths:
+            cache.translate(path)
+            cache.translate(paths[0])
+        stats = cache.stats
+        assert stats["evictions"] > 0
+        assert stats["size_bytes"] <= 4000
+        assert cache.get(paths[0]) is not None
+        assert cache.get(paths[1]) is None
+
+
+def test_translation_cache_invocation(tmp_path):
+    assert len(extraction_rules_version()) == 16
+    with pytest.raises(ValueError):
+        TranslationCache(str(tmp_path), max_bytes=0)
+
+
+def test_extraction_rules_version(monkeypatch):
+    version = extraction_rules_version()
+    chains = dict(isde_dataset.cache._STEP_CHAINS)
+    chains["title"] = chains["title"][:-1]
+    monkeypatch.setattr(isde_dataset.cache, "_STEP_CHAINS", chains)
+    assert extraction_rules_version() != version
+
+
+def test_dataset_from_dict():
+    tree = xml.etree.ElementTree.parse("./test/resources/ie_marine_data_dataset_3757.xml")
+    ds = isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.ISO_XML)
+    copy = isde_dataset.Dataset(ds.to_dict(), isde_dataset.DatasetSourceType.DICT)
+    assert copy.to_dict() == ds.to_dict()
+    assert isde_dataset.Dataset({}, isde_dataset.DatasetSourceType.DICT).title == str()
+    with pytest.raises(TypeError):
+        isde_dataset.Dataset(tree, isde_dataset.DatasetSourceType.DICT)
+
+
+def test_translation_cache_batches_commits(tmp_path):
+    paths = sorted(glob.glob("./test/resources/*.xml"))
+
+    def committed():
+        return sqlite3.connect(str(tmp_path / "translations.sqlite")).execute(
+            "SELECT COUNT(*), MAX(last_used) FROM entries").fetchone()
+
+    with TranslationCache(str(tmp_path)) as cache:
+        for path in paths:
+            cache.translate(path)
+        assert committed()[0] == 0
+        started = time.time()
+        for i in range(_COMMIT_BATCH - len(paths)):
+            cache.get(paths[0])
+        count, last_used = committed()
+        assert count == len(paths)
+        assert last_used >= started
+        cache.translate(paths[0])
+    assert committed()[0] == len(paths)